@@ -0,0 +1,120 @@
+"""
+Measures the throughput of sending a model payload over socket.io to a local server,
+comparing the streaming chunked transfer against the previous approach of emitting
+1026-byte chunks without waiting for acknowledgements.
+
+Usage:
+
+python benchmarks/chunked_transfer_benchmark.py --size 100 --legacy_size 4
+"""
+import argparse
+import asyncio
+import time
+
+import socketio
+import torch
+from aiohttp import web
+
+from plato.utils import chunked_transfer, payload_codec
+
+
+class BenchmarkServer(socketio.AsyncNamespace):
+    """A server that reassembles the chunks it receives."""
+
+    def __init__(self, namespace):
+        super().__init__(namespace)
+        self.chunks = chunked_transfer.ChunkBuffer()
+        self.done = asyncio.Event()
+        self.payload = None
+
+    async def on_chunk(self, sid, data):
+        """A chunk of data arrived."""
+        self.chunks.append(data["data"], offset=data.get("offset"), size=data.get("size"))
+
+    async def on_client_payload(self, sid, data):
+        """All the chunks of a payload arrived."""
+        self.payload = payload_codec.decode(self.chunks.getvalue())
+        self.done.set()
+
+
+async def legacy_send(sio, data):
+    """Sends a payload the way it used to be sent, with `step = 1024 ^ 2`."""
+    step = 1024 ^ 2
+    chunks = [data[i : i + step] for i in range(0, len(data), step)]
+
+    for chunk in chunks:
+        await sio.emit("chunk", {"data": chunk})
+
+
+async def measure(port, payload, send):
+    """Returns the throughput in MB/s of sending a payload with `send`."""
+    namespace = BenchmarkServer("/")
+    server = socketio.AsyncServer(max_http_buffer_size=2**31)
+    server.register_namespace(namespace)
+    app = web.Application()
+    server.attach(app)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    client = socketio.AsyncClient()
+    await client.connect(f"http://127.0.0.1:{port}", transports=["websocket"])
+
+    data = payload_codec.TensorCodec().encode(payload)
+    started = time.perf_counter()
+    await send(client, data)
+    await client.emit("client_payload", {})
+    await namespace.done.wait()
+    elapsed = time.perf_counter() - started
+
+    for name, tensor in payload.items():
+        assert torch.equal(tensor, namespace.payload[name])
+
+    await client.disconnect()
+    await runner.cleanup()
+
+    return len(data) / 1024**2 / elapsed
+
+
+def state_dict_of_size(megabytes):
+    """Returns a state_dict with roughly the given size in MB."""
+    layer_size = 1024**2 // 4
+    return {f"layer{i}.weight": torch.randn(layer_size) for i in range(int(megabytes))}
+
+
+async def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=float, default=100, help="Payload size in MB.")
+    parser.add_argument(
+        "--legacy_size",
+        type=float,
+        default=4,
+        help="Payload size in MB for the legacy transfer, which is much slower.",
+    )
+    parser.add_argument("--chunk_size", type=float, default=4, help="Chunk size in MB.")
+    parser.add_argument("--chunk_window", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    async def streaming_send(sio, data):
+        await chunked_transfer.send(
+            sio,
+            data,
+            size=int(args.chunk_size * 1024**2),
+            window=args.chunk_window,
+            timeout=600,
+        )
+
+    throughput = await measure(args.port, state_dict_of_size(args.size), streaming_send)
+    print(f"Streaming transfer of {args.size:.0f} MB: {throughput:.1f} MB/s")
+
+    throughput = await measure(
+        args.port + 1, state_dict_of_size(args.legacy_size), legacy_send
+    )
+    print(f"Legacy transfer of {args.legacy_size:.0f} MB: {throughput:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
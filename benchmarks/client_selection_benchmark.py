@@ -0,0 +1,208 @@
+"""
+Measures the time the server spends on bookkeeping and selecting clients with a large
+number of registered clients: registering clients, handling disconnections by sid,
+excluding busy clients from selection in asynchronous mode, and Oort's selection.
+
+Looking up a client by its sid and excluding busy clients are also measured as they
+were done before the server indexed its clients, by scanning all the clients and
+testing membership in lists.
+
+Usage:
+
+python benchmarks/client_selection_benchmark.py --clients 1000 10000 100000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: {total_clients}
+    per_round: {per_round}
+    do_test: false
+
+server:
+    address: 127.0.0.1
+    port: 8000
+    do_test: false
+    desired_duration: 100
+    exploration_factor: 0.3
+    step_window: 10
+    penalty: 0.8
+
+data:
+    datasource: MNIST
+    partition_size: 100
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 10
+    epochs: 1
+    batch_size: 32
+    optimizer: SGD
+    model_name: lenet5
+
+algorithm:
+    type: fedavg
+
+parameters:
+    optimizer:
+        lr: 0.01
+
+general:
+    base_path: {base_path}
+"""
+
+
+def legacy_find_client(clients, sid):
+    """Finds the client with a sid by scanning all the clients, as done before."""
+    for client_id, client in dict(clients).items():
+        if client["sid"] == sid:
+            return client_id
+
+    return None
+
+
+def legacy_selectable_clients(server, clients_pool):
+    """Excludes the busy clients from a pool with lists, as done before."""
+    training_client_ids = [
+        server.training_clients[client_id]["id"]
+        for client_id in list(server.training_clients.keys())
+    ]
+    reporting_client_ids = [client[2]["client_id"] for client in server.reported_clients]
+
+    return [
+        client
+        for client in clients_pool
+        if client not in training_client_ids and client not in reporting_client_ids
+    ]
+
+
+def timed(function, repeat):
+    """Returns the average time in milliseconds of calling a function."""
+    started = time.perf_counter()
+    for __ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def benchmark(total_clients, per_round, repeat):
+    """Measures the operations with a number of registered clients."""
+    base_path = tempfile.mkdtemp()
+    config_file = os.path.join(base_path, "config.yml")
+    with open(config_file, "w", encoding="utf-8") as file:
+        file.write(
+            CONFIG.format(
+                total_clients=total_clients, per_round=per_round, base_path=base_path
+            )
+        )
+    os.environ["config_file"] = config_file
+
+    # pylint: disable=import-outside-toplevel
+    from plato.config import Config
+
+    Config._instance = None
+
+    import oort_server
+
+    server = oort_server.Server()
+    server.configure()
+
+    # The training session has started, so registering does not start a round
+    server.current_round = 1
+    server.selected_clients = []
+
+    results = []
+
+    started = time.perf_counter()
+    for client_id in range(1, total_clients + 1):
+        asyncio.run(server.register_client(f"sid{client_id}", client_id))
+    results.append(
+        ("register", None, (time.perf_counter() - started) / total_clients * 1000)
+    )
+
+    sids = [f"sid{random.randint(1, total_clients)}" for __ in range(repeat)]
+    results.append(
+        (
+            "find sid",
+            timed(lambda: legacy_find_client(server.clients, random.choice(sids)), 3),
+            timed(lambda: server.client_ids[random.choice(sids)], repeat),
+        )
+    )
+
+    # Half of the clients of a round are still training, and the other half have
+    # reported without being aggregated yet
+    clients_pool = list(range(1, total_clients + 1))
+    busy_clients = random.sample(clients_pool, per_round)
+    for client_id in busy_clients[: per_round // 2]:
+        server.training_clients[client_id] = {"id": client_id}
+    server.reported_clients = [
+        (0, client_id, {"client_id": client_id})
+        for client_id in busy_clients[per_round // 2 :]
+    ]
+    results.append(
+        (
+            "exclude busy",
+            timed(lambda: legacy_selectable_clients(server, clients_pool), 1),
+            timed(lambda: server.selectable_clients(clients_pool), 3),
+        )
+    )
+
+    # Oort's selection once half of the clients have been explored
+    for client_id in random.sample(clients_pool, total_clients // 2):
+        server.client_utilities[client_id] = random.random()
+        server.client_durations[client_id] = random.uniform(50, 150)
+        server.client_last_rounds[client_id] = 1
+    server.current_round = 2
+    results.append(
+        (
+            "oort select",
+            None,
+            timed(lambda: server.choose_clients(clients_pool, per_round), 3),
+        )
+    )
+
+    disconnected = [f"sid{client_id}" for client_id in range(1, repeat + 1)]
+    started = time.perf_counter()
+    for sid in disconnected:
+        asyncio.run(server.client_disconnected(sid))
+    results.append(
+        ("disconnect", None, (time.perf_counter() - started) / repeat * 1000)
+    )
+
+    return results
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--per_round", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    sys.argv = sys.argv[:1]
+    sys.path.append(
+        os.path.join(os.path.dirname(__file__), os.pardir, "examples", "oort")
+    )
+    logging.disable(logging.INFO)
+    random.seed(1)
+
+    print(f"{'clients':>8} {'operation':>14} {'before (ms)':>12} {'now (ms)':>10}")
+    for total_clients in args.clients:
+        for operation, before, now in benchmark(
+            total_clients, args.per_round, args.repeat
+        ):
+            before = "" if before is None else f"{before:.4f}"
+            print(f"{total_clients:>8} {operation:>14} {before:>12} {now:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Measures the time and the peak memory of federated averaging with a ResNet-18, comparing
+the in-place averaging of the weights received against computing, aggregating and
+applying the weight deltas of each client.
+
+The clients share a small number of distinct payloads, so that payloads for a thousand
+clients fit in memory; aggregating them costs the same as with distinct payloads. The
+previous approach materializes a delta for every client, and is only measured up to
+`--legacy_limit` clients.
+
+Usage:
+
+python benchmarks/fedavg_aggregation_benchmark.py --clients 10 100 1000
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+import types
+from collections import OrderedDict
+
+import torch
+
+from plato.algorithms import fedavg
+from plato.models import resnet
+
+
+def memory_status(field):
+    """Returns a field of /proc/self/status in MB."""
+    with open("/proc/self/status", encoding="utf-8") as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+
+    return 0
+
+
+def reset_peak_memory():
+    """Resets the peak resident set size of this process."""
+    with open("/proc/self/clear_refs", "w", encoding="utf-8") as clear_refs:
+        clear_refs.write("5")
+
+
+async def legacy_average(algorithm, baseline_weights, weights_received, weightings):
+    """Federated averaging with the weight deltas of each client, as done by
+    `compute_weight_deltas()`, `Server.aggregate_deltas()` and `update_weights()`."""
+    deltas_received = algorithm.compute_weight_deltas(
+        baseline_weights, weights_received
+    )
+
+    avg_update = {
+        name: torch.zeros(delta.shape) for name, delta in deltas_received[0].items()
+    }
+    for delta, weighting in zip(deltas_received, weightings):
+        for name, value in delta.items():
+            avg_update[name] += value * weighting
+
+        await asyncio.sleep(0)
+
+    return algorithm.update_weights(avg_update)
+
+
+async def in_place_average(algorithm, baseline_weights, weights_received, weightings):
+    """Federated averaging of the weights received in place."""
+    return await algorithm.average_weights(
+        baseline_weights, weights_received, weightings
+    )
+
+
+def measure(average, algorithm, weights_received, weightings, results):
+    """Puts the time in seconds and the peak additional memory in MB of one round of
+    aggregation into `results`."""
+    baseline_weights = algorithm.extract_weights()
+
+    memory_before = memory_status("VmRSS")
+    reset_peak_memory()
+    started = time.perf_counter()
+    asyncio.run(average(algorithm, baseline_weights, weights_received, weightings))
+    elapsed = time.perf_counter() - started
+    results.put((elapsed, memory_status("VmHWM") - memory_before))
+
+
+def measure_in_child(*args):
+    """Measures in a forked process, so that memory freed by earlier measurements and
+    kept by the allocator is not reused."""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=measure, args=(*args, results))
+    process.start()
+    elapsed, peak_memory = results.get()
+    process.join()
+
+    return elapsed, peak_memory
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument(
+        "--distinct", type=int, default=8, help="The number of distinct payloads."
+    )
+    parser.add_argument(
+        "--legacy_limit",
+        type=int,
+        default=100,
+        help="The largest number of clients to aggregate with weight deltas.",
+    )
+    args = parser.parse_args()
+
+    torch.manual_seed(1)
+    model = resnet.Model.get("resnet_18")
+    algorithm = fedavg.Algorithm(types.SimpleNamespace(model=model))
+    baseline_weights = algorithm.extract_weights()
+
+    payloads = []
+    for __ in range(args.distinct):
+        payloads.append(
+            OrderedDict(
+                (name, tensor + torch.randn_like(tensor) * 1e-3)
+                if tensor.is_floating_point()
+                else (name, tensor.clone())
+                for name, tensor in baseline_weights.items()
+            )
+        )
+
+    size = sum(t.numel() * t.element_size() for t in baseline_weights.values())
+    print(f"ResNet-18: {size / 1024**2:.1f} MB per payload")
+    print(f"{'clients':>8} {'method':>10} {'time (s)':>10} {'peak (MB)':>10}")
+
+    for num_clients in args.clients:
+        weights_received = [payloads[i % len(payloads)] for i in range(num_clients)]
+        num_samples = torch.randint(100, 1000, (num_clients,)).tolist()
+        weightings = [samples / sum(num_samples) for samples in num_samples]
+
+        elapsed, peak = measure_in_child(
+            in_place_average, algorithm, weights_received, weightings
+        )
+        print(f"{num_clients:>8} {'in-place':>10} {elapsed:>10.3f} {peak:>10.1f}")
+
+        if num_clients <= args.legacy_limit:
+            elapsed, peak = measure_in_child(
+                legacy_average, algorithm, weights_received, weightings
+            )
+            print(f"{num_clients:>8} {'deltas':>10} {elapsed:>10.3f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
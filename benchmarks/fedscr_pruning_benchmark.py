@@ -0,0 +1,210 @@
+"""
+Measures the time it takes a FedSCR client to prune the weight updates of the
+convolutional layers at the end of a round.
+
+The updates are pruned as before, copying them to NumPy arrays and summing the
+absolute values of each channel and each filter one at a time, and as done now, with
+one reduction over the channels and one over the filters for each layer, on the device
+the model was trained on. The pruned updates and the accumulated gradients computed
+both ways are also compared, over a few rounds.
+
+Usage:
+
+python benchmarks/fedscr_pruning_benchmark.py --model_name resnet_18 --rounds 5
+"""
+import argparse
+import copy
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: 1
+    per_round: 1
+    update_threshold: {threshold}
+
+server:
+    address: 127.0.0.1
+    port: 8000
+
+data:
+    datasource: MNIST
+    partition_size: 100
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 1
+    epochs: 1
+    batch_size: 32
+    optimizer: SGD
+    model_name: {model_name}
+
+algorithm:
+    type: fedavg
+
+parameters:
+    optimizer:
+        lr: 0.01
+
+general:
+    base_path: {base_path}
+"""
+
+
+def previous_prune_update(trainer, acc_grads):
+    """The weight updates of the convolutional layers, and the accumulated gradients,
+    as computed before."""
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    def aggregate(delta, outer, inner):
+        aggregated = []
+        for outer_index in range(delta.shape[outer]):
+            tensor_sum = 0
+            for inner_index in range(delta.shape[inner]):
+                index = [outer_index, inner_index]
+                if outer == 1:
+                    index.reverse()
+                tensor_sum += np.abs(delta[index[0], index[1], :, :])
+            aggregated.append(np.sum(tensor_sum))
+        return aggregated
+
+    conv_updates = OrderedDict()
+    i = 0
+    for (orig_name, orig_module), (__, trained_module) in zip(
+        trainer.orig_weights.named_modules(), trainer.model.named_modules()
+    ):
+        if isinstance(trained_module, torch.nn.Conv2d):
+            orig_tensor = orig_module.weight.data.cpu().numpy()
+            trained_tensor = trained_module.weight.data.cpu().numpy()
+            delta = trained_tensor - orig_tensor + acc_grads[i]
+            orig_delta = copy.deepcopy(delta)
+
+            aggregated_channels = aggregate(delta, 1, 0)
+            aggregated_filters = aggregate(delta, 0, 1)
+
+            for index, norm in enumerate(aggregated_channels):
+                if norm < trainer.update_threshold:
+                    delta[:, index, :, :] = 0
+            for index, norm in enumerate(aggregated_filters):
+                if norm < trainer.update_threshold:
+                    delta[index, :, :, :] = 0
+
+            acc_grads[i] = orig_delta - delta
+            conv_updates[f"{orig_name}.weight"] = torch.from_numpy(delta)
+            i += 1
+
+    return conv_updates
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_name", type=str, default="resnet_18")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.3)
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp()
+    config_file = os.path.join(base_path, "config.yml")
+    with open(config_file, "w", encoding="utf-8") as file:
+        file.write(
+            CONFIG.format(
+                model_name=args.model_name,
+                threshold=args.threshold,
+                base_path=base_path,
+            )
+        )
+    os.environ["config_file"] = config_file
+    sys.argv = sys.argv[:1]
+    sys.path.insert(
+        0, os.path.join(os.path.dirname(__file__), os.pardir, "examples", "fedscr")
+    )
+
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    import fedscr_trainer
+    from plato.config import Config
+
+    Config()
+    logging.disable(logging.INFO)
+    torch.manual_seed(1)
+    generator = np.random.default_rng(1)
+
+    trainer = fedscr_trainer.Trainer()
+    trainer.client_id = 1
+    trainer.model.to(trainer.device)
+    trainer.train_run_start(Config().trainer._asdict())
+
+    if trainer.device.startswith("cuda"):
+        synchronize = torch.cuda.synchronize
+    else:
+        synchronize = lambda: None
+
+    conv_layers = [
+        module
+        for module in trainer.model.modules()
+        if isinstance(module, torch.nn.Conv2d)
+    ]
+    parameters = sum(module.weight.numel() for module in conv_layers)
+    print(
+        f"{args.model_name}: {len(conv_layers)} convolutional layers, "
+        f"{parameters} weights on {trainer.device}.\n"
+    )
+
+    previous_acc_grads = [0] * len(conv_layers)
+    before = []
+    now = []
+    pruned = []
+    difference = 0
+    for __ in range(args.rounds):
+        # Updates of different magnitudes in each layer, so that some of the
+        # channels and filters are pruned and some are not
+        with torch.no_grad():
+            for orig_module, trained_module in zip(
+                trainer.orig_weights.modules(), trainer.model.modules()
+            ):
+                if isinstance(trained_module, torch.nn.Conv2d):
+                    scale = 10 ** generator.uniform(-5, -3)
+                    trained_module.weight.copy_(
+                        orig_module.weight
+                        + torch.randn_like(orig_module.weight) * scale
+                    )
+
+        synchronize()
+        started = time.perf_counter()
+        conv_updates = previous_prune_update(trainer, previous_acc_grads)
+        synchronize()
+        before.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        trainer.prune_update()
+        synchronize()
+        now.append(time.perf_counter() - started)
+
+        pruned.append(trainer.compute_pruned_amount())
+        for i, name in enumerate(conv_updates):
+            difference = max(
+                difference,
+                (conv_updates[name] - trainer.total_grad[name].cpu()).abs().max().item(),
+                np.abs(previous_acc_grads[i] - trainer.acc_grads[i].cpu().numpy()).max(),
+            )
+
+    print(f"{'':>10} {'time (ms)':>10}")
+    print(f"{'before':>10} {np.median(before) * 1000:>10.1f}")
+    print(f"{'now':>10} {np.median(now) * 1000:>10.1f}\n")
+    print(f"Pruned amount in each round: {', '.join(f'{p:.1f}%' for p in pruned)}")
+    print(f"Largest difference in the updates and accumulated gradients: {difference}")
+
+
+if __name__ == "__main__":
+    main()
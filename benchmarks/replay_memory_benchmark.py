@@ -0,0 +1,259 @@
+"""
+Measures the throughput of the replay memories of the reinforcement learning policies:
+pushing transitions, sampling batches, and updating a TD3 policy with the sampled
+batches, with recurrent actors in both synchronous and asynchronous modes, as well as
+with fully connected actors.
+
+Sampling from the basic replay memory is also measured as it was done before the
+transitions were stored in tensors, by sampling from NumPy arrays and converting the
+batches to tensors on the device. Pushing all the transitions at once is checked to
+store the same values as pushing them one at a time.
+
+Usage:
+
+python benchmarks/replay_memory_benchmark.py --batch_size 64 --updates 50
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: {action_dim}
+    per_round: {action_dim}
+
+server:
+    address: 127.0.0.1
+    port: 8000
+    synchronous: {synchronous}
+
+data:
+    datasource: MNIST
+    partition_size: 100
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 10
+    epochs: 1
+    batch_size: 32
+    optimizer: SGD
+    model_name: lenet5
+
+algorithm:
+    type: fedavg
+    model_name: td3
+    max_action: 1
+    gamma: 0.99
+    tau: 0.005
+    learning_rate: 0.0003
+    policy_noise: 0.25
+    noise_clip: 0.5
+    policy_freq: 2
+    batch_size: {batch_size}
+    hidden_size: {hidden_size}
+    replay_size: {replay_size}
+    replay_seed: 1234
+    recurrent_actor: {recurrent_actor}
+
+parameters:
+    optimizer:
+        lr: 0.01
+
+general:
+    base_path: {base_path}
+"""
+
+
+def legacy_sample(arrays, batch_size, device):
+    """Samples a batch from NumPy arrays and converts it to tensors, as done before."""
+    import torch  # pylint: disable=import-outside-toplevel
+
+    ind = np.random.randint(0, len(arrays[0]), size=batch_size)
+    return [torch.FloatTensor(array[ind]).to(device) for array in arrays]
+
+
+def timed(function, repeat):
+    """Returns the average time in milliseconds of calling a function."""
+    started = time.perf_counter()
+    for __ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def transition(state_dim, action_dim, hidden_size, recurrent, synchronous):
+    """Returns a random transition to be pushed into the replay memory."""
+    import torch  # pylint: disable=import-outside-toplevel
+
+    if recurrent and not synchronous:
+        # A row for each of the clients that reported
+        rows = np.random.randint(1, action_dim + 1)
+        state = np.random.rand(rows, state_dim)
+        next_state = np.random.rand(rows, state_dim)
+        action = np.random.rand(action_dim, 1)
+    else:
+        state = np.random.rand(state_dim)
+        next_state = np.random.rand(state_dim)
+        action = np.random.rand(action_dim)
+
+    data = (state, action, np.random.rand(), next_state, 0.0)
+    if recurrent:
+        data += tuple(torch.rand(1, 1, hidden_size) for __ in range(4))
+
+    return data
+
+
+def batch_arrays(transitions, action_dim, synchronous):
+    """Returns the fields of recurrent transitions as arrays with one row for each
+    transition, with the states padded to `action_dim` rows in asynchronous mode."""
+    import torch  # pylint: disable=import-outside-toplevel
+
+    if synchronous:
+        arrays = [
+            np.stack([np.reshape(data[field], -1) for data in transitions])
+            for field in range(5)
+        ]
+    else:
+        arrays = []
+        for field in range(5):
+            values = [np.asarray(data[field]) for data in transitions]
+            if field in (0, 3):
+                padded = np.zeros((len(values), action_dim, values[0].shape[-1]))
+                for index, value in enumerate(values):
+                    padded[index, : len(value)] = value
+                values = padded
+            arrays.append(np.stack(values))
+
+    hidden_states = [
+        torch.cat([data[field] for data in transitions]) for field in range(5, 9)
+    ]
+    if synchronous:
+        return arrays + hidden_states
+
+    lengths = [[len(data[field]) for data in transitions] for field in (0, 3)]
+    return arrays + hidden_states + lengths
+
+
+def benchmark(args, recurrent, synchronous):
+    """Measures the replay memory of a TD3 policy in a mode."""
+    base_path = tempfile.mkdtemp()
+    config_file = os.path.join(base_path, "config.yml")
+    with open(config_file, "w", encoding="utf-8") as file:
+        file.write(
+            CONFIG.format(
+                action_dim=args.action_dim,
+                synchronous=str(synchronous).lower(),
+                batch_size=args.batch_size,
+                hidden_size=args.hidden_size,
+                replay_size=args.replay_size,
+                recurrent_actor=str(recurrent).lower(),
+                base_path=base_path,
+            )
+        )
+    os.environ["config_file"] = config_file
+
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    from plato.config import Config
+    from plato.utils.reinforcement_learning.policies import td3
+
+    Config._instance = None
+
+    policy = td3.Policy(args.state_dim, args.action_dim)
+    memory = policy.replay_buffer
+
+    transitions = [
+        transition(
+            args.state_dim, args.action_dim, args.hidden_size, recurrent, synchronous
+        )
+        for __ in range(args.transitions)
+    ]
+    started = time.perf_counter()
+    for data in transitions:
+        memory.push(data)
+    push_time = (time.perf_counter() - started) / len(transitions) * 1000
+
+    results = [("push", None, push_time)]
+
+    if not recurrent:
+        arrays = [
+            np.stack([np.reshape(data[field], -1) for data in transitions])
+            for field in range(5)
+        ]
+        results.append(
+            (
+                "sample",
+                timed(
+                    lambda: legacy_sample(arrays, args.batch_size, memory.device),
+                    args.samples,
+                ),
+                timed(memory.sample, args.samples),
+            )
+        )
+    else:
+        results.append(("sample", None, timed(memory.sample, args.samples)))
+        arrays = batch_arrays(transitions, args.action_dim, synchronous)
+
+    # Pushing the same transitions at once, which should store the same values
+    stored = {
+        name: value.clone()
+        for name, value in vars(memory).items()
+        if isinstance(value, torch.Tensor)
+    }
+    memory.ptr = memory.size = 0
+
+    started = time.perf_counter()
+    memory.push_batch(*arrays)
+    results.append(
+        (
+            "push batch",
+            None,
+            (time.perf_counter() - started) / len(transitions) * 1000,
+        )
+    )
+    for name, value in stored.items():
+        if not torch.equal(value, getattr(memory, name)):
+            raise ValueError(f"Pushing a batch stored different values in {name}.")
+
+    results.append(("update", None, timed(policy.update, args.updates)))
+
+    return results
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--state_dim", type=int, default=4)
+    parser.add_argument("--action_dim", type=int, default=10)
+    parser.add_argument("--hidden_size", type=int, default=256)
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--replay_size", type=int, default=10000)
+    parser.add_argument("--transitions", type=int, default=2000)
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.argv = sys.argv[:1]
+    logging.disable(logging.INFO)
+    np.random.seed(1)
+
+    print(f"{'actor':>16} {'operation':>12} {'before (ms)':>12} {'now (ms)':>10}")
+    for actor, recurrent, synchronous in (
+        ("fully connected", False, True),
+        ("LSTM, sync", True, True),
+        ("LSTM, async", True, False),
+    ):
+        for operation, before, now in benchmark(args, recurrent, synchronous):
+            before = "" if before is None else f"{before:.4f}"
+            print(f"{actor:>16} {operation:>12} {before:>12} {now:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
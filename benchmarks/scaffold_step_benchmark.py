@@ -0,0 +1,230 @@
+"""
+Measures the time it takes the SCAFFOLD trainer to correct the weights with the control
+variates after each training step, compared to the optimizer step itself.
+
+The correction is applied as before, moving the control variates to the device and
+subtracting them for each parameter in every step, and as done now, with the
+differences between the control variates computed once per round on the device and
+added to all the parameters of a parameter group at once. The weights and the new
+control variates computed both ways are also compared.
+
+Usage:
+
+python benchmarks/scaffold_step_benchmark.py --model_name resnet_18 --steps 50
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: 1
+    per_round: 1
+
+server:
+    address: 127.0.0.1
+    port: 8000
+
+data:
+    datasource: MNIST
+    partition_size: 100
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 1
+    epochs: 1
+    batch_size: 32
+    optimizer: SGD
+    model_name: {model_name}
+
+algorithm:
+    type: fedavg
+
+parameters:
+    optimizer:
+        lr: 0.01
+        momentum: 0.9
+        weight_decay: 0.0001
+
+general:
+    base_path: {base_path}
+"""
+
+
+def previous_train_step_end(trainer):
+    """The correction as applied before, in every step."""
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    for group in trainer.param_groups:
+        learning_rate = -group["lr"]
+        counter = 0
+        for name in trainer.server_control_variate:
+            if "weight" in name or "bias" in name:
+                server_control_variate = trainer.server_control_variate[name].to(
+                    trainer.device
+                )
+                param = group["params"][counter]
+                param.data.add_(
+                    torch.sub(
+                        server_control_variate,
+                        trainer.client_control_variate[name].to(trainer.device),
+                    ),
+                    alpha=learning_rate,
+                )
+                counter += 1
+
+
+def previous_train_run_end(trainer, epochs):
+    """The new client control variate as computed before."""
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    new_client_control_variate = {}
+    for name, previous_weight in trainer.global_model_weights.items():
+        new_client_control_variate[name] = torch.sub(
+            trainer.client_control_variate[name].to(device=trainer.device),
+            trainer.server_control_variate[name].to(device=trainer.device),
+        ).to(device=trainer.device)
+        new_client_control_variate[name].add_(
+            torch.sub(
+                previous_weight.to(device=trainer.device),
+                trainer.model.state_dict()[name],
+            ),
+            alpha=1 / epochs,
+        )
+    return new_client_control_variate
+
+
+def timed(function, steps, synchronize):
+    """Returns the average time in milliseconds of calling a function."""
+    function()
+    synchronize()
+    started = time.perf_counter()
+    for __ in range(steps):
+        function()
+    synchronize()
+    return (time.perf_counter() - started) / steps * 1000
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_name", type=str, default="lenet5")
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp()
+    config_file = os.path.join(base_path, "config.yml")
+    with open(config_file, "w", encoding="utf-8") as file:
+        file.write(CONFIG.format(model_name=args.model_name, base_path=base_path))
+    os.environ["config_file"] = config_file
+    sys.argv = sys.argv[:1]
+    sys.path.insert(
+        0, os.path.join(os.path.dirname(__file__), os.pardir, "examples", "scaffold")
+    )
+
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    import scaffold_trainer
+    from plato.config import Config
+
+    Config()
+    logging.disable(logging.INFO)
+    torch.manual_seed(1)
+
+    trainer = scaffold_trainer.Trainer()
+    trainer.model.to(trainer.device)
+    config = Config().trainer._asdict()
+
+    # Control variates as received from the server and loaded by the client, on
+    # the CPU
+    trainer.additional_data = {
+        name: torch.randn(weight.shape)
+        for name, weight in trainer.model.state_dict().items()
+    }
+    trainer.client_control_variate = {
+        name: torch.randn(weight.shape)
+        for name, weight in trainer.model.state_dict().items()
+    }
+    client_control_variate = trainer.client_control_variate
+    initial_weights = {
+        name: weight.clone() for name, weight in trainer.model.state_dict().items()
+    }
+
+    trainer.train_run_start(config)
+    optimizer = trainer.get_optimizer(trainer.model)
+
+    # The optimizer step, with gradients in place, for reference
+    for param in trainer.model.parameters():
+        param.grad = torch.randn_like(param)
+
+    if trainer.device.startswith("cuda"):
+        synchronize = torch.cuda.synchronize
+    else:
+        synchronize = lambda: None
+
+    parameters = sum(param.numel() for param in trainer.model.parameters())
+    print(f"{args.model_name}: {parameters} parameters on {trainer.device}.\n")
+    print(f"{'':>16} {'time (ms)':>10}")
+    optimizer_time = timed(optimizer.step, args.steps, synchronize)
+    print(f"{'optimizer step':>16} {optimizer_time:>10.3f}")
+
+    # Keeping the control variates on the CPU, as they were before
+    cpu_trainer = scaffold_trainer.Trainer.__new__(scaffold_trainer.Trainer)
+    cpu_trainer.__dict__.update(trainer.__dict__)
+    cpu_trainer.server_control_variate = trainer.additional_data
+    cpu_trainer.client_control_variate = client_control_variate
+
+    before = timed(lambda: previous_train_step_end(cpu_trainer), args.steps, synchronize)
+    now = timed(lambda: trainer.train_step_end(config), args.steps, synchronize)
+    print(f"{'correction':>16} {before:>10.3f} (before)")
+    print(f"{'':>16} {now:>10.3f} (now)\n")
+
+    def train_run_end():
+        trainer.train_run_end(config)
+        return trainer.client_control_variate
+
+    # Applying the same number of steps both ways from the same weights, and
+    # comparing the weights and the new control variates
+    results = []
+    for step_end, run_end in (
+        (
+            lambda: previous_train_step_end(cpu_trainer),
+            lambda: previous_train_run_end(cpu_trainer, config["epochs"]),
+        ),
+        (lambda: trainer.train_step_end(config), train_run_end),
+    ):
+        trainer.model.load_state_dict(initial_weights)
+        trainer.client_control_variate = {
+            name: variate.to(trainer.device)
+            for name, variate in client_control_variate.items()
+        }
+        optimizer.state.clear()
+        for __ in range(10):
+            optimizer.step()
+            step_end()
+        weights = {
+            name: weight.clone() for name, weight in trainer.model.state_dict().items()
+        }
+        results.append((weights, run_end()))
+
+    for index, label in enumerate(("weights", "control variates")):
+        difference = max(
+            (results[0][index][name].cpu() - results[1][index][name].cpu())
+            .abs()
+            .max()
+            .item()
+            for name in results[0][index]
+        )
+        print(f"Largest difference in the {label}: {difference:.3g}")
+
+
+if __name__ == "__main__":
+    main()
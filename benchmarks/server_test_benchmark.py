@@ -0,0 +1,158 @@
+"""
+Measures the time it takes the server to test the global model in each round, with a
+test set of MNIST-like images that are transformed as they are loaded, as torchvision's
+datasets do.
+
+The test set is tested as loaded by a DataLoader with the batch size of training, as
+done before, and as cached in tensors and tested in large batches (`cache_testset` in
+the `server` section, and `test_batch_size` in the `trainer` section), either in full
+or with a subset of its examples (`testset_size` in the `data` section).
+
+Usage:
+
+python benchmarks/server_test_benchmark.py --examples 10000 --test_batch_size 1000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: 1
+    per_round: 1
+
+server:
+    address: 127.0.0.1
+    port: 8000
+
+data:
+    datasource: MNIST
+    partition_size: 100
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 10
+    epochs: 1
+    batch_size: {batch_size}
+    test_batch_size: {test_batch_size}
+    optimizer: SGD
+    model_name: lenet5
+
+algorithm:
+    type: fedavg
+
+parameters:
+    optimizer:
+        lr: 0.01
+
+general:
+    base_path: {base_path}
+"""
+
+
+class ImageDataset:
+    """A dataset of grayscale images, which are transformed as they are loaded."""
+
+    def __init__(self, images, labels):
+        # pylint: disable=import-outside-toplevel
+        from torchvision import transforms
+
+        self.images = images
+        self.labels = labels
+        self.transform = transforms.Compose(
+            [transforms.ToTensor(), transforms.Normalize((0.1307,), (0.3081,))]
+        )
+
+    def __len__(self):
+        return len(self.images)
+
+    def __getitem__(self, index):
+        # pylint: disable=import-outside-toplevel
+        from PIL import Image
+
+        image = Image.fromarray(self.images[index], mode="L")
+        return self.transform(image), int(self.labels[index])
+
+
+def timed(function, repeat):
+    """Returns the average time in milliseconds of calling a function."""
+    started = time.perf_counter()
+    for __ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--examples", type=int, default=10000)
+    parser.add_argument("--subset", type=int, default=2000)
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--test_batch_size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp()
+    config_file = os.path.join(base_path, "config.yml")
+    with open(config_file, "w", encoding="utf-8") as file:
+        file.write(
+            CONFIG.format(
+                batch_size=args.batch_size,
+                test_batch_size=args.test_batch_size,
+                base_path=base_path,
+            )
+        )
+    os.environ["config_file"] = config_file
+    sys.argv = sys.argv[:1]
+
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    from plato.config import Config
+    from plato.trainers import basic
+    from plato.utils import testset_cache
+
+    Config()
+    logging.disable(logging.INFO)
+    torch.manual_seed(1)
+
+    generator = np.random.default_rng(1)
+    testset = ImageDataset(
+        generator.integers(0, 256, (args.examples, 28, 28), dtype=np.uint8),
+        generator.integers(0, 10, args.examples),
+    )
+    subset = generator.choice(args.examples, args.subset, replace=False)
+
+    trainer = basic.Trainer()
+    config = Config().trainer._asdict()
+    uncached_config = dict(config, test_batch_size=args.batch_size)
+
+    started = time.perf_counter()
+    cached_testset = testset_cache.cache_testset(testset)
+    caching_time = (time.perf_counter() - started) * 1000
+    cached_subset = testset_cache.cache_testset(testset, subset)
+
+    print(f"Caching {args.examples} examples took {caching_time:.1f} ms.\n")
+    print(f"{'test set':>10} {'before (ms)':>12} {'now (ms)':>10}")
+
+    before = timed(lambda: trainer.test_model(uncached_config, testset), args.repeat)
+    now = timed(lambda: trainer.test_model(config, cached_testset), args.repeat)
+    print(f"{'full':>10} {before:>12.1f} {now:>10.1f}")
+
+    sampler = torch.utils.data.SubsetRandomSampler(subset)
+    before = timed(
+        lambda: trainer.test_model(uncached_config, testset, sampler), args.repeat
+    )
+    now = timed(lambda: trainer.test_model(config, cached_subset), args.repeat)
+    print(f"{'subset':>10} {before:>12.1f} {now:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Measures the time it takes a client process to import Plato and the components of an
+MNIST/LeNet-5 training session, as every client process launched by the server does.
+
+The registries of data sources, models, processors, samplers, trainers and algorithms
+are measured as they are now, where only the components that are used get imported,
+and with all of their components imported, as the registries did before. The import
+times are reported by `python -X importtime` in fresh processes.
+
+Usage:
+
+python benchmarks/startup_benchmark.py --repeat 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: 1
+    per_round: 1
+
+server:
+    address: 127.0.0.1
+    port: 8000
+
+data:
+    datasource: MNIST
+    partition_size: 100
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 1
+    epochs: 1
+    batch_size: 32
+    optimizer: SGD
+    model_name: lenet5
+
+algorithm:
+    type: fedavg
+
+parameters:
+    optimizer:
+        lr: 0.01
+
+general:
+    base_path: {base_path}
+"""
+
+STARTUP = """
+import sys
+
+sys.argv = sys.argv[:1]
+
+from plato.algorithms import registry as algorithms_registry
+from plato.clients import simple
+from plato.datasources import registry as datasources_registry
+from plato.models import registry as models_registry
+from plato.processors import registry as processor_registry
+from plato.samplers import registry as samplers_registry
+from plato.trainers import registry as trainers_registry
+
+registries = [
+    algorithms_registry.registered_algorithms,
+    datasources_registry.registered_datasources,
+    models_registry.registered_models,
+    models_registry.registered_factories,
+    processor_registry.registered_processors,
+    samplers_registry.registered_samplers,
+    trainers_registry.registered_trainers,
+]
+
+if "{mode}" == "eager":
+    for registry in registries:
+        for name in registry:
+            try:
+                registry[name]
+            except Exception:  # Components whose dependencies are not installed
+                pass
+
+trainer = trainers_registry.get()
+algorithms_registry.get(trainer)
+datasources_registry.registered_datasources["MNIST"]
+samplers_registry.registered_samplers["iid"]
+processor_registry.get("Client")
+"""
+
+
+def run(mode, config_file):
+    """Starts a process importing the components, and returns its wall-clock time in
+    seconds, the number of modules it imported, and the import times reported for
+    each top-level module."""
+    environment = dict(os.environ, config_file=config_file)
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP.replace("{mode}", mode)],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_time = time.perf_counter() - started
+
+    # Each line is "import time: self [us] | cumulative | imported package", where the
+    # packages imported by another are indented
+    imported = 0
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        __, cumulative, name = line[len("import time:") :].split("|")
+        imported += 1
+        if not name[1:].startswith(" "):
+            modules[name.strip()] = int(cumulative) / 1e6
+
+    return wall_time, imported, modules
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp()
+    config_file = os.path.join(base_path, "config.yml")
+    with open(config_file, "w", encoding="utf-8") as file:
+        file.write(CONFIG.format(base_path=base_path))
+
+    results = {}
+    for mode in ("eager", "lazy"):
+        runs = [run(mode, config_file) for __ in range(args.repeat)]
+        results[mode] = min(runs, key=lambda result: result[0])
+
+    print(f"{'':>12} {'before (s)':>12} {'now (s)':>10}")
+    eager_time, eager_imported, eager_modules = results["eager"]
+    lazy_time, lazy_imported, lazy_modules = results["lazy"]
+    print(f"{'process':>12} {eager_time:>12.2f} {lazy_time:>10.2f}")
+    print(
+        f"{'imports':>12} {sum(eager_modules.values()):>12.2f} "
+        f"{sum(lazy_modules.values()):>10.2f}"
+    )
+    print(f"{'modules':>12} {eager_imported:>12} {lazy_imported:>10}\n")
+
+    print("The top-level imports that took the longest before (s):\n")
+    heaviest = sorted(eager_modules, key=eager_modules.get, reverse=True)[: args.top]
+    for name in heaviest:
+        print(
+            f"{name:>40} {eager_modules[name]:>8.2f} {lazy_modules.get(name, 0):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Measures the time of training and testing a small model for a number of rounds with
+`max_concurrency` set, comparing the persistent training worker against starting a new
+process for every run and exchanging the model and the accuracy through files.
+
+The data set is random, and the model is LeNet-5, so that the time of each run is
+dominated by the overheads being measured rather than by the training itself.
+
+Usage:
+
+python benchmarks/training_worker_benchmark.py --rounds 5
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+import torch
+from torch.utils.data import SubsetRandomSampler, TensorDataset
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: 1
+    per_round: 1
+    do_test: true
+
+server:
+    address: 127.0.0.1
+    port: 8000
+
+data:
+    datasource: MNIST
+    partition_size: {partition_size}
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 1
+    max_concurrency: 1
+    epochs: 1
+    batch_size: 32
+    optimizer: SGD
+    model_name: lenet5
+
+algorithm:
+    type: fedavg
+
+parameters:
+    optimizer:
+        lr: 0.01
+        momentum: 0.9
+        weight_decay: 0.0
+
+general:
+    base_path: {base_path}
+"""
+
+
+class Sampler:
+    """Samples a fixed partition of the data set."""
+
+    def __init__(self, indices):
+        self.indices = indices
+
+    def get(self):
+        """Returns the PyTorch sampler of the partition."""
+        return SubsetRandomSampler(self.indices)
+
+
+def spawned_train(trainer, trainset, sampler):
+    """Training as done before the persistent worker: in a new process, with the
+    trained model saved to a file and loaded back."""
+    # pylint: disable=import-outside-toplevel
+    from plato.config import Config
+
+    config = Config().trainer._asdict()
+    config["run_id"] = Config().params["run_id"]
+
+    process = mp.Process(target=trainer.train_process, args=(config, trainset, sampler))
+    process.start()
+    process.join()
+
+    trainer.load_model(f"lenet5_{trainer.client_id}_{config['run_id']}.pth")
+    trainer.pause_training()
+
+
+def spawned_test(trainer, testset, sampler):
+    """Testing as done before the persistent worker: in a new process, with the
+    accuracy saved to a file and loaded back."""
+    # pylint: disable=import-outside-toplevel
+    from plato.config import Config
+
+    config = Config().trainer._asdict()
+    config["run_id"] = Config().params["run_id"]
+
+    process = mp.Process(target=trainer.test_process, args=(config, testset, sampler))
+    process.start()
+    process.join()
+
+    accuracy = trainer.load_accuracy(
+        f"lenet5_{trainer.client_id}_{config['run_id']}.acc"
+    )
+    trainer.pause_training()
+
+    return accuracy
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=10000)
+    parser.add_argument("--partition_size", type=int, default=200)
+    args = parser.parse_args()
+
+    base_path = tempfile.mkdtemp()
+    config_file = os.path.join(base_path, "config.yml")
+    with open(config_file, "w", encoding="utf-8") as file:
+        file.write(
+            CONFIG.format(partition_size=args.partition_size, base_path=base_path)
+        )
+
+    # Read by the configuration in this process and in the processes it spawns
+    os.environ["config_file"] = config_file
+    sys.argv = sys.argv[:1]
+    mp.set_start_method("spawn")
+
+    # pylint: disable=import-outside-toplevel
+    from plato.trainers import basic
+
+    torch.manual_seed(1)
+    dataset = TensorDataset(
+        torch.randn(args.samples, 1, 28, 28), torch.randint(0, 10, (args.samples,))
+    )
+    sampler = Sampler(list(range(args.partition_size)))
+
+    trainer = basic.Trainer()
+    trainer.set_client_id(1)
+
+    print(f"{'method':>10} {'round':>6} {'train (s)':>10} {'test (s)':>10}")
+
+    for method in ("spawned", "worker"):
+        for current_round in range(1, args.rounds + 1):
+            started = time.perf_counter()
+            if method == "spawned":
+                spawned_train(trainer, dataset, sampler)
+            else:
+                trainer.train(dataset, sampler)
+            trained = time.perf_counter()
+
+            if method == "spawned":
+                spawned_test(trainer, dataset, sampler)
+            else:
+                trainer.test(dataset, sampler)
+            tested = time.perf_counter()
+
+            print(
+                f"{method:>10} {current_round:>6} {trained - started:>10.2f} "
+                f"{tested - trained:>10.2f}"
+            )
+
+    trainer.training_worker.close()
+
+
+if __name__ == "__main__":
+    main()
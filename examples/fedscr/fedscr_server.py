@@ -3,11 +3,11 @@ A federated learning server using FedSCR. The server extracts the model updates
 aggregates them and adds them to the global model from the previous round.
 """
 
-import os
 import numpy as np
 
 from plato.servers import fedavg
 from plato.config import Config
+from plato.utils import client_state
 
 
 class Server(fedavg.Server):
@@ -103,11 +103,5 @@ class Server(fedavg.Server):
 
     def server_will_close(self):
         """Method called at the start of closing the server."""
-        model_name = Config().trainer.model_name
-        checkpoint_path = Config().params["checkpoint_path"]
-
-        # Delete files created by the clients.
-        for client_id in range(1, self.total_clients + 1):
-            acc_grad_file = f"{checkpoint_path}/{model_name}_client{client_id}_grad.pth"
-            if os.path.exists(acc_grad_file):
-                os.remove(acc_grad_file)
+        # Delete the accumulated gradients saved by the clients
+        client_state.get().remove(name="acc_grads")
@@ -4,14 +4,13 @@ The training loop that takes place on clients of FedSCR.
 from collections import OrderedDict
 
 import copy
-import pickle
-import os
 import logging
 import torch
 import numpy as np
 
 from plato.config import Config
 from plato.trainers import basic
+from plato.utils import client_state
 
 
 class Trainer(basic.Trainer):
@@ -54,10 +53,10 @@ class Trainer(basic.Trainer):
             if isinstance(
                 trained_module, (torch.nn.Conv1d, torch.nn.Conv2d, torch.nn.Conv3d)
             ):
-                orig_tensor = orig_module.weight.data.cpu().numpy()
-                trained_tensor = trained_module.weight.data.cpu().numpy()
+                orig_tensor = orig_module.weight.data
+                trained_tensor = trained_module.weight.data
                 delta = trained_tensor - orig_tensor + self.acc_grads[i]
-                orig_delta = copy.deepcopy(delta)
+                orig_delta = delta.clone()
 
                 aggregated_channels = self.aggregate_channels(delta)
                 aggregated_filters = self.aggregate_filters(delta)
@@ -79,83 +78,43 @@ class Trainer(basic.Trainer):
                 delta = trained_tensor - orig_tensor
                 self.total_grad[orig_key] = delta
             else:
-                self.total_grad[orig_key] = torch.from_numpy(conv_updates[orig_key])
+                self.total_grad[orig_key] = conv_updates[orig_key]
 
         self.save_acc_grads()
 
-    def aggregate_channels(self, delta):
+    @staticmethod
+    def aggregate_channels(delta):
         """Aggregate the sum of a certain channel from all filters."""
-        num_channels = delta.shape[1]
-        num_filters = delta.shape[0]
-        aggregated_channels = [None] * num_channels
+        # The absolute values are summed over the filters first, then over the kernel,
+        # in the same order as the sums were computed one channel at a time
+        return delta.abs().sum(dim=0).flatten(start_dim=1).sum(dim=1)
 
-        for channel_index in range(num_channels):
-            tensor_sum = 0
-            for filters in range(num_filters):
-                tensor_sum += np.abs(delta[filters, channel_index, :, :])
-            aggregated_channels[channel_index] = tensor_sum
-
-        for index, __ in enumerate(aggregated_channels):
-            aggregated_channels[index] = np.sum(aggregated_channels[index])
-
-        return aggregated_channels
-
-    def aggregate_filters(self, delta):
+    @staticmethod
+    def aggregate_filters(delta):
         """Aggregate the sum of all channels from a single filter."""
-        num_channels = delta.shape[1]
-        num_filters = delta.shape[0]
-        aggregated_filters = [None] * num_filters
-
-        for filter_index in range(num_filters):
-            tensor_sum = 0
-            for channel in range(num_channels):
-                tensor_sum += np.abs(delta[filter_index, channel, :, :])
-            aggregated_filters[filter_index] = tensor_sum
-
-        for index, __ in enumerate(aggregated_filters):
-            aggregated_filters[index] = np.sum(aggregated_filters[index])
-
-        return aggregated_filters
+        return delta.abs().sum(dim=1).flatten(start_dim=1).sum(dim=1)
 
     def prune_channels(self, aggregated_channels, delta):
         """Prune the channels in update that lie below the FedSCR threshold."""
-        for i, norm in enumerate(aggregated_channels):
-            if norm < self.update_threshold:
-                delta[:, i, :, :] = 0
-
-        return delta
+        pruned = aggregated_channels < self.update_threshold
+        return delta.masked_fill_(pruned.view(1, -1, *[1] * (delta.dim() - 2)), 0)
 
     def prune_filters(self, aggregated_filters, delta):
         """Prune the filters in update that lie below the FedSCR threshold."""
-        for i, norm in enumerate(aggregated_filters):
-            if norm < self.update_threshold:
-                delta[i, :, :, :] = 0
-
-        return delta
+        pruned = aggregated_filters < self.update_threshold
+        return delta.masked_fill_(pruned.view(-1, *[1] * (delta.dim() - 1)), 0)
 
     def save_acc_grads(self):
         """Save the accumulated client gradients for the next communication round."""
-        model_name = Config().trainer.model_name
-        checkpoint_path = Config().params["checkpoint_path"]
-
-        acc_grad_path = (
-            f"{checkpoint_path}/{model_name}_client{self.client_id}_grad.pth"
-        )
-        with open(acc_grad_path, "wb") as payload_file:
-            pickle.dump(self.acc_grads, payload_file)
+        client_state.get().put(self.client_id, "acc_grads", self.acc_grads)
 
     def load_acc_grads(self):
         """Load the accumulated gradients from a previous communication round."""
-        model_name = Config().trainer.model_name
-        checkpoint_path = Config().params["checkpoint_path"]
-
-        if not os.path.exists(checkpoint_path):
-            os.makedirs(checkpoint_path)
-
-        grad_path = f"{checkpoint_path}/{model_name}_client{self.client_id}_grad.pth"
-        if os.path.exists(grad_path):
-            with open(grad_path, "rb") as payload_file:
-                self.acc_grads = pickle.load(payload_file)
+        acc_grads = client_state.get().get(self.client_id, "acc_grads")
+        if acc_grads is not None:
+            self.acc_grads = [
+                torch.as_tensor(acc_grad, device=self.device) for acc_grad in acc_grads
+            ]
         else:
             count = 0
             for module in self.model.modules():
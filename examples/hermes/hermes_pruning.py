@@ -4,11 +4,10 @@ Utility functions for pruning.
 
 import copy
 from math import floor
-import os
 import numpy as np
 import torch
 from torch.nn.utils import prune
-from plato.config import Config
+from plato.utils import client_state
 
 
 def make_init_mask(model):
@@ -35,12 +34,7 @@ def compute_pruned_amount(model, client_id):
     :param model: a pytorch model
     :return pruned percentage, number of remaining weights:
     """
-    model_name = Config().trainer.model_name
-    checkpoint_path = Config().params["checkpoint_path"]
-
-    mask_path = f"{checkpoint_path}/{model_name}_client{client_id}_mask.pth"
-
-    if not os.path.exists(mask_path):
+    if not client_state.get().contains(client_id, "mask"):
         return 0
 
     nonzero = 0
@@ -127,9 +121,8 @@ def apply_mask(model, mask, device):
     """Apply the mask onto the model."""
 
     masked_model = copy.deepcopy(model).to(device)
-    if not torch.is_tensor(mask[0]):
-        for step, __ in enumerate(mask):
-            mask[step] = torch.from_numpy(mask[step])
+    # The mask is kept in the store of client states, so it is not modified here
+    mask = [torch.as_tensor(layer_mask) for layer_mask in mask]
 
     step = 0
     for module in masked_model.modules():
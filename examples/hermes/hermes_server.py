@@ -3,14 +3,14 @@ A federated learning server using Hermes.
 """
 
 import logging
-import os
-import pickle
+from collections import OrderedDict
+
 import numpy as np
 import torch
 
 import hermes_pruning as pruning
 from plato.servers import fedavg
-from plato.config import Config
+from plato.utils import client_state
 
 
 class Server(fedavg.Server):
@@ -26,8 +26,9 @@ class Server(fedavg.Server):
             trainer=trainer,
             callbacks=callbacks,
         )
-        self.clients_first_time = [True for _ in range(Config().clients.total_clients)]
-        self.personalized_models = []
+        # The personalized models are only used by the server, so they are kept in
+        # memory, and only saved to files if they do not fit
+        self.personalized_models = client_state.ClientStateStore(write_back=True)
         self.masks_received = []
 
     async def aggregate_weights(self, updates, baseline_weights, weights_received):
@@ -42,6 +43,10 @@ class Server(fedavg.Server):
 
         step = 0
 
+        # The parameters kept by all the clients are averaged into the global model,
+        # and the others keep their values from the previous round
+        global_weights = OrderedDict()
+
         masked_layers = []
         for name, module in self.trainer.model.named_modules():
             if isinstance(module, (torch.nn.Conv2d, torch.nn.Linear)):
@@ -69,6 +74,12 @@ class Server(fedavg.Server):
                     model[layer_name] = torch.from_numpy(
                         model[layer_name].reshape(shape)
                     )
+
+                global_weight = baseline_weights[layer_name].cpu().clone()
+                global_weight.reshape([-1])[torch.from_numpy(ind)] = torch.from_numpy(
+                    final_avg[ind]
+                ).to(global_weight.dtype)
+                global_weights[layer_name] = global_weight
                 step = step + 1
             else:
                 avg = np.zeros_like(weights_received[0][layer_name].reshape([-1]))
@@ -84,58 +95,46 @@ class Server(fedavg.Server):
                 new_tensor = torch.from_numpy(avg.reshape(shape))
                 for model in weights_received:
                     model[layer_name] = new_tensor
+                global_weights[layer_name] = new_tensor
 
-        self.save_personalized_models(self.personalized_models, updates)
-        return weights_received
+        # Each client's personalized model is only kept by the server
+        self.save_personalized_models(weights_received, updates)
+        return global_weights
 
     def save_personalized_models(self, personalized_models, updates):
         """Save each client's personalized model."""
         for (personalized_model, update) in zip(personalized_models, updates):
-            model_name = (
-                Config().trainer.model_name
-                if hasattr(Config().trainer, "model_name")
-                else "custom"
-            )
-            model_path = Config().params["model_path"]
-            filename = (
-                f"{model_path}/personalized_{model_name}_client{update.client_id}.pth"
+            self.personalized_models.put(
+                update.client_id, "personalized_model", personalized_model
             )
-            with open(filename, "wb") as payload_file:
-                pickle.dump(personalized_model, payload_file)
             logging.info(
-                "[%s] Saved client #%d's personalized model in: %s",
-                self,
-                update.client_id,
-                filename,
+                "[%s] Saved client #%d's personalized model.", self, update.client_id
             )
 
+    def choose_clients(self, clients_pool, clients_count):
+        """Chooses the clients, and prefetches their personalized models."""
+        selected_clients = super().choose_clients(clients_pool, clients_count)
+        self.personalized_models.prefetch(selected_clients, ["personalized_model"])
+
+        return selected_clients
+
     def customize_server_payload(self, payload):
         """Customizes the server payload before sending to the client."""
 
         # If the client has already begun the learning of a personalized model
-        # in a previous communication round, the personalized file is loaded and
-        # sent to the client for continued training. Otherwise, if the client is
+        # in a previous communication round, the personalized model is sent to
+        # the client for continued training. Otherwise, if the client is
         # selected for the first time, it receives the pre-initialized model.
-        model_name = (
-            Config().trainer.model_name
-            if hasattr(Config().trainer, "model_name")
-            else "custom"
+        personalized_model = self.personalized_models.get(
+            self.selected_client_id, "personalized_model"
         )
-        model_path = Config().params["model_path"]
-        if not self.clients_first_time[self.selected_client_id - 1]:
-            filename = (
-                f"{model_path}/personalized_{model_name}"
-                f"_client{self.selected_client_id}.pth"
-            )
-            with open(filename, "rb") as payload_file:
-                payload = pickle.load(payload_file)
+        if personalized_model is not None:
+            payload = personalized_model
             logging.info(
                 "[%s] Loaded client #%d's personalized model",
                 self,
                 self.selected_client_id,
             )
-        else:
-            self.clients_first_time[self.selected_client_id - 1] = False
 
         return payload
 
@@ -155,9 +154,5 @@ class Server(fedavg.Server):
     def server_will_close(self):
         """Method called at the start of closing the server."""
         # Delete pruning masks created by clients
-        model_name = Config().trainer.model_name
-        checkpoint_path = Config().params["checkpoint_path"]
-        for client_id in range(1, self.total_clients + 1):
-            mask_path = f"{checkpoint_path}/{model_name}_client{client_id}_mask.pth"
-            if os.path.exists(mask_path):
-                os.remove(mask_path)
+        client_state.get().remove(name="mask")
+        self.personalized_models.remove(name="personalized_model")
@@ -3,14 +3,12 @@ The training loop that takes place on clients.
 """
 
 import logging
-import os
-
-import pickle
 
 import hermes_pruning as pruning
 from plato.config import Config
 from plato.datasources import registry as datasources_registry
 from plato.trainers import basic
+from plato.utils import client_state
 
 
 class Trainer(basic.Trainer):
@@ -91,28 +89,12 @@ class Trainer(basic.Trainer):
 
     def merge_model(self, model):
         """Apply the mask onto the incoming personalized model."""
-        model_name = Config().trainer.model_name
-        checkpoint_path = Config().params["checkpoint_path"]
-
-        mask_path = f"{checkpoint_path}/{model_name}_client{self.client_id}_mask.pth"
-        if not os.path.exists(mask_path):
+        mask = client_state.get().get(self.client_id, "mask")
+        if mask is None:
             return self.model
-        else:
-            with open(mask_path, "rb") as mask_file:
-                mask = pickle.load(mask_file)
 
         return pruning.apply_mask(model, mask, self.device)
 
     def save_mask(self, mask):
         """If pruning has occured, the mask is saved for merging in future rounds."""
-
-        model_name = Config().trainer.model_name
-        checkpoint_path = Config().params["checkpoint_path"]
-
-        if not os.path.exists(checkpoint_path):
-            os.makedirs(checkpoint_path)
-
-        mask_path = f"{checkpoint_path}/{model_name}_client{self.client_id}_mask.pth"
-
-        with open(mask_path, "wb") as payload_file:
-            pickle.dump(mask, payload_file)
+        client_state.get().put(self.client_id, "mask", mask)
@@ -112,14 +112,7 @@ class Server(fedavg.Server):
 
                 # Loading the saved model on the server for starting the retraining phase
                 checkpoint_path = Config.params["checkpoint_path"]
-
-                model_name = (
-                    Config().trainer.model_name
-                    if hasattr(Config().trainer, "model_name")
-                    else "custom"
-                )
-                filename = f"checkpoint_{model_name}_{self.current_round}.pth"
-                self.trainer.load_model(filename, checkpoint_path)
+                self.load_checkpoint_model(self.current_round)
 
                 logging.info(
                     "[Server #%d] Model used for the retraining phase loaded from %s.",
@@ -32,19 +32,22 @@ class Server(fedavg.Server):
         )
 
         # Clients that will no longer be selected for future rounds.
-        self.blacklist = []
+        self.blacklist = set()
+
+        # The statistics of all the clients are kept in arrays indexed by client id,
+        # whose first elements are unused
 
         # All clients' utilities
-        self.client_utilities = {}
+        self.client_utilities = np.zeros(1)
 
         # All clients‘ training times
-        self.client_durations = {}
+        self.client_durations = np.zeros(1)
 
         # Keep track of each client's last participated round.
-        self.client_last_rounds = {}
+        self.client_last_rounds = np.zeros(1, dtype=int)
 
         # Number of times that each client has been selected
-        self.client_selected_times = {}
+        self.client_selected_times = np.zeros(1, dtype=int)
 
         # The desired duration for each communication round
         self.desired_duration = Config().server.desired_duration
@@ -77,18 +80,10 @@ class Server(fedavg.Server):
         """Initialize necessary variables."""
         super().configure()
 
-        self.client_utilities = {
-            client_id: 0 for client_id in range(1, self.total_clients + 1)
-        }
-        self.client_durations = {
-            client_id: 0 for client_id in range(1, self.total_clients + 1)
-        }
-        self.client_last_rounds = {
-            client_id: 0 for client_id in range(1, self.total_clients + 1)
-        }
-        self.client_selected_times = {
-            client_id: 0 for client_id in range(1, self.total_clients + 1)
-        }
+        self.client_utilities = np.zeros(self.total_clients + 1)
+        self.client_durations = np.zeros(self.total_clients + 1)
+        self.client_last_rounds = np.zeros(self.total_clients + 1, dtype=int)
+        self.client_selected_times = np.zeros(self.total_clients + 1, dtype=int)
 
         self.unexplored_clients = list(range(1, self.total_clients + 1))
 
@@ -121,7 +116,7 @@ class Server(fedavg.Server):
         # Blacklist clients who have been selected self.blacklist_num times
         for update in updates:
             if self.client_selected_times[update.client_id] > self.blacklist_num:
-                self.blacklist.append(update.client_id)
+                self.blacklist.add(update.client_id)
 
     def choose_clients(self, clients_pool, clients_count):
         """Choose a subset of the clients to participate in each round."""
@@ -134,57 +129,61 @@ class Server(fedavg.Server):
                 clients_count - len(self.unexplored_clients),
             )
 
-            sorted_util = sorted(
-                self.client_utilities, key=self.client_utilities.get, reverse=True
-            )
+            utilities = self.client_utilities[1:]
 
-            # Calculate cut-off utility
-            cut_off_util = (
-                self.client_utilities[sorted_util[exploit_client_num - 1]]
-                * self.cut_off
-            )
+            # Calculate cut-off utility, from the utility ranked `exploit_client_num`
+            if exploit_client_num > 0:
+                kth = len(utilities) - exploit_client_num
+                cut_off_util = np.partition(utilities, kth)[kth] * self.cut_off
+            else:
+                cut_off_util = utilities.min() * self.cut_off
 
-            # Include clients with utilities higher than the cut-off
-            exploit_clients = []
-            for client_id in sorted_util:
-                if (
-                    self.client_utilities[client_id] > cut_off_util
-                    and client_id not in self.blacklist
-                    and client_id in clients_pool
-                ):
-                    exploit_clients.append(client_id)
+            # Rank the clients with utilities higher than the cut-off, with ties broken
+            # by client ids
+            exploit_clients = np.flatnonzero(utilities > cut_off_util)
+            exploit_clients = exploit_clients[
+                np.argsort(-utilities[exploit_clients], kind="stable")
+            ]
 
-            # Sample clients with their utilities
-            utility_sum = float(
-                sum(self.client_utilities[client_id] for client_id in exploit_clients)
-            )
+            # Include those that can be selected
+            blacklisted = np.zeros(len(utilities), dtype=bool)
+            blacklisted[np.fromiter(self.blacklist, dtype=int, count=-1) - 1] = True
+            selectable = np.zeros(len(utilities), dtype=bool)
+            selectable[np.asarray(clients_pool, dtype=int) - 1] = True
+            selectable &= ~blacklisted
 
-            probabilities = [
-                self.client_utilities[client_id] / utility_sum
-                for client_id in exploit_clients
-            ]
+            exploit_clients = exploit_clients[selectable[exploit_clients]]
+            exploit_utilities = utilities[exploit_clients]
+            exploit_clients += 1
+
+            # Sample clients with their utilities
+            if len(exploit_clients) > 0 and exploit_client_num > 0:
+                # Summed up in order, as the probabilities are to add up to one
+                utility_sum = float(np.cumsum(exploit_utilities)[-1])
 
-            if len(probabilities) > 0 and exploit_client_num > 0:
                 selected_clients = np.random.choice(
                     exploit_clients,
                     min(len(exploit_clients), exploit_client_num),
-                    p=probabilities,
+                    p=exploit_utilities / utility_sum,
                     replace=False,
                 )
                 selected_clients = selected_clients.tolist()
 
-            last_index = (
-                sorted_util.index(exploit_clients[-1]) if exploit_clients else 0
-            )
-
-            # If the result of exploitation wasn't enough to meet the required length
+            # If the result of exploitation wasn't enough to meet the required length,
+            # include the clients ranked right after the last exploited client
             if len(selected_clients) < exploit_client_num:
-                for index in range(last_index + 1, len(sorted_util)):
-                    if (
-                        not sorted_util[index] in self.blacklist
-                        and len(selected_clients) < exploit_client_num
-                    ):
-                        selected_clients.append(sorted_util[index])
+                sorted_util = np.argsort(-utilities, kind="stable")
+                last_index = (
+                    np.flatnonzero(sorted_util == exploit_clients[-1] - 1)[0]
+                    if len(exploit_clients) > 0
+                    else 0
+                )
+
+                remaining_clients = sorted_util[last_index + 1 :]
+                remaining_clients = remaining_clients[~blacklisted[remaining_clients]]
+                selected_clients += (
+                    remaining_clients[: exploit_client_num - len(selected_clients)] + 1
+                ).tolist()
 
         # Exploration
         random.setstate(self.prng_state)
@@ -197,8 +196,12 @@ class Server(fedavg.Server):
         self.prng_state = random.getstate()
         self.explored_clients += selected_unexplore_clients
 
-        for client_id in selected_unexplore_clients:
-            self.unexplored_clients.remove(client_id)
+        explored_now = set(selected_unexplore_clients)
+        self.unexplored_clients = [
+            client_id
+            for client_id in self.unexplored_clients
+            if client_id not in explored_now
+        ]
 
         selected_clients += selected_unexplore_clients
 
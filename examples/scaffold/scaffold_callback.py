@@ -2,12 +2,11 @@
 Customize the list of inbound and outbound processors for scaffold clients through callbacks.
 """
 import logging
-import os
-import pickle
 from typing import Any, List
 
 from plato.callbacks.client import ClientCallback
 from plato.processors import base
+from plato.utils import client_state
 
 
 class ExtractControlVariatesProcessor(base.Processor):
@@ -46,18 +45,16 @@ class SendControlVariateProcessor(base.Processor):
         self.trainer = trainer
 
     def process(self, data: Any) -> List:
-        client_control_variate_filename = self.trainer.client_control_variate_path
-        if os.path.exists(client_control_variate_filename):
-            with open(client_control_variate_filename, "rb") as payload_file:
-                client_control_variate = pickle.load(payload_file)
-                data = [data, client_control_variate]
+        client_control_variate = client_state.get().get(
+            self.client_id, "control_variate"
+        )
+        data = [data, client_control_variate]
 
+        if client_control_variate is not None:
             logging.info(
                 "[Client #%d] Control variates were attached to the payload.",
                 self.client_id,
             )
-        else:
-            data = [data, None]
 
         return data
 
@@ -9,13 +9,8 @@ in Proceedings of the 37th International Conference on Machine Learning (ICML),
 https://arxiv.org/pdf/1910.06378.pdf
 """
 
-import logging
-import os
-
-import pickle
-
 from plato.clients import simple
-from plato.config import Config
+from plato.utils import client_state
 
 
 class Client(simple.Client):
@@ -45,19 +40,7 @@ class Client(simple.Client):
         super().configure()
 
         # Load the client control variate if the client has participated before
-        model_path = Config().params["model_path"]
-        model_name = Config().trainer.model_name
-        filename = f"{model_name}_{self.client_id}_control_variate.pth"
-        client_control_variate_path = f"{model_path}/{filename}"
-
-        if os.path.exists(client_control_variate_path):
-            logging.info(
-                "[Client #%d] Loading the control variate from %s.",
-                self.client_id,
-                client_control_variate_path,
-            )
-            with open(client_control_variate_path, "rb") as path:
-                self.client_control_variate = pickle.load(path)
-            self.trainer.client_control_variate = self.client_control_variate
-
-        self.trainer.client_control_variate_path = client_control_variate_path
+        self.client_control_variate = client_state.get().get(
+            self.client_id, "control_variate"
+        )
+        self.trainer.client_control_variate = self.client_control_variate
@@ -12,11 +12,11 @@ from collections import OrderedDict
 
 import copy
 import logging
-import pickle
 import torch
 
 from plato.config import Config
 from plato.trainers import basic
+from plato.utils import client_state
 
 
 class Trainer(basic.Trainer):
@@ -33,103 +33,91 @@ class Trainer(basic.Trainer):
         # using the Option 2 in the paper
         self.global_model_weights = None
 
-        # Path to the client control variate
-        self.client_control_variate_path = None
-
         self.additional_data = None
         self.param_groups = None
 
+        # The server control variate minus the client control variate, for the
+        # parameters of each parameter group, in the same order
+        self.corrections = None
+
     def get_optimizer(self, model):
-        """Gets the parameter groups from the optimizer"""
+        """Gets the parameter groups from the optimizer, and the corrections to be
+        applied to their parameters after each step."""
         optimizer = super().get_optimizer(model)
         self.param_groups = optimizer.param_groups
+
+        parameter_names = {
+            parameter: name for name, parameter in model.named_parameters()
+        }
+        corrections = {
+            name: torch.sub(
+                self.server_control_variate[name], self.client_control_variate[name]
+            )
+            for name in self.server_control_variate
+            if "weight" in name or "bias" in name
+        }
+        self.corrections = [
+            [corrections[parameter_names[param]] for param in group["params"]]
+            for group in self.param_groups
+        ]
+
         return optimizer
 
     def train_run_start(self, config):
-        """Initializes the client control variate to 0 if the client
-        is participating for the first time.
+        """Moves the control variates to the device once for the round, initializing
+        the client control variate to 0 if the client is participating for the first
+        time.
         """
-        self.server_control_variate = self.additional_data
+        self.server_control_variate = OrderedDict(
+            (name, variate.to(self.device))
+            for name, variate in self.additional_data.items()
+        )
         if self.client_control_variate is None:
-            self.client_control_variate = {}
-            for variate in self.server_control_variate:
-                self.client_control_variate[variate] = torch.zeros(
-                    self.server_control_variate[variate].shape
-                )
+            self.client_control_variate = OrderedDict(
+                (name, torch.zeros_like(variate))
+                for name, variate in self.server_control_variate.items()
+            )
+        else:
+            self.client_control_variate = OrderedDict(
+                (name, variate.to(self.device))
+                for name, variate in self.client_control_variate.items()
+            )
         self.global_model_weights = copy.deepcopy(self.model.state_dict())
 
     def train_step_end(self, config, batch=None, loss=None):
         """Modifies the weights based on the server and client control variates."""
-        for group in self.param_groups:
-            learning_rate = -group["lr"]
-            counter = 0
-            for name in self.server_control_variate:
-                if "weight" in name or "bias" in name:
-                    server_control_variate = self.server_control_variate[name].to(
-                        self.device
-                    )
-                    param = group["params"][counter]
-                    if self.client_control_variate is not None:
-                        param.data.add_(
-                            torch.sub(
-                                server_control_variate,
-                                self.client_control_variate[name].to(self.device),
-                            ),
-                            alpha=learning_rate,
-                        )
-                    else:
-                        param.data.add_(server_control_variate, alpha=learning_rate)
-                    counter += 1
+        with torch.no_grad():
+            for group, corrections in zip(self.param_groups, self.corrections):
+                torch._foreach_add_(group["params"], corrections, alpha=-group["lr"])
 
     def train_run_end(self, config):
-        """Compute deltas of this client's control variate and deltas of the model"""
-
-        # Compute deltas of control variate to be used for the next time that
-        # the client is selected
-        new_client_control_variate = OrderedDict()
-        control_variate_deltas = OrderedDict()
-        if self.client_control_variate is not None:
-            for name, previous_weight in self.global_model_weights.items():
-                new_client_control_variate[name] = torch.sub(
-                    self.client_control_variate[name].to(device=self.device),
-                    self.server_control_variate[name].to(device=self.device),
-                ).to(device=self.device)
-                new_client_control_variate[name].add_(
-                    torch.sub(
-                        previous_weight.to(device=self.device),
-                        self.model.state_dict()[name],
-                    ),
-                    alpha=1 / Config().trainer.epochs,
-                )
-
-                control_variate_deltas[name] = torch.sub(
-                    new_client_control_variate[name],
-                    self.client_control_variate[name].to(self.device),
-                )
-        else:
-            for name, previous_weight in self.global_model_weights.items():
-                new_client_control_variate[name] = -self.server_control_variate[name]
-                new_client_control_variate[name].add_(
-                    torch.sub(previous_weight, self.model.state_dict()[name]),
-                    alpha=1 / Config().trainer.epochs,
-                )
-
-                control_variate_deltas[name] = new_client_control_variate[name]
+        """Compute the new control variate of this client, to be used for the next time
+        that the client is selected."""
+        names = list(self.global_model_weights)
+        weights = self.model.state_dict()
+        client_control_variate = [self.client_control_variate[name] for name in names]
+
+        # c_i+ = c_i - c + (x - y_i) / epochs, computed for all the tensors at once
+        new_client_control_variate = torch._foreach_sub(
+            client_control_variate,
+            [self.server_control_variate[name] for name in names],
+        )
+        torch._foreach_add_(
+            new_client_control_variate,
+            torch._foreach_sub(
+                [self.global_model_weights[name].to(self.device) for name in names],
+                [weights[name] for name in names],
+            ),
+            alpha=1 / Config().trainer.epochs,
+        )
 
         # Update client control variate
-        self.client_control_variate = new_client_control_variate
-
-        # Save client control variate
-        logging.info(
-            "[Client #%d] Saving the control variate to %s.",
-            self.client_id,
-            self.client_control_variate_path,
+        self.client_control_variate = OrderedDict(
+            zip(names, new_client_control_variate)
         )
-        with open(self.client_control_variate_path, "wb") as path:
-            pickle.dump(self.client_control_variate, path)
 
-        logging.info(
-            "[Client #%d] Control variate saved to %s.",
-            self.client_id,
-            self.client_control_variate_path,
+        # Save client control variate
+        logging.info("[Client #%d] Saving the control variate.", self.client_id)
+        client_state.get().put(
+            self.client_id, "control_variate", self.client_control_variate
         )
@@ -6,10 +6,10 @@ as either central or edge servers.
 import logging
 import os
 import pickle
-import sys
 
 from plato.config import Config
 from plato.servers import fedavg_cs
+from plato.utils import chunked_transfer, payload_codec
 
 
 class Server(fedavg_cs.Server):
@@ -55,22 +55,22 @@ class Server(fedavg_cs.Server):
 
         if self.s3_client is not None:
             s3_key = f"server_payload_{os.getpid()}_{self.current_round}"
-            self.s3_client.send_to_s3(s3_key, payload)
-            data_size = sys.getsizeof(pickle.dumps(payload))
+            await self.s3_client.send(s3_key, payload)
+            data_size = payload_codec.sizeof(payload)
             metadata["s3_key"] = s3_key
         else:
             data_size = 0
 
             if isinstance(payload, list):
                 for data in payload:
-                    _data = pickle.dumps(data)
+                    _data = payload_codec.encode(data)
                     await self.send_in_chunks(_data, sid, client_id)
-                    data_size += sys.getsizeof(_data)
+                    data_size += len(_data)
 
             else:
-                _data = pickle.dumps(payload)
+                _data = payload_codec.encode(payload)
                 await self.send_in_chunks(_data, sid, client_id)
-                data_size = sys.getsizeof(_data)
+                data_size = len(_data)
 
         await self.sio.emit("payload_done", metadata, room=sid)
 
@@ -86,7 +86,7 @@ class Server(fedavg_cs.Server):
         """Upon receiving a report from a client."""
         self.reports[sid] = pickle.loads(report)
         self.client_payload[sid] = None
-        self.client_chunks[sid] = []
+        self.client_chunks[sid] = chunked_transfer.ChunkBuffer()
 
         if self.comm_simulation:
             model_name = (
@@ -96,10 +96,9 @@ class Server(fedavg_cs.Server):
             )
             checkpoint_path = Config().params["checkpoint_path"]
             payload_filename = f"{checkpoint_path}/{model_name}_client_{client_id}.pth"
-            with open(payload_filename, "rb") as payload_file:
-                self.client_payload[sid] = pickle.load(payload_file)
+            self.client_payload[sid] = payload_codec.load(payload_filename)
 
-            data_size = sys.getsizeof(pickle.dumps(self.client_payload[sid]))
+            data_size = os.path.getsize(payload_filename)
             logging.info(
                 "[%s] Received %.2f MB of payload data from client #%d (simulated).",
                 self,
@@ -116,15 +115,10 @@ class Server(fedavg_cs.Server):
         if s3_key is None:
             assert self.client_payload[sid] is not None
 
-            payload_size = 0
-            if isinstance(self.client_payload[sid], list):
-                for _data in self.client_payload[sid]:
-                    payload_size += sys.getsizeof(pickle.dumps(_data))
-            else:
-                payload_size = sys.getsizeof(pickle.dumps(self.client_payload[sid]))
+            payload_size = self.client_chunks[sid].transferred
         else:
-            self.client_payload[sid] = self.s3_client.receive_from_s3(s3_key)
-            payload_size = sys.getsizeof(pickle.dumps(self.client_payload[sid]))
+            self.client_payload[sid] = await self.s3_client.receive(s3_key)
+            payload_size = payload_codec.sizeof(self.client_payload[sid])
 
         logging.info(
             "[%s] Received %.2f MB of payload data from client #%d.",
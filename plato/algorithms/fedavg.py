@@ -1,9 +1,11 @@
 """
 The federated averaging algorithm for PyTorch.
 """
+import asyncio
 from collections import OrderedDict
 
 from plato.algorithms import base
+from plato.utils import aggregation
 
 
 class Algorithm(base.Algorithm):
@@ -35,6 +37,32 @@ class Algorithm(base.Algorithm):
 
         return updated_weights
 
+    def can_average_weights(self, baseline_weights, weights_received) -> bool:
+        """Whether average_weights() can replace computing, aggregating and applying
+        the weight deltas, which holds unless those steps are customized."""
+        return (
+            type(self).compute_weight_deltas is Algorithm.compute_weight_deltas
+            and type(self).update_weights is Algorithm.update_weights
+            and all(
+                aggregation.is_compatible(baseline_weights, weights)
+                for weights in weights_received
+            )
+        )
+
+    async def average_weights(self, baseline_weights, weights_received, weightings):
+        """Updates the baseline weights by the weighted average of the deltas between
+        the weights received and the baseline, in place and without computing the
+        deltas of each client."""
+        accumulator = aggregation.WeightAccumulator(baseline_weights)
+
+        for weights, weighting in zip(weights_received, weightings):
+            accumulator.add(weights, weighting)
+
+            # Yield to other tasks in the server
+            await asyncio.sleep(0)
+
+        return accumulator.result(baseline_weights)
+
     def extract_weights(self, model=None):
         """Extracts weights from the model."""
         if model is None:
@@ -7,35 +7,33 @@ based on a configuration at run-time.
 import logging
 
 from plato.config import Config
+from plato.utils.lazy_registry import LazyRegistry
 
+# Algorithms are imported when they are first used
 if hasattr(Config().trainer, "use_mindspore"):
-    from plato.algorithms.mindspore import (
-        fedavg as fedavg_mindspore,
-        mistnet as mistnet_mindspore,
+    registered_algorithms = LazyRegistry(
+        {
+            "fedavg": "plato.algorithms.mindspore.fedavg:Algorithm",
+            "mistnet": "plato.algorithms.mindspore.mistnet:Algorithm",
+        },
+        group="plato.algorithms",
     )
 
-    registered_algorithms = {
-        "fedavg": fedavg_mindspore.Algorithm,
-        "mistnet": mistnet_mindspore.Algorithm,
-    }
-
 elif hasattr(Config().trainer, "use_tensorflow"):
-    from plato.algorithms.tensorflow import fedavg as fedavg_tensorflow
-
-    registered_algorithms = {"fedavg": fedavg_tensorflow.Algorithm}
+    registered_algorithms = LazyRegistry(
+        {"fedavg": "plato.algorithms.tensorflow.fedavg:Algorithm"},
+        group="plato.algorithms",
+    )
 else:
-    from plato.algorithms import (
-        fedavg,
-        mistnet,
-        fedavg_gan,
+    registered_algorithms = LazyRegistry(
+        {
+            "fedavg": "plato.algorithms.fedavg:Algorithm",
+            "mistnet": "plato.algorithms.mistnet:Algorithm",
+            "fedavg_gan": "plato.algorithms.fedavg_gan:Algorithm",
+        },
+        group="plato.algorithms",
     )
 
-    registered_algorithms = {
-        "fedavg": fedavg.Algorithm,
-        "mistnet": mistnet.Algorithm,
-        "fedavg_gan": fedavg_gan.Algorithm,
-    }
-
 
 def get(trainer=None):
     """Get the algorithm with the provided type."""
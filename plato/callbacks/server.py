@@ -8,7 +8,7 @@ import logging
 import os
 from abc import ABC
 from plato.config import Config
-from plato.utils import csv_processor, fonts
+from plato.utils import fonts, results_sink
 
 
 class ServerCallback(ABC):
@@ -61,15 +61,41 @@ class LogProgressCallback(ServerCallback):
         recorded_items = Config().params["result_types"]
         self.recorded_items = [x.strip() for x in recorded_items.split(",")]
 
-        # Initialize the .csv file for logging runtime results
+        file_format = (
+            Config().results.format
+            if hasattr(Config(), "results") and hasattr(Config().results, "format")
+            else "csv"
+        )
+        flush_interval = (
+            Config().results.flush_interval
+            if hasattr(Config(), "results")
+            and hasattr(Config().results, "flush_interval")
+            else 10
+        )
+
+        # Initialize the sink for logging runtime results
         result_csv_file = f"{Config().params['result_path']}/{os.getpid()}.csv"
-        csv_processor.initialize_csv(
-            result_csv_file, self.recorded_items, Config().params["result_path"]
+        self.results_sink = results_sink.open_sink(
+            result_csv_file, self.recorded_items, file_format, flush_interval
         )
 
+        # Initialize the sink for logging the test accuracies of clients
+        self.accuracy_sink = None
+        if hasattr(Config().clients, "do_test") and Config().clients.do_test:
+            accuracy_csv_file = (
+                f"{Config().params['result_path']}/{os.getpid()}_accuracy.csv"
+            )
+            self.accuracy_sink = results_sink.open_sink(
+                accuracy_csv_file,
+                ["round", "client_id", "accuracy"],
+                file_format,
+                flush_interval,
+            )
+
         logging.info(
             fonts.colourize(
-                f"[{os.getpid()}] Logging runtime results to: {result_csv_file}."
+                f"[{os.getpid()}] Logging runtime results to: "
+                f"{self.results_sink.output_filename}."
             )
         )
 
@@ -92,29 +118,17 @@ class LogProgressCallback(ServerCallback):
 
     def on_clients_processed(self, server, **kwargs):
         """Additional work to be performed after client reports have been processed."""
-        # Record results into a .csv file
-        new_row = []
-        for item in self.recorded_items:
-            item_value = server.get_logged_items()[item]
-            new_row.append(item_value)
-
-        result_csv_file = f"{Config().params['result_path']}/{os.getpid()}.csv"
-        csv_processor.write_csv(result_csv_file, new_row)
+        # Record results, with the logged items evaluated once
+        logged_items = server.get_logged_items()
+        self.results_sink.write([logged_items[item] for item in self.recorded_items])
 
-        if hasattr(Config().clients, "do_test") and Config().clients.do_test:
+        if self.accuracy_sink is not None:
             # Updates the log for client test accuracies
-            accuracy_csv_file = (
-                f"{Config().params['result_path']}/{os.getpid()}_accuracy.csv"
+            self.accuracy_sink.write_rows(
+                [server.current_round, update.client_id, update.report.accuracy]
+                for update in server.updates
             )
 
-            for update in server.updates:
-                accuracy_row = [
-                    server.current_round,
-                    update.client_id,
-                    update.report.accuracy,
-                ]
-                csv_processor.write_csv(accuracy_csv_file, accuracy_row)
-
         logging.info("[%s] All client reports have been processed.", server)
 
     def on_training_will_start(self, server, **kwargs):
@@ -127,4 +141,5 @@ class LogProgressCallback(ServerCallback):
         """
         Event called at the start of closing the server.
         """
+        results_sink.flush_all()
         logging.info("[%s] Closing the server.", server)
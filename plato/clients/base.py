@@ -8,7 +8,6 @@ import math
 import os
 import pickle
 import re
-import sys
 import uuid
 from abc import abstractmethod
 
@@ -16,7 +15,8 @@ import socketio
 from plato.callbacks.handler import CallbackHandler
 from plato.callbacks.client import LogProgressCallback
 from plato.config import Config
-from plato.utils import s3
+from plato.trainers import worker
+from plato.utils import chunked_transfer, payload_codec, results_sink, s3
 
 
 class ClientEvents(socketio.AsyncClientNamespace):
@@ -39,6 +39,11 @@ class ClientEvents(socketio.AsyncClientNamespace):
             "[Client #%d] The server disconnected the connection.", self.client_id
         )
         self.plato_client.clear_checkpoint_files()
+
+        # Results logged by edge servers are still to be written, and the training
+        # worker processes stopped, before exiting
+        results_sink.flush_all()
+        worker.stop_all()
         os._exit(0)
 
     async def on_connect_error(self, data):
@@ -57,7 +62,9 @@ class ClientEvents(socketio.AsyncClientNamespace):
 
     async def on_chunk(self, data):
         """A chunk of data from the server arrived."""
-        await self.plato_client.chunk_arrived(data["data"])
+        await self.plato_client.chunk_arrived(
+            data["data"], offset=data.get("offset"), size=data.get("size")
+        )
 
     async def on_payload(self, data):
         """A portion of the new payload from the server arrived."""
@@ -78,7 +85,7 @@ class Client:
         self.client_id = Config().args.id
         self.current_round = 0
         self.sio = None
-        self.chunks = []
+        self.chunks = chunked_transfer.ChunkBuffer()
         self.server_payload = None
         self.s3_client = None
         self.outbound_processor = None
@@ -134,7 +141,11 @@ class Client:
             await asyncio.sleep(5)
             logging.info("[Client #%d] Contacting the server.", self.client_id)
 
-        self.sio = socketio.AsyncClient(reconnection=True)
+        # Chunks of payloads sent by the server can be larger than the default limit
+        # on the size of a websocket message
+        self.sio = socketio.AsyncClient(
+            reconnection=True, websocket_extra_options={"max_msg_size": 0}
+        )
         self.sio.register_namespace(ClientEvents(namespace="/", plato_client=self))
 
         if hasattr(Config().server, "s3_endpoint_url"):
@@ -164,6 +175,39 @@ class Client:
 
     async def payload_to_arrive(self, response) -> None:
         """Upon receiving a response from the server."""
+        self._start_round(response)
+
+        if self.comm_simulation:
+            payload_filename = response["payload_filename"]
+            self.server_payload = payload_codec.load(payload_filename, memory_map=True)
+
+            payload_size = os.path.getsize(payload_filename)
+
+            logging.info(
+                "[%s] Received %.2f MB of payload data from the server (simulated).",
+                self,
+                payload_size / 1024**2,
+            )
+
+            await self.handle_payload(self.server_payload)
+
+        elif "payload_segment" in response:
+            # The payload is published by the server in shared memory, and shared by
+            # all the clients on the same host until they modify it
+            payload_filename = response["payload_segment"]
+            self.server_payload = payload_codec.load(payload_filename, memory_map=True)
+
+            logging.info(
+                "[%s] Received %.2f MB of payload data from the server (shared memory).",
+                self,
+                os.path.getsize(payload_filename) / 1024**2,
+            )
+
+            await self.handle_payload(self.server_payload)
+
+    def _start_round(self, response) -> None:
+        """Prepares this client for a new round of training, as the client selected
+        in the response from the server."""
         self.current_round = response["current_round"]
 
         # Update (virtual) client id for client, trainer and algorithm
@@ -178,23 +222,21 @@ class Client:
         if not hasattr(Config().data, "reload_data") or Config().data.reload_data:
             self.load_data()
 
-        if self.comm_simulation:
-            payload_filename = response["payload_filename"]
-            with open(payload_filename, "rb") as payload_file:
-                self.server_payload = pickle.load(payload_file)
-
-            payload_size = sys.getsizeof(pickle.dumps(self.server_payload))
+    async def handle_payload(self, inbound_payload):
+        """Handles the inbound payload upon receiving it from the server."""
+        report, outbound_payload = await self._process_payload(inbound_payload)
 
-            logging.info(
-                "[%s] Received %.2f MB of payload data from the server (simulated).",
-                self,
-                payload_size / 1024**2,
-            )
+        # Sending the client report as metadata to the server (payload to follow)
+        await self.sio.emit(
+            "client_report", {"id": self.client_id, "report": pickle.dumps(report)}
+        )
 
-            await self.handle_payload(self.server_payload)
+        # Sending the client training payload to the server
+        await self.send(outbound_payload)
 
-    async def handle_payload(self, inbound_payload):
-        """Handles the inbound payload upon receiving it from the server."""
+    async def _process_payload(self, inbound_payload):
+        """Processes the inbound payload from the server, and returns the report and
+        the processed outbound payload to be sent back."""
         self.inbound_received(self.inbound_processor)
         self.callback_handler.call_event(
             "on_inbound_received", self, self.inbound_processor
@@ -217,13 +259,7 @@ class Client:
         )
         processed_outbound_payload = self.outbound_processor.process(outbound_payload)
 
-        # Sending the client report as metadata to the server (payload to follow)
-        await self.sio.emit(
-            "client_report", {"id": self.client_id, "report": pickle.dumps(report)}
-        )
-
-        # Sending the client training payload to the server
-        await self.send(processed_outbound_payload)
+        return report, processed_outbound_payload
 
     def inbound_received(self, inbound_processor):
         """
@@ -245,9 +281,9 @@ class Client:
         to process the data to be sent to the server.
         """
 
-    async def chunk_arrived(self, data) -> None:
+    async def chunk_arrived(self, data, offset=None, size=None) -> None:
         """Upon receiving a chunk of data from the server."""
-        self.chunks.append(data)
+        self.chunks.append(data, offset=offset, size=size)
 
     async def request_update(self, data) -> None:
         """Upon receiving a request for an urgent model update."""
@@ -278,9 +314,8 @@ class Client:
         """Upon receiving a portion of the new payload from the server."""
         assert client_id == self.client_id
 
-        payload = b"".join(self.chunks)
-        _data = pickle.loads(payload)
-        self.chunks = []
+        payload = self.chunks.getvalue()
+        _data = payload_codec.decode(payload)
 
         if self.server_payload is None:
             self.server_payload = _data
@@ -295,17 +330,12 @@ class Client:
         payload_size = 0
 
         if s3_key is None:
-            if isinstance(self.server_payload, list):
-                for _data in self.server_payload:
-                    payload_size += sys.getsizeof(pickle.dumps(_data))
-            elif isinstance(self.server_payload, dict):
-                for key, value in self.server_payload.items():
-                    payload_size += sys.getsizeof(pickle.dumps({key: value}))
-            else:
-                payload_size = sys.getsizeof(pickle.dumps(self.server_payload))
+            # The number of bytes received in chunks since the last payload
+            payload_size = self.chunks.transferred
+            self.chunks = chunked_transfer.ChunkBuffer()
         else:
-            self.server_payload = self.s3_client.receive_from_s3(s3_key)
-            payload_size = sys.getsizeof(pickle.dumps(self.server_payload))
+            self.server_payload = await self.s3_client.receive(s3_key)
+            payload_size = payload_codec.sizeof(self.server_payload)
 
         assert client_id == self.client_id
 
@@ -317,6 +347,9 @@ class Client:
 
         await self.handle_payload(self.server_payload)
 
+        # Portions of the next payload must not be appended to this one
+        self.server_payload = None
+
     async def start_training(self, inbound_payload):
         """Complete one round of training on this client."""
         self.load_payload(inbound_payload)
@@ -333,13 +366,8 @@ class Client:
         return report, outbound_payload
 
     async def send_in_chunks(self, data) -> None:
-        """Sending a bytes object in fixed-sized chunks to the client."""
-        step = 1024 ^ 2
-        chunks = [data[i : i + step] for i in range(0, len(data), step)]
-
-        for chunk in chunks:
-            await self.sio.emit("chunk", {"data": chunk})
-
+        """Sending a bytes object in fixed-sized chunks to the server."""
+        await chunked_transfer.send(self.sio, data)
         await self.sio.emit("client_payload", {"id": self.client_id})
 
     async def send(self, payload) -> None:
@@ -355,10 +383,7 @@ class Client:
             payload_filename = (
                 f"{checkpoint_path}/{model_name}_client_{self.client_id}.pth"
             )
-            with open(payload_filename, "wb") as payload_file:
-                pickle.dump(payload, payload_file)
-
-            data_size = sys.getsizeof(pickle.dumps(payload))
+            data_size = payload_codec.dump(payload, payload_filename)
 
             logging.info(
                 "[%s] Sent %.2f MB of payload data to the server (simulated).",
@@ -372,21 +397,20 @@ class Client:
             if self.s3_client is not None:
                 unique_key = uuid.uuid4().hex[:6].upper()
                 s3_key = f"client_payload_{self.client_id}_{unique_key}"
-                self.s3_client.send_to_s3(s3_key, payload)
-                data_size = sys.getsizeof(pickle.dumps(payload))
+                data_size = await self.s3_client.send(s3_key, payload)
                 metadata["s3_key"] = s3_key
             else:
                 if isinstance(payload, list):
                     data_size: int = 0
 
                     for data in payload:
-                        _data = pickle.dumps(data)
+                        _data = payload_codec.encode(data)
                         await self.send_in_chunks(_data)
-                        data_size += sys.getsizeof(_data)
+                        data_size += len(_data)
                 else:
-                    _data = pickle.dumps(payload)
+                    _data = payload_codec.encode(payload)
                     await self.send_in_chunks(_data)
-                    data_size = sys.getsizeof(_data)
+                    data_size = len(_data)
 
             await self.sio.emit("client_payload_done", metadata)
 
@@ -0,0 +1,223 @@
+"""
+A pool of long-lived worker processes that run the clients selected by a server on the
+same host, without socket.io connections.
+
+Each worker configures one client and loads its data source once. The server then
+dispatches a selected client to a worker as a task, with the server response and the
+payload in a POSIX shared memory segment, and the worker replies with the report and
+the payload it produced in a shared memory segment of its own. Payloads are encoded
+with the payload codec, and a payload sent to several clients is only written to
+shared memory once.
+"""
+import asyncio
+import logging
+import multiprocessing as mp
+import pickle
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+from plato.config import Config
+from plato.utils import payload_codec
+
+
+def write_segment(data) -> shared_memory.SharedMemory:
+    """Copies a bytes-like object into a new shared memory segment."""
+    segment = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    segment.buf[: len(data)] = data
+    return segment
+
+
+def read_segment(name, size, unlink=False) -> bytearray:
+    """Copies the contents of a shared memory segment into a writable buffer, and
+    removes the segment if `unlink` is set.
+
+    The tensors decoded from a payload are backed by the buffer they are decoded from,
+    and may outlive the task: the server keeps the payloads until they are aggregated,
+    and clients may keep references to the weights they received. Decoding from a copy
+    lets the segment be closed and removed right away, as a segment cannot be closed
+    while tensors still use its memory, and keeps the tensors writable. The copy is
+    one pass over the payload, which is small next to encoding it.
+    """
+    segment = shared_memory.SharedMemory(name=name)
+    buffer = bytearray(segment.buf[:size])
+    segment.close()
+
+    if unlink:
+        segment.unlink()
+
+    return buffer
+
+
+def run_worker(worker_id, client, tasks, results):
+    """Runs a worker process, which trains the clients dispatched to it until it
+    receives None as a task."""
+    Config().args.id = worker_id
+
+    # The clients are trained in the worker process itself, rather than in training
+    # worker processes of their own as with `max_concurrency`, which the number of
+    # workers in the pool is already based on
+    if hasattr(Config().trainer, "max_concurrency"):
+        trainer_config = Config().trainer._asdict()
+        del trainer_config["max_concurrency"]
+        Config.trainer = namedtuple("Config", trainer_config)(**trainer_config)
+
+    if client is None:
+        # pylint: disable=import-outside-toplevel
+        from plato.clients import registry as client_registry
+
+        client = client_registry.get()
+        logging.info(
+            "Starting a %s client in worker #%d.", Config().clients.type, worker_id
+        )
+    else:
+        client.client_id = worker_id
+        logging.info("Starting a custom client in worker #%d.", worker_id)
+
+    # Payloads are exchanged through shared memory rather than simulated
+    client.comm_simulation = False
+    client.configure()
+    results.put((worker_id, None, None, None, None))
+
+    loop = asyncio.new_event_loop()
+
+    for task in iter(tasks.get, None):
+        response, segment_name, size = task
+        payload = payload_codec.decode(read_segment(segment_name, size))
+
+        # pylint: disable=protected-access
+        client._start_round(response)
+        report, payload = loop.run_until_complete(client._process_payload(payload))
+
+        data = payload_codec.encode(payload)
+        segment = write_segment(data)
+        segment.close()
+
+        report = pickle.dumps(report)
+        results.put((worker_id, client.client_id, report, segment.name, len(data)))
+
+    loop.close()
+
+
+class ClientPool:
+    """The server side of a pool of worker processes running clients."""
+
+    def __init__(self, server, client=None, processes=1):
+        self.server = server
+        self.client = client
+        self.processes = processes
+        self.context = mp.get_context("spawn")
+        self.results = self.context.Queue()
+        self.tasks = {}
+        self.workers = []
+
+        # Shared memory segments holding payloads sent to the clients, keyed by the
+        # fingerprint of the payload, with the payload itself to keep its fingerprint
+        # valid, its size and the number of tasks still using them
+        self.segments = {}
+        self.current_key = None
+
+        # The segment used by the task currently dispatched to each worker
+        self.pending = {}
+
+    @staticmethod
+    def sid(worker_id) -> str:
+        """The session ID that identifies a worker on the server."""
+        return f"pool_{worker_id}"
+
+    async def run(self) -> None:
+        """Starts the worker processes, and hands the results they produce to the
+        server as they arrive."""
+        for worker_id in range(1, self.processes + 1):
+            logging.info("Starting worker #%d's process.", worker_id)
+            self.tasks[worker_id] = self.context.Queue()
+            worker = self.context.Process(
+                target=run_worker,
+                args=(worker_id, self.client, self.tasks[worker_id], self.results),
+            )
+            worker.start()
+            self.workers.append(worker)
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            result = await loop.run_in_executor(None, self.results.get)
+            worker_id, client_id, report, segment_name, size = result
+            sid = ClientPool.sid(worker_id)
+
+            if client_id is None:
+                # The worker is ready to train clients
+                await self.server.register_client(sid, worker_id)
+                continue
+
+            self.release(sid)
+            buffer = read_segment(segment_name, size, unlink=True)
+
+            await self.server.client_report_arrived(sid, client_id, report)
+            self.server.client_payload[sid] = payload_codec.decode(buffer)
+
+            logging.info(
+                "[%s] Received %.2f MB of payload data from client #%d (shared memory).",
+                self.server,
+                size / 1024**2,
+                client_id,
+            )
+            self.server.comm_overhead += size / 1024**2
+
+            await self.server.process_client_info(client_id, sid)
+
+    def send(self, sid, response, payload) -> int:
+        """Dispatches a selected client to a worker, and returns the size of the
+        payload in bytes."""
+        key = payload_codec.fingerprint(payload)
+
+        if key is None or key not in self.segments:
+            data = payload_codec.encode(payload)
+            segment = write_segment(data)
+            key = segment.name if key is None else key
+            self.segments[key] = [segment, payload, len(data), 0]
+
+        # Segments no longer in use are removed once a different payload is sent
+        if key != self.current_key:
+            previous_key, self.current_key = self.current_key, key
+            self.remove_segment(previous_key)
+
+        segment, __, size, __ = self.segments[key]
+        self.segments[key][3] += 1
+        self.pending[sid] = key
+
+        worker_id = int(sid[len("pool_") :])
+        self.tasks[worker_id].put((response, segment.name, size))
+
+        return size
+
+    def release(self, sid) -> None:
+        """Releases the payload segment used by the task a worker has completed."""
+        key = self.pending.pop(sid, None)
+
+        if key in self.segments:
+            self.segments[key][3] -= 1
+            if key != self.current_key:
+                self.remove_segment(key)
+
+    def remove_segment(self, key) -> None:
+        """Removes a payload segment if no task is using it."""
+        if key in self.segments and self.segments[key][3] == 0:
+            segment = self.segments.pop(key)[0]
+            segment.close()
+            segment.unlink()
+
+    def close(self) -> None:
+        """Stops the worker processes, and removes all the payload segments."""
+        for tasks in self.tasks.values():
+            tasks.put(None)
+
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+        for segment, __, __, __ in self.segments.values():
+            segment.close()
+            segment.unlink()
+
+        self.segments = {}
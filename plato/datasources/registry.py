@@ -6,61 +6,57 @@ based on a configuration at run-time.
 import logging
 
 from plato.config import Config
+from plato.utils.lazy_registry import LazyRegistry
 
+# Data sources are imported when they are first used, as some of them import large
+# third-party packages
 if hasattr(Config().trainer, "use_mindspore"):
-    from plato.datasources.mindspore import mnist as mnist_mindspore
-
-    registered_datasources = {"MNIST": mnist_mindspore}
-    registered_partitioned_datasources = {}
+    registered_datasources = LazyRegistry(
+        {"MNIST": "plato.datasources.mindspore.mnist"}, group="plato.datasources"
+    )
+    registered_partitioned_datasources = LazyRegistry({})
 
 elif hasattr(Config().trainer, "use_tensorflow"):
-    from plato.datasources.tensorflow import (
-        mnist as mnist_tensorflow,
-        fashion_mnist as fashion_mnist_tensorflow,
+    registered_datasources = LazyRegistry(
+        {
+            "MNIST": "plato.datasources.tensorflow.mnist",
+            "FashionMNIST": "plato.datasources.tensorflow.fashion_mnist",
+        },
+        group="plato.datasources",
     )
-
-    registered_datasources = {
-        "MNIST": mnist_tensorflow,
-        "FashionMNIST": fashion_mnist_tensorflow,
-    }
+    registered_partitioned_datasources = LazyRegistry({})
 
 else:
-    from plato.datasources import (
-        mnist,
-        fashion_mnist,
-        emnist,
-        cifar10,
-        cifar100,
-        cinic10,
-        purchase,
-        texas,
-        huggingface,
-        pascal_voc,
-        tiny_imagenet,
-        femnist,
-        feature,
-        qoenflx,
-        celeba,
+    registered_datasources = LazyRegistry(
+        {
+            "MNIST": "plato.datasources.mnist",
+            "FashionMNIST": "plato.datasources.fashion_mnist",
+            "EMNIST": "plato.datasources.emnist",
+            "CIFAR10": "plato.datasources.cifar10",
+            "CIFAR100": "plato.datasources.cifar100",
+            "CINIC10": "plato.datasources.cinic10",
+            "Purchase": "plato.datasources.purchase",
+            "Texas": "plato.datasources.texas",
+            "HuggingFace": "plato.datasources.huggingface",
+            "PASCAL_VOC": "plato.datasources.pascal_voc",
+            "TinyImageNet": "plato.datasources.tiny_imagenet",
+            "Feature": "plato.datasources.feature",
+            "QoENFLX": "plato.datasources.qoenflx",
+            "CelebA": "plato.datasources.celeba",
+            "kinetics700": "plato.datasources.kinetics",
+            "Gym": "plato.datasources.gym",
+            "Flickr30KE": "plato.datasources.flickr30k_entities",
+            "ReferItGame": "plato.datasources.referitgame",
+            "COCO": "plato.datasources.coco",
+            "YOLO": "plato.datasources.yolo",
+        },
+        group="plato.datasources",
     )
 
-    registered_datasources = {
-        "MNIST": mnist,
-        "FashionMNIST": fashion_mnist,
-        "EMNIST": emnist,
-        "CIFAR10": cifar10,
-        "CIFAR100": cifar100,
-        "CINIC10": cinic10,
-        "Purchase": purchase,
-        "Texas": texas,
-        "HuggingFace": huggingface,
-        "PASCAL_VOC": pascal_voc,
-        "TinyImageNet": tiny_imagenet,
-        "Feature": feature,
-        "QoENFLX": qoenflx,
-        "CelebA": celeba,
-    }
-
-    registered_partitioned_datasources = {"FEMNIST": femnist}
+    registered_partitioned_datasources = LazyRegistry(
+        {"FEMNIST": "plato.datasources.femnist"},
+        group="plato.partitioned_datasources",
+    )
 
 
 def get(client_id=0):
@@ -68,36 +64,7 @@ def get(client_id=0):
     datasource_name = Config().data.datasource
 
     logging.info("Data source: %s", Config().data.datasource)
-    if datasource_name == "kinetics700":
-        from plato.datasources import kinetics
-
-        return kinetics.DataSource()
-
-    if datasource_name == "Gym":
-        from plato.datasources import gym
-
-        return gym.DataSource()
-
-    if datasource_name == "Flickr30KE":
-        from plato.datasources import flickr30k_entities
-
-        return flickr30k_entities.DataSource()
-
-    if datasource_name == "ReferItGame":
-        from plato.datasources import referitgame
-
-        return referitgame.DataSource()
-
-    if datasource_name == "COCO":
-        from plato.datasources import coco
-
-        return coco.DataSource()
-
-    if datasource_name == "YOLO":
-        from plato.datasources import yolo
-
-        return yolo.DataSource()
-    elif datasource_name in registered_datasources:
+    if datasource_name in registered_datasources:
         dataset = registered_datasources[datasource_name].DataSource()
     elif datasource_name in registered_partitioned_datasources:
         dataset = registered_partitioned_datasources[datasource_name].DataSource(
@@ -114,11 +81,7 @@ def get_input_shape():
     datasource_name = Config().data.datasource
 
     logging.info("Data source: %s", Config().data.datasource)
-    if Config().data.datasource == "YOLO":
-        from plato.datasources import yolo
-
-        return yolo.DataSource.input_shape()
-    elif datasource_name in registered_datasources:
+    if datasource_name in registered_datasources:
         input_shape = registered_datasources[datasource_name].DataSource.input_shape()
     elif datasource_name in registered_partitioned_datasources:
         input_shape = registered_partitioned_datasources[
@@ -5,38 +5,39 @@ Having a registry of all available classes is convenient for retrieving an insta
 based on a configuration at run-time.
 """
 from plato.config import Config
+from plato.utils.lazy_registry import LazyRegistry
 
+# Models are imported when they are first used, as some of them import large
+# third-party packages
 if hasattr(Config().trainer, "use_mindspore"):
-    from plato.models.mindspore import lenet5 as lenet5_mindspore
-
-    registered_models = {"lenet5": lenet5_mindspore.Model}
+    registered_models = LazyRegistry(
+        {"lenet5": "plato.models.mindspore.lenet5:Model"}, group="plato.models"
+    )
+    registered_factories = LazyRegistry({})
 elif hasattr(Config().trainer, "use_tensorflow"):
-    from plato.models.tensorflow import lenet5 as lenet5_tensorflow
-
-    registered_models = {"lenet5": lenet5_tensorflow.Model}
+    registered_models = LazyRegistry(
+        {"lenet5": "plato.models.tensorflow.lenet5:Model"}, group="plato.models"
+    )
+    registered_factories = LazyRegistry({})
 else:
-    from plato.models import (
-        lenet5,
-        dcgan,
-        multilayer,
-        resnet,
-        vgg,
-        torch_hub,
-        huggingface,
+    registered_models = LazyRegistry(
+        {
+            "lenet5": "plato.models.lenet5:Model",
+            "dcgan": "plato.models.dcgan:Model",
+            "multilayer": "plato.models.multilayer:Model",
+        },
+        group="plato.models",
     )
 
-    registered_models = {
-        "lenet5": lenet5.Model,
-        "dcgan": dcgan.Model,
-        "multilayer": multilayer.Model,
-    }
-
-    registered_factories = {
-        "resnet": resnet.Model,
-        "vgg": vgg.Model,
-        "torch_hub": torch_hub.Model,
-        "huggingface": huggingface.Model,
-    }
+    registered_factories = LazyRegistry(
+        {
+            "resnet": "plato.models.resnet:Model",
+            "vgg": "plato.models.vgg:Model",
+            "torch_hub": "plato.models.torch_hub:Model",
+            "huggingface": "plato.models.huggingface:Model",
+        },
+        group="plato.model_factories",
+    )
 
 
 def get():
@@ -6,62 +6,41 @@ Having a registry of all available classes is convenient for retrieving an insta
 based on a configuration at run-time.
 """
 import logging
-from collections import OrderedDict
 from typing import Tuple
 
 from plato.config import Config
 from plato.processors import pipeline
+from plato.utils.lazy_registry import LazyRegistry
 
+# Processors are imported when they are first used
 if not (
     hasattr(Config().trainer, "use_tensorflow")
     or hasattr(Config().trainer, "use_mindspore")
 ):
-    from plato.processors import (
-        base,
-        compress,
-        decompress,
-        feature_randomized_response,
-        feature_gaussian,
-        feature_laplace,
-        feature_quantize,
-        feature_dequantize,
-        feature_unbatch,
-        inbound_feature_tensors,
-        outbound_feature_ndarrays,
-        model_deepcopy,
-        model_quantize,
-        model_dequantize,
-        model_compress,
-        model_decompress,
-        model_randomized_response,
-        send_mask,
-        structured_pruning,
-        unstructured_pruning,
-    )
-
-    registered_processors = OrderedDict(
-        [
-            ("base", base.Processor),
-            ("compress", compress.Processor),
-            ("decompress", decompress.Processor),
-            ("feature_randomized_response", feature_randomized_response.Processor),
-            ("feature_gaussian", feature_gaussian.Processor),
-            ("feature_laplace", feature_laplace.Processor),
-            ("feature_quantize", feature_quantize.Processor),
-            ("feature_dequantize", feature_dequantize.Processor),
-            ("feature_unbatch", feature_unbatch.Processor),
-            ("inbound_feature_tensors", inbound_feature_tensors.Processor),
-            ("outbound_feature_ndarrays", outbound_feature_ndarrays.Processor),
-            ("model_deepcopy", model_deepcopy.Processor),
-            ("model_quantize", model_quantize.Processor),
-            ("model_dequantize", model_dequantize.Processor),
-            ("model_compress", model_compress.Processor),
-            ("model_decompress", model_decompress.Processor),
-            ("model_randomized_response", model_randomized_response.Processor),
-            ("send_mask", send_mask.Processor),
-            ("structured_pruning", structured_pruning.Processor),
-            ("unstructured_pruning", unstructured_pruning.Processor),
-        ]
+    registered_processors = LazyRegistry(
+        {
+            "base": "plato.processors.base:Processor",
+            "compress": "plato.processors.compress:Processor",
+            "decompress": "plato.processors.decompress:Processor",
+            "feature_randomized_response": "plato.processors.feature_randomized_response:Processor",
+            "feature_gaussian": "plato.processors.feature_gaussian:Processor",
+            "feature_laplace": "plato.processors.feature_laplace:Processor",
+            "feature_quantize": "plato.processors.feature_quantize:Processor",
+            "feature_dequantize": "plato.processors.feature_dequantize:Processor",
+            "feature_unbatch": "plato.processors.feature_unbatch:Processor",
+            "inbound_feature_tensors": "plato.processors.inbound_feature_tensors:Processor",
+            "outbound_feature_ndarrays": "plato.processors.outbound_feature_ndarrays:Processor",
+            "model_deepcopy": "plato.processors.model_deepcopy:Processor",
+            "model_quantize": "plato.processors.model_quantize:Processor",
+            "model_dequantize": "plato.processors.model_dequantize:Processor",
+            "model_compress": "plato.processors.model_compress:Processor",
+            "model_decompress": "plato.processors.model_decompress:Processor",
+            "model_randomized_response": "plato.processors.model_randomized_response:Processor",
+            "send_mask": "plato.processors.send_mask:Processor",
+            "structured_pruning": "plato.processors.structured_pruning:Processor",
+            "unstructured_pruning": "plato.processors.unstructured_pruning:Processor",
+        },
+        group="plato.processors",
     )
 
 
@@ -3,13 +3,11 @@ Processor for attaching a pruning mask to the payload if pruning
 had been conducted
 """
 
-import os
-import pickle
 import logging
 from typing import OrderedDict
 import torch
 from plato.processors import model
-from plato.config import Config
+from plato.utils import client_state
 
 
 class Processor(model.Processor):
@@ -19,22 +17,8 @@ class Processor(model.Processor):
     """
 
     def process(self, data: OrderedDict):
-        model_name = (
-            Config().trainer.model_name
-            if hasattr(Config().trainer, "model_name")
-            else "custom"
-        )
-        checkpoint_path = Config().params["checkpoint_path"]
-
-        mask_filename = (
-            f"{checkpoint_path}/{model_name}_client{self.client_id}_mask.pth"
-        )
-        if os.path.exists(mask_filename):
-            with open(mask_filename, "rb") as payload_file:
-                client_mask = pickle.load(payload_file)
-                data = [data, client_mask]
-        else:
-            data = [data, None]
+        client_mask = client_state.get().get(self.client_id, "mask")
+        data = [data, client_mask]
 
         if data[1] is not None:
             if self.client_id is None:
@@ -32,7 +32,7 @@ from torch.utils.data import SubsetRandomSampler
 from plato.config import Config
 from plato.samplers import base
 
-from plato.samplers import sampler_utils
+from plato.samplers import partition_index, sampler_utils
 
 
 class Sampler(base.Sampler):
@@ -78,12 +78,20 @@ class Sampler(base.Sampler):
             client_id: np.ndarray(0, dtype=np.int64)
             for client_id in range(total_clients)
         }
-        # construct the quantity label skewness
-        self.quantity_label_skew(
-            dataset_labels=self.targets_list,
-            dataset_classes=classes_id_list,
-            num_clients=total_clients,
-            per_client_classes_size=per_client_classes_size,
+
+        # construct the quantity label skewness, which is shared by all the clients,
+        #  and is cached once built
+        def build_dataidx_map():
+            self.quantity_label_skew(
+                dataset_labels=self.targets_list,
+                dataset_classes=classes_id_list,
+                num_clients=total_clients,
+                per_client_classes_size=per_client_classes_size,
+            )
+            return self.clients_dataidx_map
+
+        self.clients_dataidx_map = partition_index.cached(
+            self, self.targets_list, testing, build_dataidx_map
         )
 
         self.subset_indices = self.clients_dataidx_map[client_id - 1]
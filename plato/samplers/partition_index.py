@@ -0,0 +1,138 @@
+"""
+An index of the partitions of a dataset across all the clients, in a compressed sparse
+row (CSR) layout: the sample indices of all the partitions concatenated into one array,
+and the offset of each partition in it. The partition of a client is then a slice of
+that array, obtained in constant time.
+
+Samplers that partition the dataset for all the clients at once, with randomness shared
+across the clients, build the index once and cache it to disk, keyed by the dataset,
+the random seed and the sampler configuration. The other clients, and the same clients
+in later rounds, then load it instead of partitioning the dataset again.
+"""
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from plato.config import Config
+
+
+class PartitionIndex:
+    """The sample indices of the partitions of a dataset."""
+
+    def __init__(self, offsets, indices):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    @classmethod
+    def from_partitions(cls, partitions):
+        """Builds the index from a list of arrays of sample indices."""
+        offsets = np.zeros(len(partitions) + 1, dtype=np.int64)
+        np.cumsum([len(partition) for partition in partitions], out=offsets[1:])
+
+        if len(partitions) == 0:
+            return cls(offsets, np.zeros(0, dtype=np.int64))
+
+        return cls(offsets, np.concatenate(partitions).astype(np.int64, copy=False))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, partition) -> np.ndarray:
+        """Returns the sample indices in a partition, as a view into the index."""
+        if not 0 <= partition < len(self):
+            raise KeyError(partition)
+
+        return self.indices[self.offsets[partition] : self.offsets[partition + 1]]
+
+    def sizes(self) -> np.ndarray:
+        """Returns the number of samples in each partition."""
+        return np.diff(self.offsets)
+
+    def save(self, filename, **arrays) -> None:
+        """Saves the index, along with additional arrays, to a file atomically."""
+        temp_filename = f"{filename}.{os.getpid()}.tmp"
+
+        with open(temp_filename, "wb") as index_file:
+            np.savez(index_file, offsets=self.offsets, indices=self.indices, **arrays)
+
+        os.replace(temp_filename, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """Loads an index saved to a file, and returns it along with the additional
+        arrays saved with it."""
+        with np.load(filename) as arrays:
+            arrays = dict(arrays)
+
+        return cls(arrays.pop("offsets"), arrays.pop("indices")), arrays
+
+
+def dataset_digest(targets) -> str:
+    """Returns a digest of the labels of all the samples in a dataset."""
+    targets = np.ascontiguousarray(np.asarray(targets))
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str((targets.dtype, targets.shape)).encode("utf-8"))
+    digest.update(targets.tobytes())
+    return digest.hexdigest()
+
+
+def cached(sampler, targets, testing, build):
+    """Returns the partition index built by `build()` for a sampler, loading it from the
+    cache if it has been built before with the same dataset, random seed and sampler
+    configuration. Partitions built in other forms are returned without being cached.
+
+    The state of NumPy's global random number generator after building the index is
+    cached as well and restored when the index is loaded, so that the randomness used
+    after partitioning is the same with or without the cache.
+    """
+    if not hasattr(Config().data, "random_seed"):
+        # The partitions differ from one run to another without a fixed random seed
+        return build()
+
+    key = {
+        "sampler": f"{type(sampler).__module__}.{type(sampler).__name__}",
+        "testing": bool(testing),
+        "total_clients": Config().clients.total_clients,
+        "random_seed": sampler.random_seed,
+        "data": Config().data._asdict(),
+        "dataset": dataset_digest(targets),
+    }
+    key = json.dumps(key, sort_keys=True, default=str).encode("utf-8")
+
+    cache_path = os.path.join(Config().params["data_path"], "partitions")
+    filename = os.path.join(
+        cache_path, f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.npz"
+    )
+
+    if os.path.exists(filename):
+        index, arrays = PartitionIndex.load(filename)
+        np.random.set_state(
+            (
+                "MT19937",
+                arrays["rng_keys"],
+                int(arrays["rng_pos"]),
+                int(arrays["rng_has_gauss"]),
+                float(arrays["rng_cached_gaussian"]),
+            )
+        )
+        return index
+
+    index = build()
+    if not isinstance(index, PartitionIndex):
+        return index
+
+    __, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    os.makedirs(cache_path, exist_ok=True)
+    index.save(
+        filename,
+        rng_keys=keys,
+        rng_pos=pos,
+        rng_has_gauss=has_gauss,
+        rng_cached_gaussian=cached_gaussian,
+    )
+    logging.info("Partition index cached to %s.", filename)
+
+    return index
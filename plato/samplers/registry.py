@@ -5,62 +5,44 @@ Having a registry of all available classes is convenient for retrieving an insta
 on a configuration at run-time.
 """
 import logging
-from collections import OrderedDict
-import numpy as np
 
 from plato.config import Config
+from plato.utils.lazy_registry import LazyRegistry
 
+# Samplers are imported when they are first used
 if hasattr(Config().trainer, "use_mindspore"):
-    from plato.samplers.mindspore import (
-        iid as iid_mindspore,
-        dirichlet as dirichlet_mindspore,
-    )
-
-    registered_samplers = OrderedDict(
-        [
-            ("iid", iid_mindspore.Sampler),
-            ("noniid", dirichlet_mindspore.Sampler),
-        ]
+    registered_samplers = LazyRegistry(
+        {
+            "iid": "plato.samplers.mindspore.iid:Sampler",
+            "noniid": "plato.samplers.mindspore.dirichlet:Sampler",
+        },
+        group="plato.samplers",
     )
 elif hasattr(Config().trainer, "use_tensorflow"):
-    from plato.samplers.tensorflow import base
-
-    registered_samplers = OrderedDict(
-        [
-            ("iid", base.Sampler),
-            ("noniid", base.Sampler),
-            ("mixed", base.Sampler),
-        ]
+    registered_samplers = LazyRegistry(
+        {
+            "iid": "plato.samplers.tensorflow.base:Sampler",
+            "noniid": "plato.samplers.tensorflow.base:Sampler",
+            "mixed": "plato.samplers.tensorflow.base:Sampler",
+        },
+        group="plato.samplers",
     )
 else:
-    from plato.samplers import (
-        iid,
-        dirichlet,
-        mixed,
-        orthogonal,
-        all_inclusive,
-        distribution_noniid,
-        label_quantity_noniid,
-        mixed_label_quantity_noniid,
-        sample_quantity_noniid,
-        modality_iid,
-        modality_quantity_noniid,
-    )
-
-    registered_samplers = OrderedDict(
-        [
-            ("iid", iid.Sampler),
-            ("noniid", dirichlet.Sampler),
-            ("mixed", mixed.Sampler),
-            ("orthogonal", orthogonal.Sampler),
-            ("all_inclusive", all_inclusive.Sampler),
-            ("distribution_noniid", distribution_noniid.Sampler),
-            ("label_quantity_noniid", label_quantity_noniid.Sampler),
-            ("mixed_label_quantity_noniid", mixed_label_quantity_noniid.Sampler),
-            ("sample_quantity_noniid", sample_quantity_noniid.Sampler),
-            ("modality_iid", modality_iid.Sampler),
-            ("modality_quantity_noniid", modality_quantity_noniid.Sampler),
-        ]
+    registered_samplers = LazyRegistry(
+        {
+            "iid": "plato.samplers.iid:Sampler",
+            "noniid": "plato.samplers.dirichlet:Sampler",
+            "mixed": "plato.samplers.mixed:Sampler",
+            "orthogonal": "plato.samplers.orthogonal:Sampler",
+            "all_inclusive": "plato.samplers.all_inclusive:Sampler",
+            "distribution_noniid": "plato.samplers.distribution_noniid:Sampler",
+            "label_quantity_noniid": "plato.samplers.label_quantity_noniid:Sampler",
+            "mixed_label_quantity_noniid": "plato.samplers.mixed_label_quantity_noniid:Sampler",
+            "sample_quantity_noniid": "plato.samplers.sample_quantity_noniid:Sampler",
+            "modality_iid": "plato.samplers.modality_iid:Sampler",
+            "modality_quantity_noniid": "plato.samplers.modality_quantity_noniid:Sampler",
+        },
+        group="plato.samplers",
     )
 
 
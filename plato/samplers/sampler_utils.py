@@ -4,6 +4,8 @@ Utility functions that samples local datasets
 
 import numpy as np
 
+from plato.samplers import partition_index
+
 
 def extend_indices(indices, required_total_size):
     """ Extend the indices to obtain the required total size
@@ -86,13 +88,11 @@ def assign_sub_classes(dataset_labels,
             keep_anchor_classes_size (list, default None): how many classes in anchor are utilized
                                                         in the class pool for global classes
                                                         assignment.
+
+        Returns:
+            PartitionIndex: the indices of samples assigned to each client
     """
-    # define the client_id to sample index mapper
-    clients_dataidx_map = {
-        client_id: np.ndarray(0, dtype=np.int64)
-        for client_id in range(num_clients)
-    }
-    dataset_labels = np.array(dataset_labels)
+    dataset_labels = np.asarray(dataset_labels)
 
     classes_assigned_count = {cls_i: 0 for cls_i in dataset_classes}
     clients_contain_classes = {cli_i: [] for cli_i in range(num_clients)}
@@ -124,22 +124,66 @@ def assign_sub_classes(dataset_labels,
                     classes_assigned_count[ind] += 1
         clients_contain_classes[client_id] = current_assigned_cls
 
-    for class_id in dataset_classes:
+    # the clients containing each class, in the order of their ids
+    class_clients = {cls_i: [] for cls_i in dataset_classes}
+    for client_id in range(num_clients):
+        for class_id in dict.fromkeys(clients_contain_classes[client_id]):
+            class_clients[class_id].append(client_id)
+
+    # the indices of samples sorted by their classes, so that the samples of
+    #  each class are a contiguous run in their original order
+    sorted_idxs = np.argsort(dataset_labels, kind="stable")
+    sorted_labels = dataset_labels[sorted_idxs]
+
+    # each client receives one segment of the samples of each class it contains
+    segment_clients, segment_classes = [], []
+    segment_starts, segment_sizes = [], []
+    for class_pos, class_id in enumerate(dataset_classes):
         # skip if this class is never assinged to any clients
         if classes_assigned_count[class_id] == 0:
             continue
 
-        idx_k = np.where(dataset_labels == class_id)[0]
-
-        # the samples of current class are evenly assigned to the corresponding clients
-        split = np.array_split(idx_k, classes_assigned_count[class_id])
-        ids = 0
-        for client_id in range(num_clients):
-            if class_id in clients_contain_classes[client_id]:
-                clients_dataidx_map[client_id] = np.append(
-                    clients_dataidx_map[client_id], split[ids])
-                ids += 1
-    return clients_dataidx_map
+        start = np.searchsorted(sorted_labels, class_id, side="left")
+        end = np.searchsorted(sorted_labels, class_id, side="right")
+
+        # the samples of current class are evenly assigned to the corresponding
+        #  clients, in the same way as np.array_split()
+        num_parts = classes_assigned_count[class_id]
+        sizes = np.full(num_parts, (end - start) // num_parts, dtype=np.int64)
+        sizes[:(end - start) % num_parts] += 1
+        starts = start + np.cumsum(sizes) - sizes
+
+        clients = class_clients[class_id]
+        segment_clients.append(np.asarray(clients, dtype=np.int64))
+        segment_classes.append(np.full(len(clients), class_pos))
+        segment_starts.append(starts[:len(clients)])
+        segment_sizes.append(sizes[:len(clients)])
+
+    if len(segment_clients) == 0:
+        return partition_index.PartitionIndex(
+            np.zeros(num_clients + 1, dtype=np.int64), [])
+
+    segment_clients = np.concatenate(segment_clients)
+    segment_starts = np.concatenate(segment_starts)
+    segment_sizes = np.concatenate(segment_sizes)
+
+    offsets = np.zeros(num_clients + 1, dtype=np.int64)
+    np.cumsum(np.bincount(segment_clients,
+                          weights=segment_sizes,
+                          minlength=num_clients).astype(np.int64),
+              out=offsets[1:])
+
+    # the segments of each client are concatenated in the order of the classes
+    order = np.lexsort((np.concatenate(segment_classes), segment_clients))
+    segment_starts = segment_starts[order]
+    segment_sizes = segment_sizes[order]
+
+    # gathering all the segments at once
+    segment_offsets = np.cumsum(segment_sizes) - segment_sizes
+    positions = np.repeat(segment_starts - segment_offsets,
+                          segment_sizes) + np.arange(segment_sizes.sum())
+
+    return partition_index.PartitionIndex(offsets, sorted_idxs[positions])
 
 
 def create_dirichlet_skew(
@@ -3,13 +3,15 @@ The base class for federated learning servers.
 """
 
 import asyncio
+import copy
+import functools
+import hashlib
 import heapq
 import logging
 import multiprocessing as mp
 import os
 import pickle
 import random
-import sys
 import time
 from abc import abstractmethod
 from types import SimpleNamespace
@@ -21,8 +23,17 @@ from aiohttp import web
 from plato.callbacks.handler import CallbackHandler
 from plato.callbacks.server import LogProgressCallback
 from plato.client import run
+from plato.clients import pool
 from plato.config import Config
-from plato.utils import s3, fonts
+from plato.trainers import worker
+from plato.utils import (
+    checkpoint_store,
+    checkpoint_writer,
+    chunked_transfer,
+    fonts,
+    payload_codec,
+    s3,
+)
 
 
 class ServerEvents(socketio.AsyncNamespace):
@@ -52,7 +63,9 @@ class ServerEvents(socketio.AsyncNamespace):
 
     async def on_chunk(self, sid, data):
         """A chunk of data from the server arrived."""
-        await self.plato_server.client_chunk_arrived(sid, data["data"])
+        await self.plato_server.client_chunk_arrived(
+            sid, data["data"], offset=data.get("offset"), size=data.get("size")
+        )
 
     async def on_client_payload(self, sid, data):
         """An existing client sends a new payload from local training."""
@@ -75,13 +88,15 @@ class Server:
         self.sio = None
         self.client = None
         self.clients = {}
+        # The client id registered with each sid, to look up clients by their sids
+        self.client_ids = {}
         self.total_clients = 0
         # The client ids are stored for client selection
         self.clients_pool = []
         self.clients_per_round = 0
         self.selected_clients = None
         self.selected_client_id = 0
-        self.selected_sids = []
+        self.selected_sids = set()
         self.current_round = 0
         self.resumed_session = False
         self.algorithm = None
@@ -90,8 +105,13 @@ class Server:
         self.reports = {}
         self.updates = []
         self.client_payload = {}
+
+        # Held while client reports are processed, so that reports arriving while the
+        # model is aggregated and tested off the event loop wait for the next round
+        self.reports_lock = asyncio.Lock()
         self.client_chunks = {}
         self.s3_client = None
+        self.client_pool = None
         self.outbound_processor = None
         self.inbound_processor = None
         self.comm_simulation = (
@@ -100,6 +120,12 @@ class Server:
             else True
         )
 
+        # Whether payloads are published in shared memory for clients on this host
+        self.shared_memory = (
+            hasattr(Config().clients, "shared_memory")
+            and Config().clients.shared_memory
+        )
+
         # Starting from the default server callback class, add all supplied server callbacks
         self.callbacks = [LogProgressCallback]
         if callbacks is not None:
@@ -131,10 +157,42 @@ class Server:
         self.downlink_comm_time = {}
         self.uplink_comm_time = {}
 
+        # In communication simulation mode or with shared memory, the payload files
+        # written in each round, and the payloads already written in the current round
+        # along with their files
+        self.payload_files = {}
+        self.written_payloads = {}
+
+        # Checkpoints are written on a background thread, and only the most recent
+        # `checkpoint_keep_last` of them and those of every `checkpoint_keep_every`
+        # rounds are retained if specified. With incremental checkpoints, the model
+        # weights are stored as content-addressed tensors shared across checkpoints,
+        # so that each checkpoint only writes the tensors that changed
+        self.checkpoint_store = None
+        if (
+            hasattr(Config().server, "incremental_checkpoints")
+            and Config().server.incremental_checkpoints
+        ):
+            self.checkpoint_store = checkpoint_store.CheckpointStore(
+                Config().params["checkpoint_path"]
+            )
+
+        self.checkpoint_writer = checkpoint_writer.CheckpointWriter(
+            keep_last=Config().server.checkpoint_keep_last
+            if hasattr(Config().server, "checkpoint_keep_last")
+            else None,
+            keep_every=Config().server.checkpoint_keep_every
+            if hasattr(Config().server, "checkpoint_keep_every")
+            else None,
+            cleanup=self.checkpoint_store.collect_garbage
+            if self.checkpoint_store is not None
+            else None,
+        )
+
         # States that need to be maintained for asynchronous FL
 
         # sids that are currently in use
-        self.training_sids = []
+        self.training_sids = set()
 
         # Clients whose new reports were received but not yet processed
         self.reported_clients = []
@@ -281,6 +339,18 @@ class Server:
 
         if self.disable_clients:
             logging.info("No clients are launched (server:disable_clients = true)")
+        elif (
+            hasattr(Config().clients, "worker_pool")
+            and Config().clients.worker_pool
+            and not Config().is_central_server()
+        ):
+            # Clients run in a pool of worker processes, exchanging payloads with
+            # the server through shared memory
+            self.comm_simulation = False
+            self.client_pool = pool.ClientPool(
+                self, client=self.client, processes=Server.client_processes()
+            )
+            asyncio.get_event_loop().create_task(self.client_pool.run())
         else:
             Server.start_clients(client=self.client)
 
@@ -326,6 +396,7 @@ class Server:
                 "sid": sid,
                 "last_contacted": time.perf_counter(),
             }
+            self.client_ids[sid] = client_id
             logging.info("[%s] New client with id #%d arrived.", self, client_id)
         else:
             self.clients[client_id]["last_contacted"] = time.perf_counter()
@@ -353,12 +424,8 @@ class Server:
             await self.select_clients()
 
     @staticmethod
-    def start_clients(
-        client=None, as_server=False, edge_server=None, edge_client=None, trainer=None
-    ):
-        """Starting all the clients as separate processes."""
-        starting_id = 1
-
+    def client_processes() -> int:
+        """The number of client processes to launch."""
         # We only need to launch the number of clients necessary for concurrent training
         # If `max_concurrency` in `trainer` is specified, the limit number is
         # `max_concurrency` multiply the number of available devices
@@ -380,6 +447,16 @@ class Server:
         else:
             client_processes = Config().clients.per_round
 
+        return client_processes
+
+    @staticmethod
+    def start_clients(
+        client=None, as_server=False, edge_server=None, edge_client=None, trainer=None
+    ):
+        """Starting all the clients as separate processes."""
+        starting_id = 1
+        client_processes = Server.client_processes()
+
         if as_server:
             total_processes = Config().algorithm.total_silos
             starting_id += Config().clients.total_clients
@@ -409,6 +486,13 @@ class Server:
 
     async def close_connections(self):
         """Closing all socket.io connections after training completes."""
+        if self.client_pool is not None:
+            self.client_pool.close()
+
+        if self.shared_memory:
+            # Payloads in shared memory take up memory until they are removed
+            self.remove_payload_files(remove_all=True)
+
         for client_id, client in dict(self.clients).items():
             logging.info("Closing the connection to client #%d.", client_id)
             await self.sio.emit("disconnect", room=client["sid"])
@@ -420,6 +504,9 @@ class Server:
             self.current_round += 1
             self.round_start_wall_time = self.wall_time
 
+            if self.comm_simulation or self.shared_memory:
+                self.remove_payload_files()
+
             if hasattr(Config().trainer, "max_concurrency"):
                 self.trained_clients = []
 
@@ -453,24 +540,7 @@ class Server:
 
                 # Except for these two cases, we need to exclude the clients who are still
                 # training.
-                training_client_ids = [
-                    self.training_clients[client_id]["id"]
-                    for client_id in list(self.training_clients.keys())
-                ]
-
-                # If the server is simulating the wall clock time, some of the clients who
-                # reported may not have been aggregated; they should be excluded from the next
-                # round of client selection
-                reporting_client_ids = [
-                    client[2]["client_id"] for client in self.reported_clients
-                ]
-
-                selectable_clients = [
-                    client
-                    for client in self.clients_pool
-                    if client not in training_client_ids
-                    and client not in reporting_client_ids
-                ]
+                selectable_clients = self.selectable_clients(self.clients_pool)
 
                 if self.simulate_wall_time:
                     self.selected_clients = self.choose_clients(
@@ -498,7 +568,7 @@ class Server:
                 self.reported_clients = []
 
         if len(self.selected_clients) > 0:
-            self.selected_sids = []
+            self.selected_sids = set()
 
             # If max_concurrency is specified, run selected clients batch by batch,
             # and the number of clients in each batch (on each GPU, if multiple GPUs are available)
@@ -556,8 +626,8 @@ class Server:
                         client_id = client_id % self.clients_per_round + 1
                         sid = self.clients[client_id]["sid"]
 
-                    self.training_sids.append(sid)
-                    self.selected_sids.append(sid)
+                    self.training_sids.add(sid)
+                    self.selected_sids.add(sid)
 
                 self.training_clients[self.selected_client_id] = {
                     "id": self.selected_client_id,
@@ -593,24 +663,11 @@ class Server:
                     # First apply outbound processors, if any
                     payload = self.outbound_processor.process(payload)
 
-                    model_name = (
-                        Config().trainer.model_name
-                        if hasattr(Config().trainer, "model_name")
-                        else "custom"
-                    )
-                    checkpoint_path = Config().params["checkpoint_path"]
-
-                    payload_filename = (
-                        f"{checkpoint_path}/{model_name}_{self.selected_client_id}.pth"
-                    )
-
-                    with open(payload_filename, "wb") as payload_file:
-                        pickle.dump(payload, payload_file)
+                    payload_filename, payload_size = self.write_payload_file(payload)
+                    payload_size = payload_size / 1024**2
 
                     server_response["payload_filename"] = payload_filename
 
-                    payload_size = sys.getsizeof(pickle.dumps(payload)) / 1024**2
-
                     logging.info(
                         "[%s] Sending %.2f MB of payload data to client #%d (simulated).",
                         self,
@@ -625,12 +682,43 @@ class Server:
                         (self.downlink_bandwidth / 8) / len(self.selected_clients)
                     )
 
+                if self.client_pool is not None:
+                    # First apply outbound processors, if any
+                    payload = self.outbound_processor.process(payload)
+                    payload_size = self.client_pool.send(sid, server_response, payload)
+
+                    logging.info(
+                        "[%s] Sent %.2f MB of payload data to client #%d (shared memory).",
+                        self,
+                        payload_size / 1024**2,
+                        self.selected_client_id,
+                    )
+                    self.comm_overhead += payload_size / 1024**2
+                    continue
+
+                if self.shared_memory and not self.comm_simulation:
+                    # First apply outbound processors, if any
+                    payload = self.outbound_processor.process(payload)
+
+                    # The payload is published once per round, and clients map it
+                    # into memory rather than receiving a copy
+                    payload_filename, payload_size = self.write_payload_file(payload)
+                    server_response["payload_segment"] = payload_filename
+
+                    logging.info(
+                        "[%s] Sent %.2f MB of payload data to client #%d (shared memory).",
+                        self,
+                        payload_size / 1024**2,
+                        self.selected_client_id,
+                    )
+                    self.comm_overhead += payload_size / 1024**2
+
                 # Sending the server response as metadata to the clients (payload to follow)
                 await self.sio.emit(
                     "payload_to_arrive", {"response": server_response}, room=sid
                 )
 
-                if not self.comm_simulation:
+                if not self.comm_simulation and not self.shared_memory:
                     # Sending the server payload to the client
                     logging.info(
                         "[%s] Sending the current model to client #%d.",
@@ -645,6 +733,80 @@ class Server:
                 "on_clients_selected", self, self.selected_clients
             )
 
+    def write_payload_file(self, payload):
+        """Writes a payload to a file for a selected client to read when communication is
+        simulated or payloads are published in shared memory, and returns the file name
+        and its size in bytes.
+
+        The file is named after a digest of the encoded payload. If the same payload
+        has already been written in the current round, such as the global model sent
+        to all the selected clients, its file is reused without encoding it again.
+        With shared memory, the file is a POSIX shared memory segment in /dev/shm,
+        which all the clients on this host map into memory without copying it.
+        """
+        key = payload_codec.fingerprint(payload)
+        if key is not None and key in self.written_payloads:
+            __, payload_filename, payload_size = self.written_payloads[key]
+            return payload_filename, payload_size
+
+        data = payload_codec.encode(payload)
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+        model_name = (
+            Config().trainer.model_name
+            if hasattr(Config().trainer, "model_name")
+            else "custom"
+        )
+        checkpoint_path = Config().params["checkpoint_path"]
+        if self.shared_memory and os.path.isdir("/dev/shm"):
+            checkpoint_path = "/dev/shm"
+        payload_filename = f"{checkpoint_path}/{model_name}_{os.getpid()}_{digest}.pth"
+
+        if not os.path.exists(payload_filename):
+            # Clients may be mapping files of earlier rounds into memory, so a new file
+            # is written under a temporary name and then renamed
+            temp_filename = f"{payload_filename}.tmp"
+            with open(temp_filename, "wb") as payload_file:
+                payload_file.write(data)
+            os.replace(temp_filename, payload_filename)
+
+        self.payload_files.setdefault(self.current_round, set()).add(payload_filename)
+
+        if key is not None:
+            # Keeping the payload alive so that its fingerprint remains valid
+            self.written_payloads[key] = (payload, payload_filename, len(data))
+
+        return payload_filename, len(data)
+
+    def remove_payload_files(self, remove_all=False):
+        """Removes the payload files written before the previous round that are no
+        longer in use, when a new round starts, or all of them with `remove_all`."""
+        self.written_payloads = {}
+
+        recent_files = set()
+        if not remove_all:
+            recent_files = self.payload_files.get(self.current_round - 1, set())
+
+        for round_written in list(self.payload_files):
+            if remove_all or round_written < self.current_round - 1:
+                for payload_filename in self.payload_files[round_written] - recent_files:
+                    if os.path.exists(payload_filename):
+                        os.remove(payload_filename)
+
+                del self.payload_files[round_written]
+
+    def selectable_clients(self, clients_pool):
+        """Returns the clients in a pool that are neither training nor waiting for
+        their reports to be processed, in the order of the pool."""
+        busy_clients = {client["id"] for client in self.training_clients.values()}
+
+        # If the server is simulating the wall clock time, some of the clients who
+        # reported may not have been aggregated; they should be excluded from the next
+        # round of client selection
+        busy_clients.update(client[2]["client_id"] for client in self.reported_clients)
+
+        return [client for client in clients_pool if client not in busy_clients]
+
     def choose_clients(self, clients_pool, clients_count):
         """Choose a subset of the clients to participate in each round."""
         assert clients_count <= len(clients_pool)
@@ -673,8 +835,13 @@ class Server:
         if callable(_task):
             await self.customize_periodic_task()
 
-        # If we are operating in asynchronous mode, aggregate the model updates received so far.
-        if self.asynchronous_mode and not self.simulate_wall_time:
+        # If we are operating in asynchronous mode, aggregate the model updates received so far,
+        # unless they are being processed already
+        if (
+            self.asynchronous_mode
+            and not self.simulate_wall_time
+            and not self.reports_lock.locked()
+        ):
             # Is there any training clients who are currently training on models that are too
             # `stale,` as defined by the staleness threshold?
             for __, client_data in self.training_clients.items():
@@ -701,9 +868,10 @@ class Server:
                     self,
                     len(self.updates),
                 )
-                await self._process_reports()
-                await self.wrap_up()
-                await self.select_clients()
+                async with self.reports_lock:
+                    await self._process_reports()
+                    await self.wrap_up()
+                    await self.select_clients()
             else:
                 logging.info(
                     "[%s] No sufficient number of client reports have been received. "
@@ -713,12 +881,7 @@ class Server:
 
     async def send_in_chunks(self, data, sid, client_id) -> None:
         """Sending a bytes object in fixed-sized chunks to the client."""
-        step = 1024 ^ 2
-        chunks = [data[i : i + step] for i in range(0, len(data), step)]
-
-        for chunk in chunks:
-            await self.sio.emit("chunk", {"data": chunk}, room=sid)
-
+        await chunked_transfer.send(self.sio, data, to=sid)
         await self.sio.emit("payload", {"id": client_id}, room=sid)
 
     async def send(self, sid, payload, client_id) -> None:
@@ -730,22 +893,24 @@ class Server:
 
         if self.s3_client is not None:
             s3_key = f"server_payload_{os.getpid()}_{self.current_round}"
-            self.s3_client.send_to_s3(s3_key, payload)
-            data_size = sys.getsizeof(pickle.dumps(payload))
+            await self.s3_client.send(s3_key, payload)
+            # The same key is shared by all the clients selected in this round, so
+            # the payload is only uploaded once
+            data_size = payload_codec.sizeof(payload)
             metadata["s3_key"] = s3_key
         else:
             data_size = 0
 
             if isinstance(payload, list):
                 for data in payload:
-                    _data = pickle.dumps(data)
+                    _data = payload_codec.encode(data)
                     await self.send_in_chunks(_data, sid, client_id)
-                    data_size += sys.getsizeof(_data)
+                    data_size += len(_data)
 
             else:
-                _data = pickle.dumps(payload)
+                _data = payload_codec.encode(payload)
                 await self.send_in_chunks(_data, sid, client_id)
-                data_size = sys.getsizeof(_data)
+                data_size = len(_data)
 
         await self.sio.emit("payload_done", metadata, room=sid)
 
@@ -762,7 +927,7 @@ class Server:
         """Upon receiving a report from a client."""
         self.reports[sid] = pickle.loads(report)
         self.client_payload[sid] = None
-        self.client_chunks[sid] = []
+        self.client_chunks[sid] = chunked_transfer.ChunkBuffer()
 
         if self.comm_simulation:
             model_name = (
@@ -772,12 +937,9 @@ class Server:
             )
             checkpoint_path = Config().params["checkpoint_path"]
             payload_filename = f"{checkpoint_path}/{model_name}_client_{client_id}.pth"
-            with open(payload_filename, "rb") as payload_file:
-                self.client_payload[sid] = pickle.load(payload_file)
+            self.client_payload[sid] = payload_codec.load(payload_filename)
 
-            payload_size = (
-                sys.getsizeof(pickle.dumps(self.client_payload[sid])) / 1024**2
-            )
+            payload_size = os.path.getsize(payload_filename) / 1024**2
 
             logging.info(
                 "[%s] Received %.2f MB of payload data from client #%d (simulated).",
@@ -794,17 +956,16 @@ class Server:
 
             await self.process_client_info(client_id, sid)
 
-    async def client_chunk_arrived(self, sid, data) -> None:
+    async def client_chunk_arrived(self, sid, data, offset=None, size=None) -> None:
         """Upon receiving a chunk of data from a client."""
-        self.client_chunks[sid].append(data)
+        self.client_chunks[sid].append(data, offset=offset, size=size)
 
     async def client_payload_arrived(self, sid, client_id):
         """Upon receiving a portion of the payload from a client."""
         assert len(self.client_chunks[sid]) > 0 and client_id in self.training_clients
 
-        payload = b"".join(self.client_chunks[sid])
-        _data = pickle.loads(payload)
-        self.client_chunks[sid] = []
+        payload = self.client_chunks[sid].getvalue()
+        _data = payload_codec.decode(payload)
 
         if self.client_payload[sid] is None:
             self.client_payload[sid] = _data
@@ -819,15 +980,11 @@ class Server:
         if s3_key is None:
             assert self.client_payload[sid] is not None
 
-            payload_size = 0
-            if isinstance(self.client_payload[sid], list):
-                for _data in self.client_payload[sid]:
-                    payload_size += sys.getsizeof(pickle.dumps(_data))
-            else:
-                payload_size = sys.getsizeof(pickle.dumps(self.client_payload[sid]))
+            # The number of bytes received in chunks since the client's report arrived
+            payload_size = self.client_chunks[sid].transferred
         else:
-            self.client_payload[sid] = self.s3_client.receive_from_s3(s3_key)
-            payload_size = sys.getsizeof(pickle.dumps(self.client_payload[sid]))
+            self.client_payload[sid] = await self.s3_client.receive(s3_key)
+            payload_size = payload_codec.sizeof(self.client_payload[sid])
 
         logging.info(
             "[%s] Received %.2f MB of payload data from client #%d.",
@@ -842,10 +999,17 @@ class Server:
 
     async def process_client_info(self, client_id, sid):
         """Process the received metadata information from a reporting client."""
+        async with self.reports_lock:
+            await self._process_client_info(client_id, sid)
+
+    async def _process_client_info(self, client_id, sid):
+        """Process the received metadata information from a reporting client, while
+        holding the lock on processing reports."""
         # First pass through the inbound_processor(s), if any
         self.client_payload[sid] = self.inbound_processor.process(
             self.client_payload[sid]
         )
+        self.client_payload_processed(sid, client_id)
 
         if self.comm_simulation:
             if (
@@ -1107,54 +1271,137 @@ class Server:
 
     async def client_disconnected(self, sid):
         """When a client disconnected it should be removed from its internal states."""
-        for client_id, client in dict(self.clients).items():
-            if client["sid"] == sid:
-                del self.clients[client_id]
+        client_id = self.client_ids.pop(sid, None)
+        if client_id is None or self.clients.get(client_id, {}).get("sid") != sid:
+            return
+
+        del self.clients[client_id]
 
-                if client_id in self.training_clients:
-                    del self.training_clients[client_id]
+        if client_id in self.training_clients:
+            del self.training_clients[client_id]
 
-                if client_id in self.current_reported_clients:
-                    del self.current_reported_clients[client_id]
+        if client_id in self.current_reported_clients:
+            del self.current_reported_clients[client_id]
 
+        logging.info(
+            "[%s] Client #%d disconnected and removed from this server.",
+            self,
+            client_id,
+        )
+
+        if client_id in self.selected_clients:
+            self.selected_clients.remove(client_id)
+
+            if (
+                len(self.updates) >= len(self.selected_clients)
+                and not self.reports_lock.locked()
+            ):
                 logging.info(
-                    "[%s] Client #%d disconnected and removed from this server.",
+                    "[%s] All %d client report(s) received. Processing.",
                     self,
-                    client_id,
+                    len(self.updates),
                 )
-
-                if client_id in self.selected_clients:
-                    self.selected_clients.remove(client_id)
-
-                    if len(self.updates) >= len(self.selected_clients):
-                        logging.info(
-                            "[%s] All %d client report(s) received. Processing.",
-                            self,
-                            len(self.updates),
-                        )
-                        await self._process_reports()
-                        await self.wrap_up()
-                        await self.select_clients()
+                async with self.reports_lock:
+                    await self._process_reports()
+                    await self.wrap_up()
+                    await self.select_clients()
 
     def save_to_checkpoint(self):
-        """Save a checkpoint for resuming the training session."""
+        """Save a checkpoint for resuming the training session.
+
+        The model weights, the run history and the random states are copied right away,
+        and written to files on a background thread.
+        """
         checkpoint_path = Config.params["checkpoint_path"]
+        model_snapshot = self.snapshot_model()
 
-        model_name = (
-            Config().trainer.model_name
-            if hasattr(Config().trainer, "model_name")
-            else "custom"
+        filename = self.checkpoint_filename(
+            self.current_round,
+            incremental=model_snapshot is not None
+            and self.checkpoint_store is not None,
         )
-        filename = f"checkpoint_{model_name}_{self.current_round}.pth"
         logging.info(
             "[%s] Saving the checkpoint to %s/%s.", self, checkpoint_path, filename
         )
-        self.trainer.save_model(filename, checkpoint_path)
-        self.save_random_states(self.current_round, checkpoint_path)
 
-        # Saving the current round in the server for resuming its session later on
-        with open(f"{checkpoint_path}/current_round.pkl", "wb") as checkpoint_file:
-            pickle.dump(self.current_round, checkpoint_file)
+        if model_snapshot is None:
+            # The trainer saves its model in its own way, so it is saved right away
+            self.trainer.save_model(filename, checkpoint_path)
+            files = [
+                (f"{checkpoint_path}/{filename}", None),
+                (f"{checkpoint_path}/{filename}.pkl", None),
+            ]
+        else:
+            import torch  # pylint: disable=import-outside-toplevel
+
+            weights, run_history = model_snapshot
+            if self.checkpoint_store is not None:
+                # Only the tensors not in any checkpoint stored yet are written
+                save_weights = functools.partial(self.checkpoint_store.save, weights)
+            else:
+                save_weights = functools.partial(torch.save, weights)
+
+            files = [
+                (f"{checkpoint_path}/{filename}", save_weights),
+                (
+                    f"{checkpoint_path}/{filename}.pkl",
+                    checkpoint_writer.pickle_writer(run_history),
+                ),
+            ]
+
+        # Saving the random states in the server for resuming its session later on
+        files.append(
+            (
+                f"{checkpoint_path}/numpy_prng_state_{self.current_round}.pkl",
+                checkpoint_writer.pickle_writer(np.random.get_state()),
+            )
+        )
+        files.append(
+            (
+                f"{checkpoint_path}/prng_state_{self.current_round}.pkl",
+                checkpoint_writer.pickle_writer(random.getstate()),
+            )
+        )
+
+        # Saving the current round in the server for resuming its session later on,
+        # once the rest of the checkpoint has been written
+        self.checkpoint_writer.submit(
+            self.current_round,
+            files,
+            marker=(
+                f"{checkpoint_path}/current_round.pkl",
+                checkpoint_writer.pickle_writer(self.current_round),
+            ),
+        )
+
+    def snapshot_model(self):
+        """Returns a copy of the model weights on the CPU and of the run history of the
+        trainer, to be saved in a checkpoint later, or None if the trainer saves its
+        model in a custom way."""
+        try:
+            # pylint: disable=import-outside-toplevel
+            from plato.trainers import basic
+        except ImportError:
+            return None
+
+        if not isinstance(self.trainer, basic.Trainer) or (
+            type(self.trainer).save_model is not basic.Trainer.save_model
+        ):
+            return None
+
+        if self.trainer.model_state_dict is None:
+            state_dict = self.trainer.model.state_dict()
+        else:
+            state_dict = self.trainer.model_state_dict
+
+        weights = state_dict.__class__(
+            (name, tensor.detach().to("cpu", copy=True))
+            for name, tensor in state_dict.items()
+        )
+        if hasattr(state_dict, "_metadata"):
+            weights._metadata = copy.deepcopy(state_dict._metadata)
+
+        return weights, copy.deepcopy(self.trainer.run_history)
 
     def resume_from_checkpoint(self):
         """Resume a training session from a previously saved checkpoint."""
@@ -1164,6 +1411,7 @@ class Server:
 
         # Loading important data in the server for resuming its session
         checkpoint_path = Config.params["checkpoint_path"]
+        self.checkpoint_writer.flush()
 
         with open(f"{checkpoint_path}/current_round.pkl", "rb") as checkpoint_file:
             self.current_round = pickle.load(checkpoint_file)
@@ -1171,13 +1419,45 @@ class Server:
         self.restore_random_states(self.current_round, checkpoint_path)
         self.resumed_session = True
 
+        self.load_checkpoint_model(self.current_round)
+
+    def checkpoint_filename(self, round_saved, incremental=False) -> str:
+        """Returns the name of the file with the model weights in the checkpoint of a
+        round, which is a manifest of the tensors in the checkpoint store if the
+        checkpoint is incremental."""
         model_name = (
             Config().trainer.model_name
             if hasattr(Config().trainer, "model_name")
             else "custom"
         )
-        filename = f"checkpoint_{model_name}_{self.current_round}.pth"
-        self.trainer.load_model(filename, checkpoint_path)
+        extension = "json" if incremental else "pth"
+        return f"checkpoint_{model_name}_{round_saved}.{extension}"
+
+    def load_checkpoint_model(self, round_saved) -> None:
+        """Loads the model weights and the run history of the trainer from the
+        checkpoint of a round, once all the checkpoints submitted have been written."""
+        checkpoint_path = Config.params["checkpoint_path"]
+        self.checkpoint_writer.flush()
+
+        filename = self.checkpoint_filename(round_saved, incremental=True)
+        if self.checkpoint_store is None or not os.path.exists(
+            f"{checkpoint_path}/{filename}"
+        ):
+            filename = self.checkpoint_filename(round_saved)
+            self.trainer.load_model(filename, checkpoint_path)
+            return
+
+        logging.info(
+            "[%s] Loading the model from the checkpoint %s/%s.",
+            self,
+            checkpoint_path,
+            filename,
+        )
+        weights = self.checkpoint_store.load(f"{checkpoint_path}/{filename}")
+        self.trainer.model.load_state_dict(weights, strict=True)
+
+        with open(f"{checkpoint_path}/{filename}.pkl", "rb") as history_file:
+            self.trainer.run_history = pickle.load(history_file)
 
     def save_random_states(self, round_to_save, checkpoint_path):
         """Saving the random states in the server for resuming its session later on."""
@@ -1216,7 +1496,16 @@ class Server:
 
     async def wrap_up(self):
         """Wrapping up when each round of training is done."""
-        self.save_to_checkpoint()
+        checkpoint_interval = (
+            Config().server.checkpoint_interval
+            if hasattr(Config().server, "checkpoint_interval")
+            else 1
+        )
+        if (
+            self.current_round % checkpoint_interval == 0
+            or self.current_round >= Config().trainer.rounds
+        ):
+            self.save_to_checkpoint()
 
         # Break the loop when the target accuracy is achieved
         target_accuracy = None
@@ -1249,6 +1538,11 @@ class Server:
         self.callback_handler.call_event("on_server_will_close", self)
 
         await self.close_connections()
+
+        # Checkpoints still being written must be complete, and the training worker
+        # processes stopped, before exiting
+        self.checkpoint_writer.close()
+        worker.stop_all()
         os._exit(0)
 
     def customize_server_response(self, server_response: dict, client_id) -> dict:
@@ -1267,6 +1561,12 @@ class Server:
         """
         Method called after clients have been selected in each round."""
 
+    def client_payload_processed(self, sid, client_id) -> None:
+        """
+        Method called after the payload from a client has passed through the inbound
+        processors, before it is added to the updates to be aggregated.
+        """
+
     def training_will_start(self):
         """
         Method called before selecting clients for the first round of training.
@@ -13,7 +13,7 @@ from plato.processors import registry as processor_registry
 from plato.samplers import all_inclusive
 from plato.servers import base
 from plato.trainers import registry as trainers_registry
-from plato.utils import csv_processor, fonts
+from plato.utils import aggregation, fonts, testset_cache
 
 
 class Server(base.Server):
@@ -40,9 +40,24 @@ class Server(base.Server):
         self.testset_sampler = None
         self.total_samples = 0
 
+        # The global model is tested every `test_interval` rounds
+        self.test_interval = (
+            Config().server.test_interval
+            if hasattr(Config().server, "test_interval")
+            else 1
+        )
+
         self.total_clients = Config().clients.total_clients
         self.clients_per_round = Config().clients.per_round
 
+        # Whether the payloads from the clients are summed up as soon as they arrive,
+        # rather than kept until all of them have arrived
+        self.streaming_aggregation = (
+            hasattr(Config().server, "streaming_aggregation")
+            and Config().server.streaming_aggregation
+        )
+        self.accumulator = None
+
         logging.info(
             "[Server #%d] Started training on %d clients with %d per round.",
             os.getpid(),
@@ -101,15 +116,20 @@ class Server(base.Server):
                     self.datasource, testing=True
                 )
 
-        # Initialize the test accuracy csv file if clients compute locally
-        if hasattr(Config().clients, "do_test") and Config().clients.do_test:
-            accuracy_csv_file = (
-                f"{Config().params['result_path']}/{os.getpid()}_accuracy.csv"
-            )
-            accuracy_headers = ["round", "client_id", "accuracy"]
-            csv_processor.initialize_csv(
-                accuracy_csv_file, accuracy_headers, Config().params["result_path"]
-            )
+            if (
+                hasattr(Config().server, "cache_testset")
+                and Config().server.cache_testset
+            ):
+                # Only the examples in the sampled subset of the test set are cached
+                indices = (
+                    None
+                    if self.testset_sampler is None
+                    else self.testset_sampler.data_samples
+                )
+                cached_testset = testset_cache.cache_testset(self.testset, indices)
+                if cached_testset is not None:
+                    self.testset = cached_testset
+                    self.testset_sampler = None
 
     def init_trainer(self):
         """Setting up the global model, trainer, and algorithm."""
@@ -150,17 +170,80 @@ class Server(base.Server):
 
         return avg_update
 
+    def can_average_weights(self, baseline_weights, weights_received) -> bool:
+        """Whether the weights received can be averaged by the algorithm directly,
+        rather than through aggregate_deltas(), which holds unless federated averaging
+        is customized by the server or the algorithm."""
+        return (
+            type(self).aggregate_deltas is Server.aggregate_deltas
+            and hasattr(self.algorithm, "can_average_weights")
+            and self.algorithm.can_average_weights(baseline_weights, weights_received)
+        )
+
+    def client_payload_processed(self, sid, client_id):
+        """Adds the payload from a client to the running sum of the weights received
+        and drops it, if payloads are aggregated as they arrive."""
+        if (
+            not self.streaming_aggregation
+            or (self.asynchronous_mode and self.simulate_wall_time)
+            or hasattr(self, "aggregate_weights")
+            or type(self)._process_reports is not Server._process_reports
+            or type(self).weights_received is not Server.weights_received
+        ):
+            # With the wall clock time simulated in asynchronous mode, a payload may
+            # be aggregated in a later round than the one in which it arrives; and a
+            # server customizing weights_received() may keep other items from all the
+            # payloads, such as control variates, to be used after aggregation
+            return
+
+        weights_received = self.weights_received([self.client_payload[sid]])
+        baseline_weights = self.algorithm.extract_weights()
+
+        if not self.can_average_weights(baseline_weights, weights_received):
+            return
+
+        self.callback_handler.call_event("on_weights_received", self, weights_received)
+
+        if self.accumulator is None:
+            self.accumulator = aggregation.WeightAccumulator(baseline_weights)
+
+        self.accumulator.add(weights_received[0], self.reports[sid].num_samples)
+        self.client_payload[sid] = None
+
     async def _process_reports(self):
         """Process the client reports by aggregating their weights."""
-        weights_received = [update.payload for update in self.updates]
+        if self.accumulator is None:
+            weights_received = [update.payload for update in self.updates]
 
-        weights_received = self.weights_received(weights_received)
-        self.callback_handler.call_event("on_weights_received", self, weights_received)
+            weights_received = self.weights_received(weights_received)
+            self.callback_handler.call_event(
+                "on_weights_received", self, weights_received
+            )
 
         # Extract the current model weights as the baseline
         baseline_weights = self.algorithm.extract_weights()
 
-        if hasattr(self, "aggregate_weights"):
+        if self.accumulator is not None:
+            # The weights received have been summed up as they arrived
+            logging.info(
+                "[Server #%d] Averaging model weights summed up on arrival.",
+                os.getpid(),
+            )
+            for update in self.updates:
+                if update.payload is not None:
+                    self.accumulator.add(update.payload, update.report.num_samples)
+
+            self.total_samples = sum(
+                update.report.num_samples for update in self.updates
+            )
+            updated_weights = self.accumulator.result(
+                baseline_weights, scale=1 / self.total_samples
+            )
+            self.accumulator = None
+
+            # Loads the new model weights
+            self.algorithm.load_weights(updated_weights)
+        elif hasattr(self, "aggregate_weights"):
             # Runs a server aggregation algorithm using weights rather than deltas
             logging.info(
                 "[Server #%d] Aggregating model weights directly rather than weight deltas.",
@@ -171,6 +254,24 @@ class Server(base.Server):
                 self.updates, baseline_weights, weights_received
             )
 
+            # Loads the new model weights
+            self.algorithm.load_weights(updated_weights)
+        elif self.can_average_weights(baseline_weights, weights_received):
+            # Averages the weights received in place, which is equivalent to
+            # aggregating their deltas with federated averaging
+            logging.info("[Server #%d] Averaging model weights in place.", os.getpid())
+            self.total_samples = sum(
+                update.report.num_samples for update in self.updates
+            )
+            updated_weights = await self.algorithm.average_weights(
+                baseline_weights,
+                weights_received,
+                [
+                    update.report.num_samples / self.total_samples
+                    for update in self.updates
+                ],
+            )
+
             # Loads the new model weights
             self.algorithm.load_weights(updated_weights)
         else:
@@ -200,10 +301,16 @@ class Server(base.Server):
             logging.info(
                 "[%s] Average client accuracy: %.2f%%.", self, 100 * self.accuracy
             )
+        elif self.test_skipped():
+            logging.info(
+                "[%s] Skipped model testing, keeping the accuracy of round %d.",
+                self,
+                self.current_round - self.current_round % self.test_interval,
+            )
         else:
             # Testing the updated model directly at the server
             logging.info("[%s] Started model testing.", self)
-            self.accuracy = self.trainer.test(self.testset, self.testset_sampler)
+            self.accuracy = await self.test_global_model()
 
         if hasattr(Config().trainer, "target_perplexity"):
             logging.info(
@@ -221,6 +328,21 @@ class Server(base.Server):
         self.clients_processed()
         self.callback_handler.call_event("on_clients_processed", self)
 
+    def test_skipped(self) -> bool:
+        """Whether testing the global model is skipped in this round, which is tested
+        every `test_interval` rounds, and in the last round."""
+        return (
+            self.current_round % self.test_interval != 0
+            and self.current_round < Config().trainer.rounds
+        )
+
+    async def test_global_model(self) -> float:
+        """Tests the global model on the test set of the server, off the event loop so
+        that the server keeps handling its clients meanwhile."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.trainer.test, self.testset, self.testset_sampler
+        )
+
     def clients_processed(self):
         """Additional work to be performed after client reports have been processed."""
 
@@ -201,6 +201,24 @@ class Server(fedavg.Server):
                 self.updates, baseline_weights, weights_received
             )
 
+            # Loads the new model weights
+            self.algorithm.load_weights(updated_weights)
+        elif self.can_average_weights(baseline_weights, weights_received):
+            # Averages the weights received in place, which is equivalent to
+            # aggregating their deltas with federated averaging
+            logging.info("[Server #%d] Averaging model weights in place.", os.getpid())
+            self.total_samples = sum(
+                update.report.num_samples for update in self.updates
+            )
+            updated_weights = await self.algorithm.average_weights(
+                baseline_weights,
+                weights_received,
+                [
+                    update.report.num_samples / self.total_samples
+                    for update in self.updates
+                ],
+            )
+
             # Loads the new model weights
             self.algorithm.load_weights(updated_weights)
         else:
@@ -265,7 +283,7 @@ class Server(fedavg.Server):
             and Config().server.do_test
         ):
             # Test the updated model directly at the central server
-            self.accuracy = self.trainer.test(self.testset, self.testset_sampler)
+            self.accuracy = await self.test_global_model()
             if hasattr(Config().trainer, "target_perplexity"):
                 logging.info(
                     "[%s] Global model perplexity: %.2f\n", self, self.accuracy
@@ -280,7 +298,7 @@ class Server(fedavg.Server):
             and Config().server.edge_do_test
         ):
             # Test the aggregated model directly at the edge server
-            self.accuracy = self.trainer.test(self.testset, self.testset_sampler)
+            self.accuracy = await self.test_global_model()
             if hasattr(Config().trainer, "target_perplexity"):
                 logging.info(
                     "[%s] Aggregated model perplexity: %.2f\n", self, self.accuracy
@@ -4,10 +4,8 @@ The training and testing loops for PyTorch.
 
 import copy
 import logging
-import multiprocessing as mp
 import os
 import pickle
-import re
 import time
 
 import torch
@@ -15,7 +13,15 @@ from plato.callbacks.handler import CallbackHandler
 from plato.callbacks.trainer import LogProgressCallback
 from plato.config import Config
 from plato.models import registry as models_registry
-from plato.trainers import base, loss_criterion, lr_schedulers, optimizers, tracking
+from plato.trainers import (
+    base,
+    loss_criterion,
+    lr_schedulers,
+    optimizers,
+    snapshots,
+    tracking,
+    worker,
+)
 
 
 class Trainer(base.Trainer):
@@ -31,7 +37,6 @@ class Trainer(base.Trainer):
         super().__init__()
 
         self.training_start_time = time.time()
-        self.models_per_epoch = {}
         self.model_state_dict = None
         self.current_round = 0
 
@@ -57,6 +62,22 @@ class Trainer(base.Trainer):
         self.lr_scheduler = None
         self.current_epoch = 0
 
+        # The persistent process running the training and testing loops when
+        # `max_concurrency` is set, started when first needed
+        self.training_worker = None
+
+        # The sleep time charged to the client's simulated training time in the current
+        # run, rather than slept, when the server simulates the wall clock time
+        self.simulated_sleep_time = 0
+
+        # The snapshots of the model after each epoch of the current training run, used
+        # to respond to urgent requests for model updates from the server
+        self.model_snapshots = snapshots.ModelSnapshots(
+            capacity=Config().server.snapshots_in_memory
+            if hasattr(Config().server, "snapshots_in_memory")
+            else None
+        )
+
     def zeros(self, shape):
         """Returns a PyTorch zero tensor with the given shape."""
         # This should only be called from a server
@@ -122,13 +143,24 @@ class Trainer(base.Trainer):
             self.run_history = pickle.load(history_file)
 
     def simulate_sleep_time(self):
-        """Simulate client's speed by putting it to sleep."""
+        """Simulate client's speed by putting it to sleep.
+
+        When the server simulates the wall clock time, the sleep time is only charged
+        to the training time reported by the client, which advances the server's
+        simulated clock just as much as sleeping would, without waiting."""
         if not (
             hasattr(Config().clients, "sleep_simulation")
             and Config().clients.sleep_simulation
         ):
             sleep_seconds = Config().client_sleep_times[self.client_id - 1]
 
+            if (
+                hasattr(Config().server, "simulate_wall_time")
+                and Config().server.simulate_wall_time
+            ):
+                self.simulated_sleep_time += sleep_seconds
+                return
+
             # Put this client to sleep
             logging.info(
                 "[Client #%d] Going to sleep for %.2f seconds.",
@@ -151,6 +183,9 @@ class Trainer(base.Trainer):
         sampler: The sampler that extracts a partition for this client.
         kwargs (optional): Additional keyword arguments.
         """
+        self.simulated_sleep_time = 0
+        self.model_snapshots.start(self.client_id)
+
         try:
             self.train_model(config, trainset, sampler.get(), **kwargs)
         except Exception as training_exception:
@@ -251,18 +286,15 @@ class Trainer(base.Trainer):
             ):
                 self.simulate_sleep_time()
 
-            # Saving the model at the end of this epoch to a file so that
+            # Taking a snapshot of the model at the end of this epoch so that
             # it can later be retrieved to respond to server requests
             # in asynchronous mode when the wall clock time is simulated
             if (
                 hasattr(Config().server, "request_update")
                 and Config().server.request_update
             ):
-                self.model.cpu()
-                training_time = time.perf_counter() - tic
-                filename = f"{self.client_id}_{self.current_epoch}_{training_time}.pth"
-                self.save_model(filename)
-                self.model.to(self.device)
+                training_time = time.perf_counter() - tic + self.simulated_sleep_time
+                self.model_snapshots.add(training_time, self.model.state_dict())
 
             self.run_history.update_metric("train_loss", self._loss_tracker.average)
             self.train_epoch_end(config)
@@ -291,35 +323,34 @@ class Trainer(base.Trainer):
         if "max_concurrency" in config:
             tic = time.perf_counter()
 
-            if mp.get_start_method(allow_none=True) != "spawn":
-                mp.set_start_method("spawn", force=True)
+            if self.training_worker is None:
+                self.training_worker = worker.TrainingWorker()
 
-            train_proc = mp.Process(
-                target=self.train_process,
-                args=(config, trainset, sampler),
-                kwargs=kwargs,
+            # The snapshots of the previous run are not sent to the worker
+            self.model_snapshots.clear()
+
+            result = self.training_worker.run(
+                "train", self, config, trainset, sampler, **kwargs
             )
-            train_proc.start()
-            train_proc.join()
 
-            model_name = Config().trainer.model_name
-            filename = f"{model_name}_{self.client_id}_{Config().params['run_id']}.pth"
+            if result is None:
+                raise ValueError(f"Training on client {self.client_id} failed.")
 
-            try:
-                self.load_model(filename)
-            except OSError as error:  # the model file is not found, training failed
-                raise ValueError(
-                    f"Training on client {self.client_id} failed."
-                ) from error
+            (
+                weights,
+                self.run_history,
+                self.simulated_sleep_time,
+                self.model_snapshots,
+            ) = result
+            self.model.load_state_dict(weights, strict=True)
 
             toc = time.perf_counter()
-            self.pause_training()
         else:
             tic = time.perf_counter()
             self.train_process(config, trainset, sampler, **kwargs)
             toc = time.perf_counter()
 
-        training_time = toc - tic
+        training_time = toc - tic + self.simulated_sleep_time
 
         return training_time
 
@@ -371,28 +402,18 @@ class Trainer(base.Trainer):
         config["run_id"] = Config().params["run_id"]
 
         if hasattr(Config().trainer, "max_concurrency"):
-            if mp.get_start_method(allow_none=True) != "spawn":
-                mp.set_start_method("spawn", force=True)
+            if self.training_worker is None:
+                self.training_worker = worker.TrainingWorker()
+
+            # The snapshots of the previous run are not sent to the worker
+            self.model_snapshots.clear()
 
-            proc = mp.Process(
-                target=self.test_process, args=(config, testset, sampler), kwargs=kwargs
+            accuracy = self.training_worker.run(
+                "test", self, config, testset, sampler, **kwargs
             )
-            proc.start()
-            proc.join()
-
-            accuracy = -1
-            try:
-                model_name = Config().trainer.model_name
-                filename = (
-                    f"{model_name}_{self.client_id}_{Config().params['run_id']}.acc"
-                )
-                accuracy = self.load_accuracy(filename)
-            except OSError as error:  # the model file is not found, training failed
-                raise ValueError(
-                    f"Testing on client #{self.client_id} failed."
-                ) from error
 
-            self.pause_training()
+            if accuracy is None:
+                raise ValueError(f"Testing on client #{self.client_id} failed.")
         else:
             accuracy = self.test_process(config, testset, **kwargs)
 
@@ -403,38 +424,20 @@ class Trainer(base.Trainer):
         Obtain a saved model for a particular epoch that finishes just after the provided
         wall clock time is reached.
         """
-        # Constructing a list of epochs and training times
-        self.models_per_epoch = {}
+        # Locate the model at a specific wall clock time
+        snapshot = self.model_snapshots.find(wall_time - self.training_start_time)
 
-        for filename in os.listdir(Config().params["model_path"]):
-            split = re.match(
-                r"(?P<client_id>\d+)_(?P<epoch>\d+)_(?P<training_time>\d+.\d+).pth",
-                filename,
+        if snapshot is not None:
+            epoch, training_time, weights = snapshot
+            self.model.load_state_dict(weights, strict=True)
+            logging.info(
+                "[Client #%s] Responding to the server with the model after "
+                "epoch %s finished, at time %s.",
+                self.client_id,
+                epoch,
+                training_time + self.training_start_time,
             )
 
-            if split is not None:
-                epoch = split.group("epoch")
-                training_time = split.group("training_time")
-                if self.client_id == int(split.group("client_id")):
-                    self.models_per_epoch[epoch] = {
-                        "training_time": float(training_time),
-                        "model_checkpoint": filename,
-                    }
-        # Locate the model at a specific wall clock time
-        for epoch in sorted(self.models_per_epoch):
-            training_time = self.models_per_epoch[epoch]["training_time"]
-            model_checkpoint = self.models_per_epoch[epoch]["model_checkpoint"]
-            if training_time + self.training_start_time > wall_time:
-                self.load_model(model_checkpoint)
-                logging.info(
-                    "[Client #%s] Responding to the server with the model after "
-                    "epoch %s finished, at time %s.",
-                    self.client_id,
-                    epoch,
-                    training_time + self.training_start_time,
-                )
-                return self.model
-
         return self.model
 
     # pylint: disable=unused-argument
@@ -461,17 +464,29 @@ class Trainer(base.Trainer):
         sampler: the test sampler. The default is None.
         kwargs (optional): Additional keyword arguments.
         """
-        batch_size = config["batch_size"]
-
-        test_loader = torch.utils.data.DataLoader(
-            testset, batch_size=batch_size, shuffle=False, sampler=sampler
+        batch_size = (
+            config["test_batch_size"]
+            if "test_batch_size" in config
+            else config["batch_size"]
         )
 
+        if isinstance(testset, torch.utils.data.TensorDataset):
+            # Batches of a cached test set are sliced from its tensors directly
+            examples, labels = testset.tensors
+            if sampler is not None:
+                indices = torch.as_tensor(list(sampler))
+                examples, labels = examples[indices], labels[indices]
+            test_loader = zip(examples.split(batch_size), labels.split(batch_size))
+        else:
+            test_loader = torch.utils.data.DataLoader(
+                testset, batch_size=batch_size, shuffle=False, sampler=sampler
+            )
+
         correct = 0
         total = 0
 
         self.model.to(self.device)
-        with torch.no_grad():
+        with torch.inference_mode():
             for examples, labels in test_loader:
                 examples, labels = examples.to(self.device), labels.to(self.device)
 
@@ -132,18 +132,15 @@ class Trainer(basic.Trainer):
             ):
                 self.simulate_sleep_time()
 
-            # Saving the model at the end of this epoch to a file so that
+            # Taking a snapshot of the model at the end of this epoch so that
             # it can later be retrieved to respond to server requests
             # in asynchronous mode when the wall clock time is simulated
             if (
                 hasattr(Config().server, "request_update")
                 and Config().server.request_update
             ):
-                self.model.cpu()
-                training_time = time.perf_counter() - tic
-                filename = f"{self.client_id}_{self.current_epoch}_{training_time}.pth"
-                self.save_model(filename)
-                self.model.to(self.device)
+                training_time = time.perf_counter() - tic + self.simulated_sleep_time
+                self.model_snapshots.add(training_time, self.model.state_dict())
 
             self.run_history.update_metric("train_loss", self._loss_tracker.average)
             self.train_epoch_end(config)
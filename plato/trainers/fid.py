@@ -0,0 +1,143 @@
+"""
+The statistics of InceptionV3 features used to compute the Frechet Inception Distance
+(FID) between real and generated images.
+
+The mean and covariance of the features are accumulated batch by batch in float64, so
+that the features of all the examples are never held in memory at once. The statistics
+of a real test set do not change between evaluations, so they are computed once, and
+saved to a file named after a fingerprint of the test set.
+
+The matrix square root in the Frechet distance is only needed through its trace, which
+is computed from the eigenvalues of the symmetric matrix sqrt(S1) S2 sqrt(S1), where
+sqrt(S1) is computed once for the real statistics.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+# The statistics of the real test sets used in this process, by their fingerprints
+_real_statistics = {}
+
+
+class FeatureStatistics:
+    """The mean and covariance of features, accumulated in batches."""
+
+    def __init__(self, dims=2048):
+        self.count = 0
+        self.mean = np.zeros(dims)
+        self.scatter = np.zeros((dims, dims))
+        self.sqrt_covariance = None
+
+    def update(self, features) -> None:
+        """Adds a batch of features, one in each row, to the statistics."""
+        features = np.asarray(features, dtype=np.float64)
+        count = len(features)
+        if count == 0:
+            return
+
+        batch_mean = features.mean(axis=0)
+        centered = features - batch_mean
+        delta = batch_mean - self.mean
+        total = self.count + count
+
+        # Combining the moments of the batch with those accumulated so far
+        self.scatter += centered.T @ centered
+        self.scatter += np.outer(delta, delta) * (self.count * count / total)
+        self.mean += delta * (count / total)
+        self.count = total
+        self.sqrt_covariance = None
+
+    @property
+    def covariance(self):
+        """The unbiased covariance of the features."""
+        return self.scatter / (self.count - 1)
+
+    def sqrt(self):
+        """The square root of the covariance, which is symmetric."""
+        if self.sqrt_covariance is None:
+            eigenvalues, eigenvectors = np.linalg.eigh(self.covariance)
+            self.sqrt_covariance = (
+                eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+            ) @ eigenvectors.T
+
+        return self.sqrt_covariance
+
+    def frechet_distance(self, other) -> float:
+        """The Frechet distance between the Gaussians fitted to two sets of features."""
+        sqrt_covariance = self.sqrt()
+        product = sqrt_covariance @ other.covariance @ sqrt_covariance
+        trace_covmean = np.sqrt(np.clip(np.linalg.eigvalsh(product), 0, None)).sum()
+
+        return float(
+            np.sum((self.mean - other.mean) ** 2)
+            + np.trace(self.covariance)
+            + np.trace(other.covariance)
+            - 2.0 * trace_covmean
+        )
+
+    def save(self, filename) -> None:
+        """Saves the statistics to a file."""
+        temp_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_filename, "wb") as statistics_file:
+            np.savez(
+                statistics_file,
+                count=self.count,
+                mean=self.mean,
+                scatter=self.scatter,
+            )
+        os.replace(temp_filename, filename)
+
+    @staticmethod
+    def load(filename):
+        """Loads the statistics from a file."""
+        with np.load(filename) as saved:
+            statistics = FeatureStatistics(len(saved["mean"]))
+            statistics.count = int(saved["count"])
+            statistics.mean = saved["mean"]
+            statistics.scatter = saved["scatter"]
+
+        return statistics
+
+
+def testset_fingerprint(testset) -> str:
+    """A fingerprint of a test set, from its type, its size, and the contents of its
+    first and last examples."""
+    fingerprint = hashlib.sha256(
+        f"{type(testset).__name__}_{len(testset)}".encode("utf-8")
+    )
+    for index in (0, len(testset) - 1):
+        example = np.asarray(testset[index][0])
+        fingerprint.update(np.ascontiguousarray(example).tobytes())
+
+    return fingerprint.hexdigest()[:16]
+
+
+def real_statistics(testset, extract_features, batch_size, path):
+    """Returns the statistics of the features of a real test set, computed with
+    `extract_features` the first time, and then loaded from a file in `path`."""
+    import torch  # pylint: disable=import-outside-toplevel
+
+    fingerprint = testset_fingerprint(testset)
+    if fingerprint in _real_statistics:
+        return _real_statistics[fingerprint]
+
+    filename = os.path.join(path, f"fid_statistics_{fingerprint}.npz")
+    if os.path.exists(filename):
+        statistics = FeatureStatistics.load(filename)
+    else:
+        statistics = None
+        test_loader = torch.utils.data.DataLoader(
+            testset, batch_size=batch_size, shuffle=False
+        )
+        for examples, __ in test_loader:
+            features = extract_features(examples)
+            if statistics is None:
+                statistics = FeatureStatistics(features.shape[1])
+            statistics.update(features)
+
+        os.makedirs(path, exist_ok=True)
+        statistics.save(filename)
+
+    _real_statistics[fingerprint] = statistics
+    return statistics
@@ -11,12 +11,10 @@ import os
 import torch
 import torch.nn as nn
 import torchvision
-import numpy as np
-import scipy
 
 from plato.config import Config
 from plato.models import registry as models_registry
-from plato.trainers import basic
+from plato.trainers import basic, fid
 from plato.trainers import optimizers
 
 
@@ -243,42 +241,47 @@ class Trainer(basic.Trainer):
 
         self.model.to(self.device)
         self.model.eval()
+        self.inception_model.to(self.device)
 
-        perplexity = -1
-
-        test_loader = torch.utils.data.DataLoader(
-            testset, batch_size=config["batch_size"], shuffle=True
+        batch_size = (
+            config["test_batch_size"]
+            if "test_batch_size" in config
+            else config["batch_size"]
         )
 
-        real_features, fake_features = [], []
-        with torch.no_grad():
-            for real_examples, _ in test_loader:
-                real_examples = real_examples.to(self.device)
+        # The feature statistics of the real data from the testset are only computed
+        # the first time the testset is used
+        real_statistics = fid.real_statistics(
+            testset,
+            lambda examples: self.feature_extractor(examples.to(self.device)),
+            batch_size,
+            Config().params["data_path"],
+        )
 
+        # The feature statistics of the data generated by the generator are
+        # accumulated batch by batch
+        fid_samples = (
+            config["fid_samples"]
+            if "fid_samples" in config
+            else min(len(testset), 10000)
+        )
+        fake_statistics = fid.FeatureStatistics(real_statistics.mean.shape[0])
+        with torch.inference_mode():
+            for start in range(0, fid_samples, batch_size):
                 noise = torch.randn(
-                    config["batch_size"], self.model.nz, 1, 1, device=self.device
+                    min(batch_size, fid_samples - start),
+                    self.model.nz,
+                    1,
+                    1,
+                    device=self.device,
                 )
                 fake_examples = self.generator(noise)
+                fake_statistics.update(self.feature_extractor(fake_examples))
 
-                # Extract the feature of real and synthetic data with
-                # InceptionV3 model pre-trained on ImageNet
-                self.inception_model.to(self.device)
-                feature_real = self.feature_extractor(real_examples)
-                feature_fake = self.feature_extractor(fake_examples)
-
-                # Store the feature of every real and synthetic data
-                real_features.extend(list(feature_real))
-                fake_features.extend(list(feature_fake))
-
-            real_features, fake_features = np.stack(real_features), np.stack(
-                fake_features
-            )
-            # Calculate the Frechet Distance between the feature distribution
-            # of real data from testset and the feature distribution of data
-            # generated by the generator.
-            perplexity = self.calculate_fid(real_features, fake_features)
-
-        return perplexity
+        # Calculate the Frechet Distance between the feature distribution
+        # of real data from testset and the feature distribution of data
+        # generated by the generator.
+        return real_statistics.frechet_distance(fake_statistics)
 
     def feature_extractor(self, inputs):
         """Extract the feature of input data with InceptionV3.
@@ -295,34 +298,20 @@ class Trainer(basic.Trainer):
         inputs = pad(inputs)
 
         # Extract feature with InceptionV3
-        features = None
-        with torch.no_grad():
+        with torch.inference_mode():
             features = self.inception_model(inputs)
-        features = features.cpu()
-        features = np.array(features)
 
-        return features
+        return features.cpu().numpy()
 
     def calculate_fid(self, real_features, fake_features):
         """Calculate the Frechet Inception Distance (FID) between the
         given real data feature and the synthetic data feature.
 
         A lower FID indicates a better Generator model.
-
-        The implementation is borrowed from the following link:
-        https://wandb.ai/ayush-thakur/gan-evaluation/reports/How-to-Evaluate-GANs-using-Frechet-Inception-Distance-FID---Vmlldzo0MTAxOTI
         """
-        # calculate mean and covariance statistics
-        mu1, sigma1 = real_features.mean(axis=0), np.cov(real_features, rowvar=False)
-        mu2, sigma2 = fake_features.mean(axis=0), np.cov(fake_features, rowvar=False)
-        # calculate sum squared difference between means
-        ssdiff = np.sum((mu1 - mu2) ** 2.0)
-        # calculate sqrt of product between cov
-        covmean = scipy.linalg.sqrtm(sigma1.dot(sigma2))
-        # check and correct imaginary numbers from sqrt
-        if np.iscomplexobj(covmean):
-            covmean = covmean.real
-        # calculate score
-        fid = ssdiff + np.trace(sigma1 + sigma2 - 2.0 * covmean)
-
-        return fid
+        real_statistics = fid.FeatureStatistics(real_features.shape[1])
+        real_statistics.update(real_features)
+        fake_statistics = fid.FeatureStatistics(fake_features.shape[1])
+        fake_statistics.update(fake_features)
+
+        return real_statistics.frechet_distance(fake_statistics)
@@ -5,32 +5,32 @@ based on a configuration at run-time.
 import logging
 
 from plato.config import Config
+from plato.utils.lazy_registry import LazyRegistry
 
+# Trainers are imported when they are first used, as some of them import large
+# third-party packages
 if hasattr(Config().trainer, "use_mindspore"):
-    from plato.trainers.mindspore import basic as basic_mindspore
-
-    registered_trainers = {"basic": basic_mindspore.Trainer}
+    registered_trainers = LazyRegistry(
+        {"basic": "plato.trainers.mindspore.basic:Trainer"}, group="plato.trainers"
+    )
 
 elif hasattr(Config().trainer, "use_tensorflow"):
-    from plato.trainers.tensorflow import basic as basic_tensorflow
-
-    registered_trainers = {"basic": basic_tensorflow.Trainer}
+    registered_trainers = LazyRegistry(
+        {"basic": "plato.trainers.tensorflow.basic:Trainer"}, group="plato.trainers"
+    )
 else:
-    from plato.trainers import (
-        basic,
-        diff_privacy,
-        pascal_voc,
-        gan,
+    registered_trainers = LazyRegistry(
+        {
+            "basic": "plato.trainers.basic:Trainer",
+            "timm_basic": "plato.trainers.basic:TrainerWithTimmScheduler",
+            "diff_privacy": "plato.trainers.diff_privacy:Trainer",
+            "pascal_voc": "plato.trainers.pascal_voc:Trainer",
+            "gan": "plato.trainers.gan:Trainer",
+            "HuggingFace": "plato.trainers.huggingface:Trainer",
+        },
+        group="plato.trainers",
     )
 
-    registered_trainers = {
-        "basic": basic.Trainer,
-        "timm_basic": basic.TrainerWithTimmScheduler,
-        "diff_privacy": diff_privacy.Trainer,
-        "pascal_voc": pascal_voc.Trainer,
-        "gan": gan.Trainer,
-    }
-
 
 def get(model=None):
     """Get the trainer with the provided name."""
@@ -41,10 +41,6 @@ def get(model=None):
         from plato.trainers import yolov5
 
         return yolov5.Trainer()
-    elif Config().trainer.type == "HuggingFace":
-        from plato.trainers import huggingface
-
-        return huggingface.Trainer(model)
     elif trainer_name in registered_trainers:
         return registered_trainers[trainer_name](model)
     else:
@@ -0,0 +1,85 @@
+"""
+Snapshots of a client's model taken at the end of each epoch, used to respond to urgent
+requests for model updates from the server (`request_update`) with the model as it was
+at a given wall clock time.
+
+The snapshots are kept in memory as copies of the model weights on the CPU, in the
+order of the training times at which they were taken, so that the snapshot for a wall
+clock time is found with a binary search. If the number of snapshots in memory is
+bounded, the earliest ones are spilled to files in the model path.
+"""
+import bisect
+import os
+
+import torch
+
+from plato.config import Config
+
+
+class ModelSnapshots:
+    """The per-epoch snapshots of a model in the current training run."""
+
+    def __init__(self, capacity=None):
+        """Up to `capacity` snapshots are kept in memory, or all of them if None."""
+        self.capacity = capacity
+        self.client_id = 0
+
+        # The training times of the snapshots in increasing order, and for each of
+        # them either the model weights or the file they were spilled to
+        self.training_times = []
+        self.snapshots = []
+        self.in_memory = 0
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def add(self, training_time, state_dict) -> None:
+        """Takes a snapshot of the model weights after an epoch."""
+        self.training_times.append(training_time)
+        self.snapshots.append(
+            state_dict.__class__(
+                (name, tensor.detach().to("cpu", copy=True))
+                for name, tensor in state_dict.items()
+            )
+        )
+        self.in_memory += 1
+
+        if self.capacity is not None and self.in_memory > self.capacity:
+            # Spilling the earliest snapshot still in memory, to a file named after the
+            # client, the epoch and the training time
+            spilled = len(self.snapshots) - self.in_memory
+            filename = (
+                f"{Config().params['model_path']}/"
+                f"{self.client_id}_{spilled + 1}_{self.training_times[spilled]}.pth"
+            )
+            torch.save(self.snapshots[spilled], filename)
+            self.snapshots[spilled] = filename
+            self.in_memory -= 1
+
+    def find(self, training_time):
+        """Returns the epoch, the training time and the model weights of the earliest
+        snapshot taken after a training time, or None if there is no such snapshot."""
+        position = bisect.bisect_right(self.training_times, training_time)
+        if position == len(self.snapshots):
+            return None
+
+        weights = self.snapshots[position]
+        if isinstance(weights, str):
+            weights = torch.load(weights, map_location=torch.device("cpu"))
+
+        return position + 1, self.training_times[position], weights
+
+    def clear(self) -> None:
+        """Removes all the snapshots, along with the files they were spilled to."""
+        for snapshot in self.snapshots:
+            if isinstance(snapshot, str) and os.path.exists(snapshot):
+                os.remove(snapshot)
+
+        self.training_times = []
+        self.snapshots = []
+        self.in_memory = 0
+
+    def start(self, client_id) -> None:
+        """Starts taking the snapshots of a new training run of a client."""
+        self.clear()
+        self.client_id = client_id
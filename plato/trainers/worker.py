@@ -0,0 +1,161 @@
+"""
+A long-lived worker process that runs the training and testing loops of a trainer when
+`max_concurrency` is set in the `trainer` section.
+
+The worker is started with the `spawn` start method the first time it is needed, and is
+then reused in every round, so that PyTorch and Plato are only imported once. For each
+run, the trainer is sent to the worker through a queue of `torch.multiprocessing`,
+which moves the tensors of its model into shared memory rather than copying them
+through a pipe. Datasets are only sent the first time they are used. The trained
+weights come back as shared memory tensors as well, and test accuracies come back
+through the queue, so that nothing is written to disk.
+"""
+import logging
+import multiprocessing
+import queue
+import weakref
+from multiprocessing import util
+
+import torch.multiprocessing
+
+# The workers that have been started in this process
+_workers = weakref.WeakSet()
+
+
+def next_command(commands):
+    """Returns the next command, or None once the process that started this worker has
+    exited, such as a client process that exited with os._exit()."""
+    parent = multiprocessing.parent_process()
+
+    while True:
+        try:
+            return commands.get(timeout=1)
+        except queue.Empty:
+            if parent is not None and not parent.is_alive():
+                return None
+
+
+def run_worker(commands, results):
+    """Runs the training and testing loops sent as commands until None is received."""
+    datasets = {}
+
+    for command in iter(lambda: next_command(commands), None):
+        method, trainer, config, dataset_key, dataset, sampler, kwargs = command
+
+        if dataset is not None:
+            datasets[dataset_key] = dataset
+
+        try:
+            if method == "train":
+                trainer.train_process(config, datasets[dataset_key], sampler, **kwargs)
+                trainer.model.cpu()
+                result = (
+                    trainer.model.state_dict(),
+                    trainer.run_history,
+                    trainer.simulated_sleep_time,
+                    trainer.model_snapshots,
+                )
+            else:
+                result = trainer.test_process(
+                    config, datasets[dataset_key], sampler, **kwargs
+                )
+        except Exception:  # pylint: disable=broad-except
+            logging.exception(
+                "The training worker of client #%d failed.", trainer.client_id
+            )
+            results.put((False, None))
+        else:
+            results.put((True, result))
+
+
+def stop_worker(commands, process) -> None:
+    """Asks a worker process to exit once it completes its current command."""
+    if process.is_alive():
+        commands.put(None)
+        process.join()
+
+
+class TrainingWorker:
+    """The trainer's end of a persistent worker process."""
+
+    def __init__(self):
+        self.context = torch.multiprocessing.get_context("spawn")
+        self.commands = None
+        self.results = None
+        self.process = None
+
+        # The datasets already sent to the worker process, kept alive so that their
+        # identities are not reused by other objects
+        self.datasets = {}
+
+    def __reduce__(self):
+        # The copy of a trainer sent to the worker process has a worker of its own
+        # that is never started
+        return (TrainingWorker, ())
+
+    def start(self) -> None:
+        """Starts the worker process."""
+        self.commands = self.context.Queue()
+        self.results = self.context.Queue()
+        self.datasets = {}
+
+        # Not a daemon, so that data loaders can start worker processes of their own
+        self.process = self.context.Process(
+            target=run_worker, args=(self.commands, self.results)
+        )
+        self.process.start()
+
+        # Stopping the worker process when this object is garbage collected, or
+        # before the main process waits for its child processes to exit
+        util.Finalize(
+            self, stop_worker, args=(self.commands, self.process), exitpriority=10
+        )
+        _workers.add(self)
+
+    def run(self, method, trainer, config, dataset, sampler=None, **kwargs):
+        """Runs `method` ("train" or "test") of `trainer` in the worker process, and
+        returns the model weights and run history, or the accuracy, respectively.
+        Returns None if the run failed."""
+        if self.process is None or not self.process.is_alive():
+            self.start()
+
+        dataset_key = id(dataset)
+        if dataset_key in self.datasets:
+            dataset_sent = None
+        else:
+            self.datasets[dataset_key] = dataset
+            dataset_sent = dataset
+
+        # Files are only written for a trainer running in a process of its own
+        config = {
+            key: value for key, value in config.items() if key != "max_concurrency"
+        }
+
+        self.commands.put(
+            (method, trainer, config, dataset_key, dataset_sent, sampler, kwargs)
+        )
+
+        while True:
+            try:
+                succeeded, result = self.results.get(timeout=1)
+                break
+            except queue.Empty:
+                if not self.process.is_alive():
+                    # The worker process exited abnormally
+                    self.process = None
+                    return None
+
+        return result if succeeded else None
+
+    def close(self) -> None:
+        """Stops the worker process."""
+        if self.process is not None:
+            stop_worker(self.commands, self.process)
+            self.process = None
+
+
+def stop_all() -> None:
+    """Stops the worker processes started in this process, which is needed before
+    exiting with os._exit(), as it skips the finalizers that would stop them."""
+    for training_worker in list(_workers):
+        training_worker.close()
@@ -0,0 +1,92 @@
+"""
+A weighted sum of PyTorch state_dicts, computed in place in flat contiguous buffers.
+
+All the floating-point tensors of a state_dict with the same dtype and device share one
+1-D accumulator buffer, and every tensor of the state_dict is a view into it. Adding a
+state_dict is then a single fused `torch._foreach_add_()` with the weight as `alpha`,
+so that no intermediate tensors are allocated per client or per layer. Integer tensors,
+such as the number of batches tracked by batch normalization, are accumulated in
+double precision and cast back when the result is taken.
+"""
+from collections import OrderedDict
+
+
+class WeightAccumulator:
+    """Accumulates a weighted sum of state_dicts with the same names and shapes."""
+
+    def __init__(self, template):
+        """Allocates the flat buffers for state_dicts shaped like `template`."""
+        import torch
+
+        self.names = list(template.keys())
+        self.dtypes = [tensor.dtype for tensor in template.values()]
+        self.total_weight = 0.0
+
+        # The number of elements in the buffer for each (dtype, device)
+        sizes = OrderedDict()
+        placement = []
+        for tensor in template.values():
+            dtype = tensor.dtype if tensor.is_floating_point() else torch.float64
+            key = (dtype, tensor.device)
+            placement.append((key, sizes.get(key, 0), tensor.numel()))
+            sizes[key] = sizes.get(key, 0) + tensor.numel()
+
+        self.buffers = {
+            key: torch.zeros(size, dtype=key[0], device=key[1])
+            for key, size in sizes.items()
+        }
+        self.views = [
+            self.buffers[key][offset : offset + numel].view(tensor.shape)
+            for (key, offset, numel), tensor in zip(placement, template.values())
+        ]
+
+    def add(self, weights, weight: float) -> None:
+        """Adds `weight` times a state_dict to the sum."""
+        import torch
+
+        torch._foreach_add_(
+            self.views, [weights[name] for name in self.names], alpha=weight
+        )
+        self.total_weight += weight
+
+    def result(self, baseline_weights=None, scale: float = 1.0):
+        """Returns `scale` times the sum as a state_dict, viewing into the buffers.
+        This can only be called once.
+
+        With `baseline_weights`, the result is the baseline updated by the scaled,
+        weighted sum of the deltas between the weights added and the baseline, which
+        is the scaled sum itself plus the baseline times what the scaled weights
+        are short of adding up to one.
+        """
+        import torch
+
+        if scale != 1.0:
+            torch._foreach_mul_(list(self.buffers.values()), scale)
+
+        if baseline_weights is not None:
+            torch._foreach_add_(
+                self.views,
+                [baseline_weights[name] for name in self.names],
+                alpha=1.0 - self.total_weight * scale,
+            )
+
+        return OrderedDict(
+            (name, view if view.dtype == dtype else view.to(dtype))
+            for name, view, dtype in zip(self.names, self.views, self.dtypes)
+        )
+
+
+def is_compatible(template, weights) -> bool:
+    """Whether a state_dict has tensors with the same names and shapes as `template`,
+    so that it can be added to a WeightAccumulator allocated for `template`."""
+    import torch
+
+    return (
+        isinstance(weights, dict)
+        and len(weights) == len(template)
+        and all(
+            isinstance(weights.get(name), torch.Tensor)
+            and weights[name].shape == tensor.shape
+            for name, tensor in template.items()
+        )
+    )
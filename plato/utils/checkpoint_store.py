@@ -0,0 +1,124 @@
+"""
+A content-addressed store for the model weights in checkpoints.
+
+Each tensor of a state_dict is hashed, and its raw bytes are written to a blob named
+after the hash in the `blobs` directory, unless a blob with the same content already
+exists. A checkpoint is then a small JSON manifest listing the blob, dtype and shape
+of each tensor, so that a new checkpoint only writes the tensors that changed since
+the checkpoints already stored. Loading a checkpoint maps the blobs into memory as
+copy-on-write, without reading them into buffers first.
+
+Blobs that are no longer listed in any manifest are removed by `collect_garbage()`.
+"""
+import hashlib
+import json
+import mmap
+import os
+from collections import OrderedDict
+
+# The key identifying a manifest written by this store
+MANIFEST_FORMAT = "plato-checkpoint-manifest"
+
+
+class CheckpointStore:
+    """Stores state_dicts as manifests referring to content-addressed tensor blobs."""
+
+    def __init__(self, path):
+        self.path = path
+        self.blob_path = os.path.join(path, "blobs")
+
+    def blob_filename(self, digest) -> str:
+        """Returns the file name of a blob."""
+        return os.path.join(self.blob_path, digest)
+
+    def save(self, weights, filename) -> int:
+        """Writes the tensors of a state_dict that are not stored yet, and a manifest
+        referring to all of them to `filename`. Returns the number of bytes written
+        to blobs."""
+        import torch
+
+        os.makedirs(self.blob_path, exist_ok=True)
+
+        tensors = []
+        bytes_written = 0
+        for name, tensor in weights.items():
+            tensor = tensor.detach().cpu().contiguous()
+            data = tensor.reshape(-1).view(torch.uint8).numpy()
+            digest = hashlib.sha256(data).hexdigest()
+
+            blob_filename = self.blob_filename(digest)
+            if not os.path.exists(blob_filename):
+                temp_filename = f"{blob_filename}.{os.getpid()}.tmp"
+                with open(temp_filename, "wb") as blob_file:
+                    blob_file.write(data)
+                os.replace(temp_filename, blob_filename)
+                bytes_written += data.nbytes
+
+            tensors.append(
+                [name, digest, str(tensor.dtype)[len("torch.") :], list(tensor.shape)]
+            )
+
+        manifest = {"format": MANIFEST_FORMAT, "tensors": tensors}
+
+        # Version information of the modules, used by Module.load_state_dict()
+        metadata = getattr(weights, "_metadata", None)
+        if metadata is not None:
+            manifest["metadata"] = metadata
+
+        with open(filename, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file)
+
+        return bytes_written
+
+    def load(self, filename):
+        """Rebuilds a state_dict from a manifest, with its tensors mapped from the
+        blobs into memory."""
+        import torch
+
+        with open(filename, "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        weights = OrderedDict()
+        for name, digest, dtype, shape in manifest["tensors"]:
+            dtype = getattr(torch, dtype)
+
+            with open(self.blob_filename(digest), "rb") as blob_file:
+                if os.fstat(blob_file.fileno()).st_size == 0:
+                    weights[name] = torch.empty(shape, dtype=dtype)
+                    continue
+
+                buffer = mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+            weights[name] = torch.frombuffer(buffer, dtype=dtype).view(shape)
+
+        if "metadata" in manifest:
+            weights._metadata = OrderedDict(manifest["metadata"])
+
+        return weights
+
+    @staticmethod
+    def is_manifest(filename) -> bool:
+        """Whether a file is a manifest written by this store."""
+        try:
+            with open(filename, "r", encoding="utf-8") as manifest_file:
+                return json.load(manifest_file).get("format") == MANIFEST_FORMAT
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    def collect_garbage(self) -> None:
+        """Removes the blobs that are not referred to by any manifest in the store's
+        directory."""
+        if not os.path.isdir(self.blob_path):
+            return
+
+        referenced = set()
+        for filename in os.listdir(self.path):
+            filename = os.path.join(self.path, filename)
+            if filename.endswith(".json") and self.is_manifest(filename):
+                with open(filename, "r", encoding="utf-8") as manifest_file:
+                    manifest = json.load(manifest_file)
+                referenced.update(digest for __, digest, __, __ in manifest["tensors"])
+
+        for digest in os.listdir(self.blob_path):
+            if digest not in referenced and not digest.endswith(".tmp"):
+                os.remove(self.blob_filename(digest))
@@ -0,0 +1,115 @@
+"""
+Writes checkpoints on a background thread, so that saving a checkpoint at the end of a
+round does not block the event loop while the files are written to disk.
+
+The caller takes a snapshot of everything in the checkpoint, such as a CPU copy of the
+model weights, and submits it along with the functions that write each file. Files are
+written in the order they were submitted, each under a temporary name that is then
+atomically renamed, so that a checkpoint file is either complete or absent. Once all
+the files of a round are written, the checkpoints of earlier rounds that are not to be
+retained are removed.
+"""
+import logging
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+
+def write_atomically(filename, write) -> None:
+    """Calls `write()` with a temporary file name, and renames the file it writes to
+    `filename`."""
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    write(temp_filename)
+    os.replace(temp_filename, filename)
+
+
+def pickle_writer(obj):
+    """Returns a function that pickles `obj` into a file with a given name."""
+
+    def write(filename):
+        with open(filename, "wb") as checkpoint_file:
+            pickle.dump(obj, checkpoint_file)
+
+    return write
+
+
+class CheckpointWriter:
+    """Writes the checkpoints of each round in order on a background thread."""
+
+    def __init__(self, keep_last=None, keep_every=None, cleanup=None):
+        """Checkpoints of the last `keep_last` rounds saved, and of every round that is
+        a multiple of `keep_every`, are retained; all of them are if `keep_last` is
+        None. `cleanup()` is called after the checkpoints of a round are removed."""
+        self.keep_last = keep_last
+        self.keep_every = keep_every
+        self.cleanup = cleanup
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="checkpoint_writer"
+        )
+        self.pending = []
+
+        # The files written for each round, in the order the rounds were saved
+        self.files = {}
+
+    def submit(self, round_saved, files, marker=None) -> None:
+        """Writes the checkpoint files of a round on the background thread.
+
+        Arguments:
+        round_saved: the round in which the checkpoint is saved.
+        files: a list of (filename, write) pairs, where `write(filename)` writes the
+            file, in the order the files are to be written, or `write` is None for a
+            file already written. They are removed together when the round is no longer
+            retained.
+        marker: a (filename, write) pair for a file written after all the others and
+            never removed, such as the file recording the latest round saved.
+        """
+        self.pending = [future for future in self.pending if not future.done()]
+        self.pending.append(
+            self.executor.submit(self._write, round_saved, files, marker)
+        )
+
+    def _write(self, round_saved, files, marker) -> None:
+        """Writes the files of a round, then removes the checkpoints of earlier rounds
+        that are not to be retained."""
+        try:
+            for filename, write in files + ([marker] if marker else []):
+                if write is not None:
+                    write_atomically(filename, write)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Failed to save the checkpoint of round %d.", round_saved)
+            return
+
+        self.files.pop(round_saved, None)
+        self.files[round_saved] = [filename for filename, __ in files]
+
+        if self.keep_last is None:
+            return
+
+        # The checkpoint of the latest round saved is always retained
+        recent_rounds = list(self.files)[-max(1, self.keep_last) :]
+        removed = False
+        for round_written in list(self.files):
+            if round_written in recent_rounds or (
+                self.keep_every and round_written % self.keep_every == 0
+            ):
+                continue
+
+            for filename in self.files.pop(round_written):
+                if os.path.exists(filename):
+                    os.remove(filename)
+            removed = True
+
+        if removed and self.cleanup is not None:
+            self.cleanup()
+
+    def flush(self) -> None:
+        """Waits until all the checkpoints submitted have been written."""
+        for future in self.pending:
+            future.result()
+
+        self.pending = []
+
+    def close(self) -> None:
+        """Writes the remaining checkpoints and stops the background thread."""
+        self.flush()
+        self.executor.shutdown(wait=True)
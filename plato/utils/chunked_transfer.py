@@ -0,0 +1,122 @@
+"""
+Utilities to stream a bytes-like payload over socket.io in chunks.
+
+The sender slices the payload lazily, so that only one chunk is copied out of it at a
+time, and waits for the receiver to acknowledge every `chunk_window` chunks before
+sending more. Each chunk carries its offset and the total size of the payload, so that
+the receiver writes it directly into a preallocated buffer.
+"""
+import logging
+from typing import Optional
+
+from plato.config import Config
+
+
+def chunk_size() -> int:
+    """The size of each chunk in bytes, as configured in the `chunk_size` setting (in MB)
+    of the `server` section. The default value is 4 MB."""
+    size = Config().server.chunk_size if hasattr(Config().server, "chunk_size") else 4
+    return max(1, int(size * 1024**2))
+
+
+def chunk_window() -> int:
+    """The number of chunks to send before waiting for an acknowledgement, as configured
+    in the `chunk_window` setting of the `server` section. The default value is 4."""
+    return (
+        Config().server.chunk_window
+        if hasattr(Config().server, "chunk_window")
+        else 4
+    )
+
+
+def ack_timeout() -> int:
+    """The time in seconds to wait for the receiver to acknowledge a window of chunks."""
+    return (
+        Config().server.ping_timeout
+        if hasattr(Config().server, "ping_timeout")
+        else 3600
+    )
+
+
+async def send(sio, data, size=None, window=None, timeout=None, **kwargs) -> None:
+    """Sends a bytes-like object in chunks as 'chunk' events.
+
+    Arguments:
+    sio: the socket.io server or client used to send the chunks.
+    data: the bytes-like object to be sent.
+    size: the size of each chunk in bytes.
+    window: the number of chunks to send before waiting for an acknowledgement.
+    timeout: the time in seconds to wait for an acknowledgement.
+    kwargs: additional keyword arguments for emitting, such as `to` on a server.
+    """
+    size = chunk_size() if size is None else size
+    window = chunk_window() if window is None else window
+    timeout = ack_timeout() if timeout is None else timeout
+
+    view = memoryview(data).cast("B")
+    total_size = len(view)
+
+    for index, offset in enumerate(range(0, total_size, size)):
+        chunk = {
+            "data": bytes(view[offset : offset + size]),
+            "offset": offset,
+            "size": total_size,
+        }
+
+        if (index + 1) % window == 0 or offset + size >= total_size:
+            # Waiting for the receiver to catch up before sending the next window
+            await sio.call("chunk", chunk, timeout=timeout, **kwargs)
+        else:
+            await sio.emit("chunk", chunk, **kwargs)
+
+
+class ChunkBuffer:
+    """Reassembles the chunks of a payload as they arrive."""
+
+    def __init__(self):
+        self.buffer: Optional[bytearray] = None
+        self.chunks = []
+        self.received = 0
+
+        # The total number of bytes of all the payloads reassembled so far
+        self.transferred = 0
+
+    def __len__(self):
+        return self.received
+
+    def append(self, chunk, offset=None, size=None) -> None:
+        """Adds a chunk that has just arrived.
+
+        Chunks sent with their offset and the total size of the payload are written
+        into a buffer preallocated when the first chunk arrives. Otherwise, they are
+        kept in arrival order until the payload is complete.
+        """
+        if offset is None or size is None:
+            self.chunks.append(chunk)
+        else:
+            if self.buffer is None:
+                self.buffer = bytearray(size)
+            self.buffer[offset : offset + len(chunk)] = chunk
+
+        self.received += len(chunk)
+
+    def getvalue(self) -> bytearray:
+        """Returns the reassembled payload as a writable buffer, and resets for the
+        next payload."""
+        if self.buffer is None:
+            payload = bytearray().join(self.chunks)
+        else:
+            payload = self.buffer
+            if self.received != len(payload):
+                logging.warning(
+                    "Received %d bytes of a %d-byte payload.",
+                    self.received,
+                    len(payload),
+                )
+
+        self.transferred += len(payload)
+        self.buffer = None
+        self.chunks = []
+        self.received = 0
+
+        return payload
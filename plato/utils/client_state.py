@@ -0,0 +1,404 @@
+"""
+A store for the state that algorithms keep for each client across rounds, such as
+control variates, accumulated gradients, pruning masks or personalized models.
+
+Each state is a tensor, a NumPy array, or a dictionary or list of them, kept under a
+(client_id, name) key. The states used most recently are held in memory, up to
+`state_cache_size` megabytes (in the `clients` section) in each process, and the
+others are saved to files in the safetensors format: a small JSON header followed by
+the raw bytes of the tensors, which are mapped into memory when loaded instead of being
+read and unpickled.
+
+As clients may be selected again in any of the client processes, a store writes the
+states through to their files by default, and only checks that a file has not been
+replaced by another process before serving a state from memory. A store whose states
+are never used by other processes, such as the states the server keeps for its
+clients, can be created with `write_back=True`, so that states are only written to
+files when they are evicted from memory.
+"""
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+import numpy as np
+
+from plato.config import Config
+
+# The header length is stored as an unsigned 64-bit little-endian integer
+_HEADER_LENGTH = struct.Struct("<Q")
+
+# The names of the data types in the safetensors format, and their NumPy equivalents
+DTYPES = {
+    "F64": np.float64,
+    "F32": np.float32,
+    "F16": np.float16,
+    "BF16": None,
+    "I64": np.int64,
+    "I32": np.int32,
+    "I16": np.int16,
+    "I8": np.int8,
+    "U8": np.uint8,
+    "BOOL": np.bool_,
+}
+
+# The process-wide store, and the process it belongs to
+_store = None
+_store_pid = None
+
+
+def _torch_dtypes():
+    """Returns the PyTorch data types by their names in the safetensors format."""
+    import torch  # pylint: disable=import-outside-toplevel
+
+    return {
+        "F64": torch.float64,
+        "F32": torch.float32,
+        "F16": torch.float16,
+        "BF16": torch.bfloat16,
+        "I64": torch.int64,
+        "I32": torch.int32,
+        "I16": torch.int16,
+        "I8": torch.int8,
+        "U8": torch.uint8,
+        "BOOL": torch.bool,
+    }
+
+
+def _flatten(state):
+    """Returns the tensors and arrays in a state by their names, with the type of the
+    container holding them."""
+    if isinstance(state, dict):
+        return OrderedDict((str(name), value) for name, value in state.items()), "dict"
+
+    if isinstance(state, (list, tuple)):
+        return (
+            OrderedDict((str(index), value) for index, value in enumerate(state)),
+            "list",
+        )
+
+    return OrderedDict([("", state)]), "value"
+
+
+def _on_device(value) -> bool:
+    """Whether a value is a tensor on a device other than the CPU."""
+    if isinstance(value, np.ndarray) or np.isscalar(value):
+        return False
+    return value.device.type != "cpu"
+
+
+def _to_cpu(state):
+    """Returns a state with its tensors on other devices, such as GPUs, copied to the
+    CPU."""
+    values, container = _flatten(state)
+    if not any(_on_device(value) for value in values.values()):
+        return state
+
+    values = [value.cpu() if _on_device(value) else value for value in values.values()]
+    if container == "dict":
+        return type(state)(zip(state.keys(), values))
+    if container == "list":
+        return type(state)(values)
+    return values[0]
+
+
+def _to_bytes(value):
+    """Returns the name of the data type of a tensor or an array, its shape, its raw
+    bytes as a NumPy array, and whether it is a PyTorch tensor."""
+    if isinstance(value, np.ndarray) or np.isscalar(value):
+        value = np.asarray(value, order="C")
+        for dtype_name, dtype in DTYPES.items():
+            if dtype is not None and value.dtype == dtype:
+                data = value.reshape(-1).view(np.uint8)
+                return dtype_name, list(value.shape), data, False
+        raise ValueError(f"Unsupported data type in a client state: {value.dtype}")
+
+    import torch  # pylint: disable=import-outside-toplevel
+
+    if not isinstance(value, torch.Tensor):
+        raise ValueError(
+            "A client state must be tensors or arrays, in a dictionary or a list."
+        )
+
+    value = value.detach().cpu().contiguous()
+    for dtype_name, dtype in _torch_dtypes().items():
+        if value.dtype == dtype:
+            data = value.reshape(-1).view(torch.uint8).numpy()
+            return dtype_name, list(value.shape), data, True
+    raise ValueError(f"Unsupported data type in a client state: {value.dtype}")
+
+
+def save(state, filename) -> int:
+    """Saves a state to a file in the safetensors format, and returns the number of
+    bytes written."""
+    values, container = _flatten(state)
+
+    header = OrderedDict()
+    buffers = []
+    tensors = []
+    offset = 0
+    for name, value in values.items():
+        dtype_name, shape, data, is_tensor = _to_bytes(value)
+        header[name] = {
+            "dtype": dtype_name,
+            "shape": shape,
+            "data_offsets": [offset, offset + data.nbytes],
+        }
+        buffers.append(data)
+        tensors.append("1" if is_tensor else "0")
+        offset += data.nbytes
+
+    header["__metadata__"] = {"container": container, "tensors": "".join(tensors)}
+
+    # The header is padded with spaces so that the tensors are aligned to 8 bytes
+    header = json.dumps(header).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, "wb") as state_file:
+        state_file.write(_HEADER_LENGTH.pack(len(header)))
+        state_file.write(header)
+        for data in buffers:
+            state_file.write(data)
+    os.replace(temp_filename, filename)
+
+    return _HEADER_LENGTH.size + len(header) + offset
+
+
+def load(filename, advise=False):
+    """Loads a state from a file, with its tensors and arrays mapped into memory as
+    copy-on-write. With `advise` set, the kernel is asked to start reading the file
+    into memory right away."""
+    with open(filename, "rb") as state_file:
+        buffer = mmap.mmap(state_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    if advise and hasattr(buffer, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+        buffer.madvise(mmap.MADV_WILLNEED)
+
+    (header_length,) = _HEADER_LENGTH.unpack_from(buffer, 0)
+    data_start = _HEADER_LENGTH.size + header_length
+    header = json.loads(bytes(buffer[_HEADER_LENGTH.size : data_start]))
+    metadata = header.pop("__metadata__")
+
+    torch_dtypes = None
+    values = []
+    for (name, entry), is_tensor in zip(header.items(), metadata["tensors"]):
+        begin, end = entry["data_offsets"]
+        if is_tensor == "1":
+            import torch  # pylint: disable=import-outside-toplevel
+
+            torch_dtypes = torch_dtypes or _torch_dtypes()
+            dtype = torch_dtypes[entry["dtype"]]
+            if end == begin:
+                value = torch.empty(entry["shape"], dtype=dtype)
+            else:
+                value = torch.frombuffer(
+                    buffer,
+                    dtype=dtype,
+                    count=(end - begin) // dtype.itemsize,
+                    offset=data_start + begin,
+                ).view(entry["shape"])
+        else:
+            dtype = np.dtype(DTYPES[entry["dtype"]])
+            if end == begin:
+                value = np.empty(entry["shape"], dtype=dtype)
+            else:
+                value = np.frombuffer(
+                    buffer,
+                    dtype=dtype,
+                    count=(end - begin) // dtype.itemsize,
+                    offset=data_start + begin,
+                ).reshape(entry["shape"])
+        values.append((name, value))
+
+    if metadata["container"] == "dict":
+        return OrderedDict(values)
+    if metadata["container"] == "list":
+        return [value for __, value in values]
+    return values[0][1]
+
+
+def sizeof(state) -> int:
+    """Returns the number of bytes taken by the tensors and arrays in a state."""
+    size = 0
+    for value in _flatten(state)[0].values():
+        if hasattr(value, "element_size"):
+            size += value.numel() * value.element_size()
+        else:
+            size += np.asarray(value).nbytes
+    return size
+
+
+class _CachedState:
+    """A state held in memory, with the size of its tensors, whether it has yet to be
+    saved, and the version of the file it was saved to or loaded from."""
+
+    def __init__(self, state, size, dirty=False, version=None):
+        self.state = state
+        self.size = size
+        self.dirty = dirty
+        self.version = version
+
+
+class ClientStateStore:
+    """Keeps the states of clients in memory, least recently used first, and in
+    files when they do not fit."""
+
+    def __init__(self, path=None, capacity=None, write_back=False):
+        if path is None:
+            path = os.path.join(Config().params["checkpoint_path"], "client_states")
+        if capacity is None:
+            capacity = (
+                Config().clients.state_cache_size
+                if hasattr(Config().clients, "state_cache_size")
+                else 256
+            )
+            capacity = int(capacity * 1024 * 1024)
+
+        self.path = path
+        self.capacity = capacity
+        self.write_back = write_back
+
+        self.cache = OrderedDict()
+        self.cached_size = 0
+
+    def filename(self, client_id, name) -> str:
+        """Returns the file name of a client's state."""
+        return os.path.join(self.path, f"{name}_client{client_id}.safetensors")
+
+    @staticmethod
+    def version(filename):
+        """Returns a key that changes whenever a file is replaced, or None if the file
+        does not exist."""
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def put(self, client_id, name, state) -> None:
+        """Stores a client's state. Tensors on other devices than the CPU are copied
+        to the CPU, so that the cache does not take up memory on GPUs."""
+        key = (client_id, name)
+        self._discard(key)
+
+        state = _to_cpu(state)
+        cached = _CachedState(state, sizeof(state), dirty=True)
+        if not self.write_back:
+            self._save(key, cached)
+
+        self.cache[key] = cached
+        self.cached_size += cached.size
+        self._evict()
+
+    def get(self, client_id, name, default=None):
+        """Returns a client's state, or `default` if it has not been stored.
+
+        The state returned is shared with the store: after modifying it in place, it
+        should be stored again with `put()`.
+        """
+        key = (client_id, name)
+        cached = self.cache.get(key)
+
+        if cached is not None and (
+            cached.dirty or cached.version == self.version(self.filename(*key))
+        ):
+            self.cache.move_to_end(key)
+            return cached.state
+
+        self._discard(key)
+        if not self._load(key):
+            return default
+
+        return self.cache[key].state
+
+    def contains(self, client_id, name) -> bool:
+        """Whether a state is stored for a client."""
+        key = (client_id, name)
+        if key in self.cache and self.cache[key].dirty:
+            return True
+        return os.path.exists(self.filename(*key))
+
+    def prefetch(self, client_ids, names) -> None:
+        """Maps the states of clients that will be used soon, such as those selected
+        for the next round, into memory, and lets the kernel start reading them."""
+        for client_id in client_ids:
+            for name in names:
+                key = (client_id, name)
+                if key not in self.cache:
+                    self._load(key, advise=True)
+
+    def remove(self, client_id=None, name=None) -> None:
+        """Removes the states of a client, the states with a name, or both, from
+        memory and from the files."""
+        for key in list(self.cache):
+            if client_id in (None, key[0]) and name in (None, key[1]):
+                self._discard(key)
+
+        if not os.path.isdir(self.path):
+            return
+
+        prefix = "" if name is None else f"{name}_client"
+        suffix = "" if client_id is None else f"_client{client_id}"
+        for filename in os.listdir(self.path):
+            if filename.startswith(prefix) and filename.endswith(
+                f"{suffix}.safetensors"
+            ):
+                os.remove(os.path.join(self.path, filename))
+
+    def flush(self) -> None:
+        """Saves the states held in memory that have not been saved yet."""
+        for key, cached in self.cache.items():
+            if cached.dirty:
+                self._save(key, cached)
+
+    def _save(self, key, cached) -> None:
+        """Saves a state held in memory to its file."""
+        os.makedirs(self.path, exist_ok=True)
+        filename = self.filename(*key)
+        save(cached.state, filename)
+        cached.dirty = False
+        cached.version = self.version(filename)
+
+    def _load(self, key, advise=False) -> bool:
+        """Loads a state from its file into memory, if it exists."""
+        filename = self.filename(*key)
+        version = self.version(filename)
+        if version is None:
+            return False
+
+        state = load(filename, advise=advise)
+        cached = _CachedState(state, sizeof(state), version=version)
+        self.cache[key] = cached
+        self.cached_size += cached.size
+        self._evict()
+
+        return True
+
+    def _discard(self, key) -> None:
+        """Drops a state from memory, without saving it."""
+        cached = self.cache.pop(key, None)
+        if cached is not None:
+            self.cached_size -= cached.size
+
+    def _evict(self) -> None:
+        """Moves the least recently used states out of memory until the others fit,
+        saving those that have not been saved yet."""
+        while self.cached_size > self.capacity and self.cache:
+            key, cached = self.cache.popitem(last=False)
+            self.cached_size -= cached.size
+            if cached.dirty:
+                self._save(key, cached)
+
+
+def get() -> ClientStateStore:
+    """Returns the store of client states used by this process, writing states through
+    to their files so that they can be used by other processes."""
+    global _store, _store_pid  # pylint: disable=global-statement
+
+    if _store is None or _store_pid != os.getpid():
+        _store = ClientStateStore()
+        _store_pid = os.getpid()
+
+    return _store
@@ -6,6 +6,8 @@ import csv
 import os
 from typing import List
 
+from plato.utils import results_sink
+
 
 def initialize_csv(
     result_csv_file: str, logged_items: List, result_path: str
@@ -23,6 +25,12 @@ def initialize_csv(
 
 def write_csv(result_csv_file: str, new_row: List) -> None:
     """Write the results of current round."""
+    # Rows of a file with a results sink are buffered along with its other rows
+    sink = results_sink.get_sink(result_csv_file)
+    if sink is not None:
+        sink.write(new_row)
+        return
+
     with open(result_csv_file, "a", encoding="utf-8") as result_file:
         result_writer = csv.writer(result_file)
         result_writer.writerow(new_row)
@@ -0,0 +1,111 @@
+"""
+A registry that maps the names of components to where they are implemented, and only
+imports a component when it is first used.
+
+Importing every implementation when a registry is loaded would import all of their
+dependencies, such as transformers or opacus, in every server and client process,
+even though a training session only uses a few of them.
+
+Components are given as `"module"` or `"module:attribute"`. Third-party packages can
+provide their own components, without changing Plato, as entry points in the group of
+a registry, such as `plato.datasources`, in their package metadata:
+
+    [project.entry-points."plato.datasources"]
+    MyDataset = "my_package.my_datasource"
+
+These entry points are only looked up when a name is not one of the components that
+come with Plato, and they never replace them.
+"""
+import importlib
+import logging
+from collections.abc import MutableMapping
+
+
+def entry_points(group):
+    """Returns the entry points installed in a group."""
+    try:
+        from importlib import metadata  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return []
+
+    installed = metadata.entry_points()
+    if hasattr(installed, "select"):
+        return installed.select(group=group)
+
+    return installed.get(group, [])
+
+
+def resolve(target):
+    """Imports the module or the attribute of a module given as `module:attribute`."""
+    module_name, __, attribute = target.partition(":")
+    resolved = importlib.import_module(module_name)
+
+    for name in filter(None, attribute.split(".")):
+        resolved = getattr(resolved, name)
+
+    return resolved
+
+
+class LazyRegistry(MutableMapping):
+    """A mapping from names to components, which are imported on first use."""
+
+    def __init__(self, targets, group=None):
+        # The components as given, or as imported once they have been used
+        self.targets = dict(targets)
+        self.resolved = {}
+
+        # The entry point group of third-party components, looked up on demand
+        self.group = group
+        self.discovered = group is None
+
+    def discover(self) -> None:
+        """Adds the third-party components installed as entry points."""
+        if self.discovered:
+            return
+        self.discovered = True
+
+        for entry_point in entry_points(self.group):
+            if entry_point.name not in self.targets:
+                logging.debug(
+                    "Discovered %s in '%s': %s.",
+                    entry_point.name,
+                    self.group,
+                    entry_point.value,
+                )
+                self.targets[entry_point.name] = entry_point.value
+
+    def __getitem__(self, name):
+        if name in self.resolved:
+            return self.resolved[name]
+
+        if name not in self.targets:
+            self.discover()
+
+        target = self.targets[name]
+        if isinstance(target, str):
+            target = resolve(target)
+
+        self.resolved[name] = target
+        return target
+
+    def __setitem__(self, name, target):
+        self.targets[name] = target
+        self.resolved.pop(name, None)
+
+    def __delitem__(self, name):
+        del self.targets[name]
+        self.resolved.pop(name, None)
+
+    def __contains__(self, name):
+        if name not in self.targets:
+            self.discover()
+
+        return name in self.targets
+
+    def __iter__(self):
+        self.discover()
+        return iter(list(self.targets))
+
+    def __len__(self):
+        self.discover()
+        return len(self.targets)
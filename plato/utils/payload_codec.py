@@ -0,0 +1,301 @@
+"""
+Codecs that turn data payloads into bytes for transmission between the clients and
+the server, and back.
+
+The default `tensor` codec writes a PyTorch state_dict as a small JSON header (names,
+dtypes, shapes and offsets) followed by one contiguous buffer holding the raw bytes of
+all the tensors. On the receiving side, the tensors are views into that buffer, so no
+additional copies are made while decoding. Any other payload falls back to pickle.
+
+Decoding does not depend on the codec configured locally: the format of an encoded
+payload is detected from its leading bytes.
+"""
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from collections import OrderedDict
+from typing import Any
+
+from plato.config import Config
+
+# Every payload encoded by the tensor codec starts with these bytes, which can
+# never be the start of a pickle stream
+MAGIC = b"PLATOTNS"
+
+# The header length is stored as an unsigned 64-bit little-endian integer
+_HEADER_LENGTH = struct.Struct("<Q")
+
+# Tensors are placed at offsets aligned to this many bytes in the data region
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    """Rounds an offset up to the next multiple of ALIGNMENT."""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class PickleCodec:
+    """Encodes any picklable payload with pickle."""
+
+    def encode(self, payload: Any):
+        """Encodes a payload into a bytes-like object."""
+        return pickle.dumps(payload)
+
+    def decode(self, buffer) -> Any:
+        """Decodes a payload from a bytes-like object."""
+        return pickle.loads(buffer)
+
+
+class TensorCodec(PickleCodec):
+    """Encodes PyTorch state_dicts into a raw tensor buffer with a small header,
+    falling back to pickle for all other payloads."""
+
+    @staticmethod
+    def is_supported(payload: Any) -> bool:
+        """Whether the payload is a dictionary of dense tensors keyed by strings."""
+        if not isinstance(payload, dict) or len(payload) == 0:
+            return False
+
+        try:
+            import torch
+        except ImportError:
+            return False
+
+        return all(
+            isinstance(name, str)
+            and isinstance(tensor, torch.Tensor)
+            and tensor.layout == torch.strided
+            and not tensor.is_quantized
+            for name, tensor in payload.items()
+        )
+
+    def encode(self, payload: Any):
+        """Encodes a payload into a bytes-like object."""
+        if not self.is_supported(payload):
+            return super().encode(payload)
+
+        import torch
+
+        tensors = []
+        entries = []
+        data_size = 0
+        for name, tensor in payload.items():
+            tensor = tensor.detach().cpu().contiguous()
+            nbytes = tensor.numel() * tensor.element_size()
+            entries.append(
+                [
+                    name,
+                    str(tensor.dtype)[len("torch.") :],
+                    list(tensor.shape),
+                    data_size,
+                    tensor.numel(),
+                ]
+            )
+            tensors.append(tensor)
+            data_size = _align(data_size + nbytes)
+
+        header = {"tensors": entries, "ordered": isinstance(payload, OrderedDict)}
+
+        # Version information of the modules, used by Module.load_state_dict()
+        metadata = getattr(payload, "_metadata", None)
+        if metadata is not None:
+            try:
+                header["metadata"] = json.loads(json.dumps(metadata))
+            except TypeError:
+                pass
+
+        header = json.dumps(header).encode("utf-8")
+        data_start = _align(len(MAGIC) + _HEADER_LENGTH.size + len(header))
+
+        buffer = bytearray(data_start + data_size)
+        buffer[: len(MAGIC)] = MAGIC
+        _HEADER_LENGTH.pack_into(buffer, len(MAGIC), len(header))
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        buffer[start : start + len(header)] = header
+
+        for (__, __, __, offset, numel), tensor in zip(entries, tensors):
+            if numel > 0:
+                torch.frombuffer(
+                    buffer,
+                    dtype=torch.uint8,
+                    count=numel * tensor.element_size(),
+                    offset=data_start + offset,
+                ).copy_(tensor.reshape(-1).view(torch.uint8))
+
+        return buffer
+
+    def decode(self, buffer) -> Any:
+        """Decodes a payload from a bytes-like object.
+
+        If the buffer is writable, such as a bytearray, the decoded tensors share
+        their memory with it; otherwise, the buffer is copied once.
+        """
+        if not is_tensor_payload(buffer):
+            return super().decode(buffer)
+
+        import torch
+
+        if memoryview(buffer).readonly:
+            buffer = bytearray(buffer)
+
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+        header = json.loads(bytes(buffer[start : start + header_length]))
+        data_start = _align(start + header_length)
+
+        payload = OrderedDict() if header["ordered"] else {}
+        for name, dtype, shape, offset, numel in header["tensors"]:
+            dtype = getattr(torch, dtype)
+            if numel == 0:
+                payload[name] = torch.empty(shape, dtype=dtype)
+            else:
+                payload[name] = torch.frombuffer(
+                    buffer, dtype=dtype, count=numel, offset=data_start + offset
+                ).view(shape)
+
+        if "metadata" in header:
+            payload._metadata = OrderedDict(header["metadata"])
+
+        return payload
+
+
+registered_codecs = {
+    "pickle": PickleCodec,
+    "tensor": TensorCodec,
+}
+
+
+def is_tensor_payload(buffer) -> bool:
+    """Whether a bytes-like object was encoded by the tensor codec."""
+    return bytes(memoryview(buffer)[: len(MAGIC)]) == MAGIC
+
+
+def get():
+    """Get the codec used to encode outbound payloads, as configured in the
+    `payload_codec` setting of the `server` section."""
+    codec_name = (
+        Config().server.payload_codec
+        if hasattr(Config().server, "payload_codec")
+        else "tensor"
+    )
+
+    if codec_name in registered_codecs:
+        return registered_codecs[codec_name]()
+
+    raise ValueError(f"No such payload codec: {codec_name}")
+
+
+def encode(payload: Any):
+    """Encodes a payload with the configured codec."""
+    return get().encode(payload)
+
+
+def decode(buffer) -> Any:
+    """Decodes a payload, regardless of the codec that encoded it."""
+    return TensorCodec().decode(buffer)
+
+
+def dump(payload: Any, filename: str) -> int:
+    """Encodes a payload into a file, and returns the number of bytes written."""
+    data = encode(payload)
+
+    with open(filename, "wb") as payload_file:
+        payload_file.write(data)
+
+    return len(data)
+
+
+def load(filename: str, memory_map=False) -> Any:
+    """Decodes a payload from a file, reading it directly into a writable buffer
+    so that the decoded tensors can share its memory.
+
+    With `memory_map` set, the file is mapped into memory as copy-on-write instead,
+    so that processes loading the same file share its pages until they are modified.
+    The file must then not be overwritten while the payload is in use.
+    """
+    with open(filename, "rb") as payload_file:
+        if memory_map:
+            buffer = mmap.mmap(payload_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            buffer = bytearray(os.path.getsize(filename))
+            payload_file.readinto(buffer)
+
+    return decode(buffer)
+
+
+def sizeof(payload: Any) -> int:
+    """Returns the size of a payload in bytes without serializing it.
+
+    Tensors and arrays are counted by the size of their elements, and bytes-like
+    objects by their length. This is used to account for payloads that were not
+    received as a stream of bytes.
+    """
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return memoryview(payload).nbytes
+
+    if isinstance(payload, dict):
+        return sum(sizeof(value) for value in payload.values())
+
+    if isinstance(payload, (list, tuple)):
+        return sum(sizeof(value) for value in payload)
+
+    if hasattr(payload, "element_size") and hasattr(payload, "numel"):
+        # A PyTorch tensor
+        return payload.numel() * payload.element_size()
+
+    if hasattr(payload, "nbytes"):
+        # A NumPy array
+        return int(payload.nbytes)
+
+    return sys.getsizeof(payload)
+
+
+def fingerprint(payload: Any):
+    """Returns a hashable key that is equal for two payloads holding the same tensors,
+    in the same version, and the same plain values, or None if the payload contains
+    other objects.
+
+    The key is only meaningful while the fingerprinted payload is kept alive, so that
+    the memory of its tensors cannot be reused by other tensors.
+    """
+    if isinstance(payload, (str, bytes, int, float, bool, type(None))):
+        return (type(payload), payload)
+
+    if isinstance(payload, dict):
+        keys = []
+        for name, value in payload.items():
+            key = fingerprint(value)
+            if key is None:
+                return None
+            keys.append((name, key))
+        return (type(payload), tuple(keys))
+
+    if isinstance(payload, (list, tuple)):
+        keys = []
+        for value in payload:
+            key = fingerprint(value)
+            if key is None:
+                return None
+            keys.append(key)
+        return (type(payload), tuple(keys))
+
+    try:
+        import torch
+    except ImportError:
+        return None
+
+    if isinstance(payload, torch.Tensor) and payload.layout == torch.strided:
+        return (
+            torch.Tensor,
+            str(payload.device),
+            payload.data_ptr(),
+            payload._version,
+            payload.dtype,
+            tuple(payload.shape),
+            payload.stride(),
+        )
+
+    return None
@@ -12,7 +12,12 @@ from torch import nn
 
 
 class ReplayMemory:
-    """ A simple example of replay memory buffer. """
+    """ A simple example of replay memory buffer.
+
+    The transitions are stored in preallocated float32 tensors on the device that
+    the policy is trained on, so that a batch is sampled by gathering rows of these
+    tensors, without copying or converting each transition.
+    """
     def __init__(self, state_dim, action_dim, capacity, seed):
         random.seed(seed)
         self.device = Config().device()
@@ -20,26 +25,61 @@ class ReplayMemory:
         self.ptr = 0
         self.size = 0
 
-        self.state = np.zeros((self.capacity, state_dim))
-        self.action = np.zeros((self.capacity, action_dim))
-        self.reward = np.zeros((self.capacity, 1))
-        self.next_state = np.zeros((self.capacity, state_dim))
-        self.done = np.zeros((self.capacity, 1))
+        self.state = self.allocate(state_dim)
+        self.action = self.allocate(action_dim)
+        self.reward = self.allocate(1)
+        self.next_state = self.allocate(state_dim)
+        self.done = self.allocate(1)
+
+    def allocate(self, *shape):
+        """ Allocates the storage of a field of all the transitions. """
+        return torch.zeros((self.capacity, *shape),
+                           dtype=torch.float32,
+                           device=self.device)
+
+    def as_tensor(self, value):
+        """ Converts the values of a field to be stored. """
+        return torch.as_tensor(np.asarray(value),
+                               dtype=torch.float32).to(self.device)
 
     def push(self, data):
-        self.state[self.ptr] = data[0]
-        self.action[self.ptr] = data[1]
-        self.reward[self.ptr] = data[2]
-        self.next_state[self.ptr] = data[3]
-        self.done[self.ptr] = data[4]
+        self.state[self.ptr] = self.as_tensor(data[0])
+        self.action[self.ptr] = self.as_tensor(data[1])
+        self.reward[self.ptr] = self.as_tensor(data[2])
+        self.next_state[self.ptr] = self.as_tensor(data[3])
+        self.done[self.ptr] = self.as_tensor(data[4])
 
         self.ptr = (self.ptr + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
-    def sample(self):
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        """ Stores a number of transitions at once, given as arrays with one row for
+        each transition. """
+        # Only the latest transitions are kept if there are more than the capacity
+        count = min(len(states), self.capacity)
+        positions = torch.arange(self.ptr, self.ptr + count,
+                                 device=self.device) % self.capacity
+
+        self.state[positions] = self.as_tensor(states)[-count:]
+        self.action[positions] = self.as_tensor(actions)[-count:]
+        self.reward[positions] = self.as_tensor(rewards).reshape(-1,
+                                                                 1)[-count:]
+        self.next_state[positions] = self.as_tensor(next_states)[-count:]
+        self.done[positions] = self.as_tensor(dones).reshape(-1, 1)[-count:]
+
+        self.ptr = (self.ptr + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample_indices(self):
+        """ Samples the positions of a batch of transitions. """
         ind = np.random.randint(0,
                                 self.size,
                                 size=int(Config().algorithm.batch_size))
+        return torch.from_numpy(ind).to(self.device)
+
+    def sample(self):
+        """ Samples a batch of transitions, as tensors on the device. """
+        ind = self.sample_indices()
 
         state = self.state[ind]
         action = self.action[ind]
@@ -24,12 +24,11 @@ class Policy(base.Policy):
             # Sample replay buffer
             state, action, reward, next_state, done = self.replay_buffer.sample(
             )
-            state = torch.FloatTensor(state).to(self.device).unsqueeze(1)
-            action = torch.FloatTensor(action).to(self.device).unsqueeze(1)
-            reward = torch.FloatTensor(reward).to(self.device).unsqueeze(1)
-            next_state = torch.FloatTensor(next_state).to(
-                self.device).unsqueeze(1)
-            done = torch.FloatTensor(done).to(self.device).unsqueeze(1)
+            state = state.unsqueeze(1)
+            action = action.unsqueeze(1)
+            reward = reward.unsqueeze(1)
+            next_state = next_state.unsqueeze(1)
+            done = done.unsqueeze(1)
 
             # Compute the target Q value
             target_Q = self.critic_target(next_state,
@@ -16,96 +16,159 @@ from torch.nn.utils.rnn import (pack_padded_sequence, pad_packed_sequence,
                                 pad_sequence)
 
 
-class RNNReplayMemory:
+class RNNReplayMemory(base.ReplayMemory):
+    """ A replay memory buffer that also stores the hidden states of LSTMs.
+
+    In asynchronous mode, each state has a row for each client that reported, up to
+    `action_dim` rows. States are stored padded with zeros to `action_dim` rows,
+    along with their numbers of rows, and sampled as (padded states, lengths) pairs.
+    """
     def __init__(self, state_dim, action_dim, hidden_size, capacity, seed):
-        random.seed(seed)
-        self.device = Config().device()
-        self.capacity = int(capacity)
-        self.ptr = 0
-        self.size = 0
-
-        self.h = np.zeros((self.capacity, hidden_size))
-        self.nh = np.zeros((self.capacity, hidden_size))
-        self.c = np.zeros((self.capacity, hidden_size))
-        self.nc = np.zeros((self.capacity, hidden_size))
-        if hasattr(Config().server,
-                   'synchronous') and not Config().server.synchronous:
-            self.state = [0] * self.capacity
-            self.action = [0] * self.capacity
-            self.reward = [0] * self.capacity
-            self.next_state = [0] * self.capacity
-            self.done = [0] * self.capacity
-        else:
-            self.state = np.zeros((self.capacity, state_dim))
-            self.action = np.zeros((self.capacity, action_dim))
-            self.reward = np.zeros((self.capacity, 1))
-            self.next_state = np.zeros((self.capacity, state_dim))
-            self.done = np.zeros((self.capacity, 1))
+        super().__init__(state_dim, action_dim, capacity, seed)
+
+        self.h = self.allocate(hidden_size)
+        self.nh = self.allocate(hidden_size)
+        self.c = self.allocate(hidden_size)
+        self.nc = self.allocate(hidden_size)
+
+        self.variable_states = hasattr(
+            Config().server, 'synchronous') and not Config().server.synchronous
+        if self.variable_states:
+            self.state = self.allocate(action_dim, state_dim)
+            self.next_state = self.allocate(action_dim, state_dim)
+            self.action = self.allocate(action_dim, 1)
+            self.reward = self.allocate()
+            self.done = self.allocate()
+
+            # The lengths are used on the CPU to pack the padded states
+            self.lengths = torch.zeros(self.capacity, dtype=torch.long)
+            self.next_lengths = torch.zeros(self.capacity, dtype=torch.long)
 
     def push(self, data):
-        self.state[self.ptr] = data[0]
-        self.action[self.ptr] = data[1]
-        self.reward[self.ptr] = data[2]
-        self.next_state[self.ptr] = data[3]
-        self.done[self.ptr] = data[4]
+        if self.variable_states:
+            state = self.as_tensor(data[0])
+            next_state = self.as_tensor(data[3])
+
+            self.state[self.ptr] = 0
+            self.state[self.ptr, :len(state)] = state
+            self.lengths[self.ptr] = len(state)
+            self.next_state[self.ptr] = 0
+            self.next_state[self.ptr, :len(next_state)] = next_state
+            self.next_lengths[self.ptr] = len(next_state)
+
+            self.action[self.ptr] = self.as_tensor(data[1]).reshape(-1, 1)
+            self.reward[self.ptr] = float(data[2])
+            self.done[self.ptr] = float(data[4])
+        else:
+            self.state[self.ptr] = self.as_tensor(data[0])
+            self.action[self.ptr] = self.as_tensor(data[1])
+            self.reward[self.ptr] = self.as_tensor(data[2])
+            self.next_state[self.ptr] = self.as_tensor(data[3])
+            self.done[self.ptr] = self.as_tensor(data[4])
 
-        self.h[self.ptr] = data[5].detach().cpu()
-        self.c[self.ptr] = data[6].detach().cpu()
-        self.nh[self.ptr] = data[7].detach().cpu()
-        self.nc[self.ptr] = data[8].detach().cpu()
+        self.h[self.ptr] = data[5].detach().reshape(-1)
+        self.c[self.ptr] = data[6].detach().reshape(-1)
+        self.nh[self.ptr] = data[7].detach().reshape(-1)
+        self.nc[self.ptr] = data[8].detach().reshape(-1)
 
         self.ptr = (self.ptr + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
-    def sample(self):
-        ind = np.random.randint(0,
-                                self.size,
-                                size=int(Config().algorithm.batch_size))
-
-        h = torch.tensor(self.h[ind][None, ...],
-                         requires_grad=True,
-                         dtype=torch.float).to(self.device)
-        c = torch.tensor(self.c[ind][None, ...],
-                         requires_grad=True,
-                         dtype=torch.float).to(self.device)
-        nh = torch.tensor(self.nh[ind][None, ...],
-                          requires_grad=True,
-                          dtype=torch.float).to(self.device)
-        nc = torch.tensor(self.nc[ind][None, ...],
-                          requires_grad=True,
-                          dtype=torch.float).to(self.device)
+    def push_batch(self,
+                   states,
+                   actions,
+                   rewards,
+                   next_states,
+                   dones,
+                   h,
+                   c,
+                   nh,
+                   nc,
+                   lengths=None,
+                   next_lengths=None):
+        """ Stores a number of transitions at once along with their hidden states,
+        given as arrays or tensors with one row for each transition. In asynchronous
+        mode, the states are given padded to `action_dim` rows, with their numbers of
+        rows in `lengths` and `next_lengths`. """
+        # Only the latest transitions are kept if there are more than the capacity
+        count = min(len(states), self.capacity)
+        positions = torch.arange(self.ptr, self.ptr + count,
+                                 device=self.device) % self.capacity
+
+        fields = [(self.state, states), (self.action, actions),
+                  (self.reward, rewards), (self.next_state, next_states),
+                  (self.done, dones), (self.h, h), (self.c, c), (self.nh, nh),
+                  (self.nc, nc)]
+        for storage, values in fields:
+            if isinstance(values, torch.Tensor):
+                values = values.detach().to(self.device, torch.float32)
+            else:
+                values = self.as_tensor(values)
+            storage[positions] = values.reshape(-1, *storage.shape[1:])[-count:]
 
-        if hasattr(Config().server,
-                   'synchronous') and not Config().server.synchronous:
-            state = [
-                torch.FloatTensor(self.state[i]).to(self.device) for i in ind
-            ]
-            action = [
-                torch.FloatTensor(self.action[i]).to(self.device) for i in ind
-            ]
-            reward = [self.reward[i] for i in ind]
-            next_state = [
-                torch.FloatTensor(self.next_state[i]).to(self.device)
-                for i in ind
-            ]
-            done = [self.done[i] for i in ind]
+        if self.variable_states:
+            cpu_positions = positions.cpu()
+            padded = [(self.state, self.lengths, lengths),
+                      (self.next_state, self.next_lengths, next_lengths)]
+            for storage, stored_lengths, values in padded:
+                values = torch.as_tensor(values, dtype=torch.long)[-count:]
+                stored_lengths[cpu_positions] = values
+
+                # The rows after the number of rows of each state are zeros
+                padding = torch.arange(storage.shape[1]) >= values[:, None]
+                storage[positions] = storage[positions].masked_fill(
+                    padding[..., None].to(self.device), 0)
+
+        self.ptr = (self.ptr + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample(self):
+        ind = self.sample_indices()
+
+        h = self.h[ind][None, ...].requires_grad_()
+        c = self.c[ind][None, ...].requires_grad_()
+        nh = self.nh[ind][None, ...].requires_grad_()
+        nc = self.nc[ind][None, ...].requires_grad_()
+
+        if self.variable_states:
+            cpu_ind = ind.cpu()
+            state = (self.state[ind], self.lengths[cpu_ind])
+            next_state = (self.next_state[ind], self.next_lengths[cpu_ind])
+            action = self.action[ind]
+            reward = self.reward[ind]
+            done = self.done[ind]
         else:
-            state = torch.FloatTensor(self.state[ind][:,
-                                                      None, :]).to(self.device)
-
-            action = torch.FloatTensor(self.action[ind][:, None, :]).to(
-                self.device)
-            reward = torch.FloatTensor(self.reward[ind][:, None, :]).to(
-                self.device)
-            next_state = torch.FloatTensor(
-                self.next_state[ind][:, None, :]).to(self.device)
-            done = torch.FloatTensor(self.done[ind][:,
-                                                    None, :]).to(self.device)
+            state = self.state[ind][:, None, :]
+            action = self.action[ind][:, None, :]
+            reward = self.reward[ind][:, None, :]
+            next_state = self.next_state[ind][:, None, :]
+            done = self.done[ind][:, None, :]
 
         return state, action, reward, next_state, done, h, c, nh, nc
 
-    def __len__(self):
-        return self.size
+
+def pad_states(state, action_dim):
+    """ Pads a list of states with variable numbers of rows into one tensor, and
+    returns it along with the numbers of rows. The first state is padded to
+    `action_dim` rows, so that the padded tensor has `action_dim` rows. """
+    if len(state) == 1:
+        pilot = state
+    else:
+        pilot = state[0]
+    pilot = F.pad(input=pilot,
+                  pad=(0, 0, 0, action_dim - pilot.shape[-2]),
+                  mode='constant',
+                  value=0)
+    if len(state) == 1:
+        state = pilot
+    else:
+        state[0] = pilot
+    # Get the length explicitly for later packing sequences
+    lens = list(map(len, state))
+    if len(state) == 1:
+        state = [torch.squeeze(state)]
+
+    return pad_sequence(state, batch_first=True), lens
 
 
 class TD3Actor(base.Actor):
@@ -171,26 +234,12 @@ class RNNActor(nn.Module):
     def forward(self, state, hidden=None):
         if hasattr(Config().server,
                    'synchronous') and not Config().server.synchronous:
-            # Pad the first state to full dims
-            if len(state) == 1:
-                pilot = state
-            else:
-                pilot = state[0]
-            pilot = F.pad(input=pilot,
-                          pad=(0, 0, 0, self.action_dim - pilot.shape[-2]),
-                          mode='constant',
-                          value=0)
-            if len(state) == 1:
-                state = pilot
+            # Pad variable states, unless sampled padded from the replay memory
+            if isinstance(state, tuple):
+                padded, lens = state
             else:
-                state[0] = pilot
-            # Pad variable states
-            # Get the length explicitly for later packing sequences
-            lens = list(map(len, state))
-            if len(state) == 1:
-                state = [torch.squeeze(state)]
-            # Pad and pack
-            padded = pad_sequence(state, batch_first=True)
+                padded, lens = pad_states(state, self.action_dim)
+            # Pack
             state = pack_padded_sequence(padded,
                                          lengths=lens,
                                          batch_first=True,
@@ -201,7 +250,9 @@ class RNNActor(nn.Module):
         # mini-batch update
         if hasattr(Config().server, 'synchronous'
                    ) and not Config().server.synchronous and len(state) != 1:
-            a, _ = pad_packed_sequence(a, batch_first=True)
+            a, _ = pad_packed_sequence(a,
+                                       batch_first=True,
+                                       total_length=padded.shape[1])
 
         a = F.relu(self.l2(a))
         a = self.max_action * torch.tanh(self.l3(a))
@@ -243,28 +294,13 @@ class RNNCritic(nn.Module):
     def forward(self, state, action, hidden1, hidden2):
         if hasattr(Config().server,
                    'synchronous') and not Config().server.synchronous:
-            # Pad the first state to full dims
-            if len(state) == 1:
-                pilot = state
+            # Pad variable states, unless sampled padded from the replay memory
+            if isinstance(state, tuple):
+                state, lens = state
             else:
-                pilot = state[0]
-            pilot = F.pad(input=pilot,
-                          pad=(0, 0, 0, self.action_dim - pilot.shape[-2]),
-                          mode='constant',
-                          value=0)
-            if len(state) == 1:
-                state = pilot
-            else:
-                state[0] = pilot
-            # Pad variable states
-            # Get the length explicitly for later packing sequences
-            lens = list(map(len, state))
-            if len(state) == 1:
-                state = [torch.squeeze(state)]
-            # Pad and pack
-            padded = pad_sequence(state, batch_first=True)
-            state = padded
+                state, lens = pad_states(state, self.action_dim)
         sa = torch.cat([state, action], -1)
+        sa_length = sa.shape[1]
 
         if hasattr(Config().server,
                    'synchronous') and not Config().server.synchronous:
@@ -279,8 +315,12 @@ class RNNCritic(nn.Module):
 
         if hasattr(Config().server,
                    'synchronous') and not Config().server.synchronous:
-            q1, _ = pad_packed_sequence(q1, batch_first=True)
-            q2, _ = pad_packed_sequence(q2, batch_first=True)
+            q1, _ = pad_packed_sequence(q1,
+                                        batch_first=True,
+                                        total_length=sa_length)
+            q2, _ = pad_packed_sequence(q2,
+                                        batch_first=True,
+                                        total_length=sa_length)
 
         q1 = F.relu(self.l2(q1))
         q1 = self.l3(q1)
@@ -295,14 +335,16 @@ class RNNCritic(nn.Module):
     def Q1(self, state, action, hidden1):
         if hasattr(Config().server,
                    'synchronous') and not Config().server.synchronous:
-            # Pad variable states
-            # Get the length explicitly for later packing sequences
-            lens = list(map(len, state))
-            # Pad and pack
-            padded = pad_sequence(state, batch_first=True)
-            state = padded
+            # Pad variable states, unless sampled padded from the replay memory
+            if isinstance(state, tuple):
+                state, lens = state
+            else:
+                # Get the length explicitly for later packing sequences
+                lens = list(map(len, state))
+                state = pad_sequence(state, batch_first=True)
 
         sa = torch.cat([state, action], -1)
+        sa_length = sa.shape[1]
 
         if hasattr(Config().server,
                    'synchronous') and not Config().server.synchronous:
@@ -315,7 +357,9 @@ class RNNCritic(nn.Module):
 
         if hasattr(Config().server,
                    'synchronous') and not Config().server.synchronous:
-            q1, _ = pad_packed_sequence(q1, batch_first=True)
+            q1, _ = pad_packed_sequence(q1,
+                                        batch_first=True,
+                                        total_length=sa_length)
 
         q1 = F.relu(self.l2(q1))
         q1 = self.l3(q1)
@@ -405,23 +449,13 @@ class Policy(base.Policy):
         if Config().algorithm.recurrent_actor:
             state, action, reward, next_state, done, h, c, nh, nc = self.replay_buffer.sample(
             )
-            if hasattr(Config().server,
-                       'synchronous') and not Config().server.synchronous:
-                # Pad variable actions
-                padded = pad_sequence(action, batch_first=True)
-                action = padded
-            reward = torch.FloatTensor(reward).to(self.device).unsqueeze(1)
-            done = torch.FloatTensor(done).to(self.device).unsqueeze(1)
+            reward = reward.unsqueeze(1)
+            done = done.unsqueeze(1)
             hidden = (h, c)
             next_hidden = (nh, nc)
         else:
             state, action, reward, next_state, done = self.replay_buffer.sample(
             )
-            state = torch.FloatTensor(state).to(self.device)
-            action = torch.FloatTensor(action).to(self.device)
-            reward = torch.FloatTensor(reward).to(self.device)
-            next_state = torch.FloatTensor(next_state).to(self.device)
-            done = torch.FloatTensor(done).to(self.device)
             hidden, next_hidden = (None, None), (None, None)
 
         with torch.no_grad():
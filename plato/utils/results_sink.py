@@ -0,0 +1,133 @@
+"""
+Buffered sinks for the results of a run, such as the results of each round and the
+test accuracies of clients.
+
+Rows of results are kept in memory and written in batches, once `flush_interval`
+seconds have passed since the last write, and when the sink is closed. The results are
+written either as rows appended to a .csv file, or as a NumPy .npz file with an array
+for each column, which is rewritten with all the rows so far at each flush.
+
+A sink is registered under the name of its .csv file, so that rows written to that
+file with `csv_processor.write_csv()` are buffered along with the other rows.
+"""
+import atexit
+import csv
+import os
+import time
+
+import numpy as np
+
+# The open sinks, by the names of their .csv files
+_sinks = {}
+
+
+class ResultsSink:
+    """Buffers rows of results, and writes them to a file in batches."""
+
+    def __init__(self, filename, columns, file_format="csv", flush_interval=0.0):
+        if file_format not in ("csv", "npz"):
+            raise ValueError(f"Unknown format of results: {file_format}.")
+
+        self.filename = filename
+        self.columns = list(columns)
+        self.file_format = file_format
+        self.flush_interval = flush_interval
+
+        # The rows not written yet, and all the rows if written as columns
+        self.buffer = []
+        self.rows = []
+        self.last_flush = time.monotonic()
+
+        path = os.path.dirname(filename)
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+        if file_format == "csv":
+            with open(filename, "w", encoding="utf-8") as result_file:
+                csv.writer(result_file).writerow(self.columns)
+        else:
+            self.flush(force=True)
+
+    @property
+    def output_filename(self) -> str:
+        """The name of the file the results are written to."""
+        if self.file_format == "npz":
+            return f"{os.path.splitext(self.filename)[0]}.npz"
+        return self.filename
+
+    def write(self, row) -> None:
+        """Adds a row of results."""
+        self.write_rows([row])
+
+    def write_rows(self, rows) -> None:
+        """Adds rows of results, and writes them if it is time to."""
+        self.buffer.extend(list(row) for row in rows)
+        self.flush()
+
+    def flush(self, force=False) -> None:
+        """Writes the buffered rows if `flush_interval` seconds have passed since the
+        last write, or regardless if forced."""
+        now = time.monotonic()
+        if not force and now - self.last_flush < self.flush_interval:
+            return
+        self.last_flush = now
+
+        if self.file_format == "csv":
+            if self.buffer:
+                with open(self.filename, "a", encoding="utf-8") as result_file:
+                    csv.writer(result_file).writerows(self.buffer)
+        else:
+            self.rows.extend(self.buffer)
+            self.write_columns()
+
+        self.buffer = []
+
+    def write_columns(self) -> None:
+        """Rewrites the .npz file with an array for each column of all the rows."""
+        arrays = {}
+        for index, column in enumerate(self.columns):
+            values = [row[index] if index < len(row) else None for row in self.rows]
+            try:
+                arrays[column] = np.asarray(values)
+            except ValueError:
+                # Values of different shapes, such as lists of client ids
+                arrays[column] = np.empty(len(values), dtype=object)
+                arrays[column][:] = values
+
+        temp_filename = f"{self.output_filename}.{os.getpid()}.tmp"
+        with open(temp_filename, "wb") as result_file:
+            np.savez(result_file, **arrays)
+        os.replace(temp_filename, self.output_filename)
+
+    def close(self) -> None:
+        """Writes all the buffered rows, after which the rows written to its .csv file
+        are no longer buffered."""
+        self.flush(force=True)
+
+        if _sinks.get(self.filename) is self:
+            del _sinks[self.filename]
+
+
+def open_sink(filename, columns, file_format="csv", flush_interval=0.0) -> ResultsSink:
+    """Creates a sink for the results written to a .csv file, replacing any sink of
+    the same file."""
+    if filename in _sinks:
+        _sinks[filename].close()
+
+    sink = ResultsSink(filename, columns, file_format, flush_interval)
+    _sinks[filename] = sink
+    return sink
+
+
+def get_sink(filename):
+    """Returns the sink of a .csv file, or None if there is no such sink."""
+    return _sinks.get(filename)
+
+
+def flush_all() -> None:
+    """Writes the buffered rows of all the sinks."""
+    for sink in _sinks.values():
+        sink.flush(force=True)
+
+
+atexit.register(flush_all)
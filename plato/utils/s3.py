@@ -1,21 +1,93 @@
 """
 Utilities to transmit Python objects to and from an S3-compatible object storage service.
+
+A single S3 client is kept for all transfers, with a pool of connections that are
+reused across requests. Large payloads are uploaded in parts and downloaded with ranged
+GET requests, with up to `s3_max_concurrency` parts in flight at once. Payloads are
+uploaded from, and downloaded into, the buffers of their encoded bytes, without making
+another full-size copy.
 """
-import pickle
+import asyncio
+import functools
+import io
 from typing import Any
 
 import boto3
 import botocore
-import requests
+import botocore.config
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
 
 from plato.config import Config
+from plato.utils import payload_codec
+
+
+class BufferReader(io.RawIOBase):
+    """ A seekable file object reading from a bytes-like object without copying it. """
+    def __init__(self, buffer):
+        super().__init__()
+        self.view = memoryview(buffer).cast('B')
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self.view) - self.position)
+        buffer[:size] = self.view[self.position:self.position + size]
+        self.position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+
+class BufferWriter(io.RawIOBase):
+    """ A seekable file object writing into a preallocated bytearray. """
+    def __init__(self, buffer):
+        super().__init__()
+        self.view = memoryview(buffer).cast('B')
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, data):
+        size = len(data)
+        self.view[self.position:self.position + size] = data
+        self.position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        return self.position
 
 
 class S3:
     """ Manages the utilities to transmit Python objects to and from an S3-compatibile
         object storage service.
     """
-
     def __init__(self,
                  endpoint=None,
                  access_key=None,
@@ -55,29 +127,47 @@ class S3:
             if len(str_list) > 1:
                 self.key_prefix = bucket_part[len(self.bucket):]
 
+        # Payloads larger than a part are transferred in parts, concurrently
+        part_size = Config().server.s3_part_size if hasattr(
+            Config().server, 's3_part_size') else 8
+        max_concurrency = Config().server.s3_max_concurrency if hasattr(
+            Config().server, 's3_max_concurrency') else 10
+
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(part_size * 1024**2),
+            multipart_chunksize=int(part_size * 1024**2),
+            max_concurrency=max_concurrency)
+
+        # Enough pooled connections for all the parts in flight
+        client_config = botocore.config.Config(
+            max_pool_connections=max_concurrency)
+
         if self.access_key is not None and self.secret_key is not None:
             self.s3_client = boto3.client(
                 's3',
                 endpoint_url=self.endpoint,
                 aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key)
+                aws_secret_access_key=self.secret_key,
+                config=client_config)
         else:
             # the access key and secret key are stored locally in ~/.aws/credentials
-            self.s3_client = boto3.client('s3', endpoint_url=self.endpoint)
+            self.s3_client = boto3.client('s3',
+                                          endpoint_url=self.endpoint,
+                                          config=client_config)
 
         # Does the bucket exist?
         try:
             self.s3_client.head_bucket(Bucket=self.bucket)
-        except botocore.exception.ClientError:
+        except botocore.exceptions.ClientError:
             try:
                 self.s3_client.create_bucket(Bucket=self.bucket)
-            except botocore.exception.ClientError as s3_exception:
+            except botocore.exceptions.ClientError as s3_exception:
                 raise ValueError("Fail to create a bucket.") from s3_exception
 
-    def send_to_s3(self, object_key, object_to_send) -> str:
+    def send_to_s3(self, object_key, object_to_send) -> int:
         """ Sends an object to an S3-compatible object storage service.
 
-            Returns: A presigned URL for use later to retrieve the data.
+            Returns: The number of bytes sent, which is 0 if the object key exists already.
         """
         object_key = self.key_prefix + "/" + object_key
         try:
@@ -86,28 +176,24 @@ class S3:
         except botocore.exceptions.ClientError:
             try:
                 # Only send the object if the key does not exist yet
-                data = pickle.dumps(object_to_send)
-                put_url = self.s3_client.generate_presigned_url(
-                    ClientMethod='put_object',
-                    Params={
-                        'Bucket': self.bucket,
-                        'Key': object_key
-                    },
-                    ExpiresIn=300)
-                response = requests.put(put_url, data=data)
-
-                if response.status_code != 200:
-                    raise ValueError(
-                        f'Error occurred sending data: status code = {response.status_code}'
-                    ) from None
-
-            except botocore.exceptions.ClientError as error:
+                data = payload_codec.encode(object_to_send)
+                self.s3_client.upload_fileobj(BufferReader(data),
+                                              self.bucket,
+                                              object_key,
+                                              Config=self.transfer_config)
+
+                return len(data)
+
+            except (botocore.exceptions.ClientError,
+                    S3UploadFailedError) as error:
                 raise ValueError(
                     f'Error occurred sending data to S3: {error}') from error
 
             except botocore.exceptions.ParamValidationError as error:
                 raise ValueError(f'Incorrect parameters: {error}') from error
 
+        return 0
+
     def receive_from_s3(self, object_key) -> Any:
         """ Retrieves an object from an S3-compatible object storage service.
 
@@ -118,21 +204,33 @@ class S3:
             Returns: The object to be retrieved.
         """
         object_key = self.key_prefix + "/" + object_key
-        get_url = self.s3_client.generate_presigned_url(
-            ClientMethod='get_object',
-            Params={
-                'Bucket': self.bucket,
-                'Key': object_key
-            },
-            ExpiresIn=300)
-        response = requests.get(get_url)
-
-        if response.status_code == 200:
-            return pickle.loads(response.content)
-
-        raise ValueError(
-            f'Error occurred sending data: request status code = {response.status_code}'
-        )
+        try:
+            size = self.s3_client.head_object(Bucket=self.bucket,
+                                              Key=object_key)['ContentLength']
+
+            # The parts are written into the buffer that the payload is decoded from
+            data = bytearray(size)
+            self.s3_client.download_fileobj(self.bucket,
+                                            object_key,
+                                            BufferWriter(data),
+                                            Config=self.transfer_config)
+
+        except botocore.exceptions.ClientError as error:
+            raise ValueError(
+                f'Error occurred receiving data from S3: {error}') from error
+
+        return payload_codec.decode(data)
+
+    async def send(self, object_key, object_to_send) -> int:
+        """ Sends an object without blocking the event loop. """
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(self.send_to_s3, object_key, object_to_send))
+
+    async def receive(self, object_key) -> Any:
+        """ Retrieves an object without blocking the event loop. """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.receive_from_s3, object_key))
 
     def delete_from_s3(self, object_key):
         """ Deletes an object using its key from S3. """
@@ -0,0 +1,40 @@
+"""
+Caching a test set as tensors of preprocessed examples and their labels.
+
+Loading a test set applies its transforms to every example each time the model is
+tested, which can take longer than the inference itself. A test set whose examples
+are tensors is instead preprocessed once into a TensorDataset, from which the trainer
+slices batches of any size directly.
+"""
+import logging
+
+import torch
+
+
+def cache_testset(testset, indices=None, batch_size=1024):
+    """Returns the examples of a test set, or those at the given indices, preprocessed
+    into a TensorDataset, or None if its examples are not tensors of the same shape
+    along with their labels."""
+    if indices is not None:
+        testset = torch.utils.data.Subset(testset, list(indices))
+
+    examples = []
+    labels = []
+    loader = torch.utils.data.DataLoader(testset, batch_size=batch_size, shuffle=False)
+    try:
+        for batch in loader:
+            if not (
+                isinstance(batch, (list, tuple))
+                and len(batch) == 2
+                and isinstance(batch[0], torch.Tensor)
+                and isinstance(batch[1], torch.Tensor)
+            ):
+                raise TypeError("Examples are not pairs of tensors and labels.")
+
+            examples.append(batch[0])
+            labels.append(batch[1])
+    except (RuntimeError, TypeError) as error:
+        logging.info("The test set cannot be cached as tensors: %s", error)
+        return None
+
+    return torch.utils.data.TensorDataset(torch.cat(examples), torch.cat(labels))
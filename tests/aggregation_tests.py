@@ -0,0 +1,95 @@
+"""
+Unit tests for averaging model weights in place.
+"""
+import asyncio
+import types
+import unittest
+from collections import OrderedDict
+
+import torch
+
+from plato.algorithms import fedavg
+from plato.utils import aggregation
+
+
+class AggregationTest(unittest.TestCase):
+    """Tests for the in-place weighted averaging of state_dicts."""
+
+    def setUp(self):
+        super().setUp()
+        torch.manual_seed(1)
+        self.model = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 8, 3), torch.nn.BatchNorm2d(8), torch.nn.Linear(4, 2)
+        )
+        self.algorithm = fedavg.Algorithm(types.SimpleNamespace(model=self.model))
+        self.baseline = self.algorithm.extract_weights()
+
+        self.weights_received = []
+        for __ in range(5):
+            weights = OrderedDict()
+            for name, tensor in self.baseline.items():
+                if tensor.is_floating_point():
+                    weights[name] = tensor + torch.randn_like(tensor)
+                else:
+                    weights[name] = tensor + 3
+            self.weights_received.append(weights)
+
+        num_samples = [10, 20, 30, 15, 25]
+        self.weightings = [samples / sum(num_samples) for samples in num_samples]
+
+    def expected_weights(self):
+        """Federated averaging by applying the average of the weight deltas."""
+        deltas = self.algorithm.compute_weight_deltas(
+            self.baseline, self.weights_received
+        )
+        avg_update = {
+            name: torch.zeros(delta.shape) for name, delta in deltas[0].items()
+        }
+        for delta, weighting in zip(deltas, self.weightings):
+            for name, value in delta.items():
+                avg_update[name] += value * weighting
+
+        return self.algorithm.update_weights(avg_update)
+
+    def test_average_weights(self):
+        """Averaging in place matches averaging the weight deltas."""
+        expected = self.expected_weights()
+
+        self.assertTrue(
+            self.algorithm.can_average_weights(self.baseline, self.weights_received)
+        )
+        averaged = asyncio.run(
+            self.algorithm.average_weights(
+                self.baseline, self.weights_received, self.weightings
+            )
+        )
+
+        self.assertEqual(list(expected.keys()), list(averaged.keys()))
+        for name, tensor in averaged.items():
+            self.assertEqual(self.baseline[name].dtype, tensor.dtype)
+            self.assertTrue(
+                torch.allclose(expected[name].to(tensor.dtype), tensor, atol=1e-6)
+            )
+
+    def test_streaming_sum(self):
+        """Unnormalized weights scaled at the end give the same average."""
+        accumulator = aggregation.WeightAccumulator(self.baseline)
+        for weights, samples in zip(self.weights_received, [10, 20, 30, 15, 25]):
+            accumulator.add(weights, samples)
+        averaged = accumulator.result(self.baseline, scale=1 / 100)
+
+        for name, tensor in self.expected_weights().items():
+            self.assertTrue(
+                torch.allclose(tensor.to(averaged[name].dtype), averaged[name], atol=1e-6)
+            )
+
+    def test_incompatible_weights(self):
+        """Payloads that are not state_dicts of the model are not averaged in place."""
+        weights = OrderedDict(self.weights_received[0])
+        weights.popitem()
+        self.assertFalse(self.algorithm.can_average_weights(self.baseline, [weights]))
+        self.assertFalse(aggregation.is_compatible(self.baseline, weights))
+
+
+if __name__ == "__main__":
+    unittest.main()
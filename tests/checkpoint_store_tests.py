@@ -0,0 +1,76 @@
+"""
+Testing the content-addressed store for the model weights in checkpoints.
+"""
+import os
+import tempfile
+import unittest
+
+import torch
+
+from plato.utils import checkpoint_store, checkpoint_writer
+
+
+class CheckpointStoreTest(unittest.TestCase):
+    """Testing saving checkpoints incrementally and loading them."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+        self.store = checkpoint_store.CheckpointStore(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_save_and_load(self):
+        """Testing that only the tensors changed are written, and that a state_dict
+        is loaded as it was saved."""
+        model = torch.nn.Sequential(torch.nn.Linear(4, 3), torch.nn.BatchNorm1d(3))
+        weights = model.state_dict()
+        first_size = self.store.save(weights, f"{self.path}/checkpoint_1.json")
+
+        with torch.no_grad():
+            model[0].bias.add_(1)
+        second_size = self.store.save(
+            model.state_dict(), f"{self.path}/checkpoint_2.json"
+        )
+
+        self.assertEqual(second_size, model[0].bias.numel() * 4)
+        self.assertLess(second_size, first_size)
+
+        loaded = self.store.load(f"{self.path}/checkpoint_2.json")
+        self.assertEqual(list(loaded), list(model.state_dict()))
+        for name, tensor in model.state_dict().items():
+            self.assertEqual(loaded[name].dtype, tensor.dtype)
+            self.assertTrue(torch.equal(loaded[name], tensor))
+
+        # The tensors loaded can be modified without changing the stored blobs
+        model.load_state_dict(loaded)
+        loaded["0.weight"].zero_()
+        reloaded = self.store.load(f"{self.path}/checkpoint_2.json")
+        self.assertTrue(torch.equal(reloaded["0.weight"], model[0].weight))
+
+    def test_collect_garbage(self):
+        """Testing that the blobs are removed with the last checkpoint using them."""
+        writer = checkpoint_writer.CheckpointWriter(
+            keep_last=1, cleanup=self.store.collect_garbage
+        )
+        for round_saved in range(1, 4):
+            weights = {"shared": torch.ones(2), "round": torch.tensor([round_saved])}
+            filename = f"{self.path}/checkpoint_{round_saved}.json"
+            writer.submit(
+                round_saved,
+                [(filename, lambda name, weights=weights: self.store.save(weights, name))],
+            )
+        writer.close()
+
+        self.assertEqual(os.listdir(self.path).count("checkpoint_3.json"), 1)
+        self.assertEqual(len(os.listdir(self.store.blob_path)), 2)
+        self.assertEqual(
+            self.store.load(f"{self.path}/checkpoint_3.json")["round"].item(), 3
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
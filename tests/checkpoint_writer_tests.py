@@ -0,0 +1,73 @@
+"""
+Testing the writer that saves checkpoints on a background thread.
+"""
+import os
+import tempfile
+import unittest
+
+from plato.utils import checkpoint_writer
+
+
+class CheckpointWriterTest(unittest.TestCase):
+    """Testing writing checkpoints and retaining some of them."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def save(self, writer, round_saved):
+        """Saves the checkpoint of a round."""
+        writer.submit(
+            round_saved,
+            [
+                (
+                    f"{self.path}/model_{round_saved}.pkl",
+                    checkpoint_writer.pickle_writer(round_saved),
+                )
+            ],
+            marker=(
+                f"{self.path}/current_round.pkl",
+                checkpoint_writer.pickle_writer(round_saved),
+            ),
+        )
+
+    def test_retention(self):
+        """Testing that the latest checkpoints and those of every few rounds are
+        retained."""
+        writer = checkpoint_writer.CheckpointWriter(keep_last=2, keep_every=3)
+        for round_saved in range(1, 8):
+            self.save(writer, round_saved)
+        writer.close()
+
+        self.assertEqual(
+            sorted(os.listdir(self.path)),
+            [
+                "current_round.pkl",
+                "model_3.pkl",
+                "model_6.pkl",
+                "model_7.pkl",
+            ],
+        )
+
+    def test_retain_all(self):
+        """Testing that all the checkpoints are retained by default, and that no
+        temporary files are left."""
+        writer = checkpoint_writer.CheckpointWriter()
+        for round_saved in range(1, 4):
+            self.save(writer, round_saved)
+        writer.flush()
+
+        self.assertEqual(
+            sorted(os.listdir(self.path)),
+            ["current_round.pkl", "model_1.pkl", "model_2.pkl", "model_3.pkl"],
+        )
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
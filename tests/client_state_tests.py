@@ -0,0 +1,74 @@
+"""
+Testing the store of per-client state.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from plato.utils import client_state
+
+
+class ClientStateStoreTest(unittest.TestCase):
+    """Testing the file format, and the states held in memory and in files."""
+
+    def setUp(self):
+        super().setUp()
+        self.path = tempfile.mkdtemp()
+
+    def test_save_and_load(self):
+        """Testing that tensors and arrays are saved and mapped back intact."""
+        state = {
+            "weight": torch.randn(4, 3),
+            "steps": torch.arange(5),
+            "half": torch.randn(2).bfloat16(),
+            "empty": torch.empty(0),
+        }
+        filename = os.path.join(self.path, "state.safetensors")
+        client_state.save(state, filename)
+        loaded = client_state.load(filename)
+
+        self.assertEqual(list(loaded), list(state))
+        for name, tensor in state.items():
+            self.assertTrue(torch.equal(loaded[name], tensor))
+
+        masks = [np.ones((2, 3), dtype=np.float32), np.zeros(4, dtype=np.bool_)]
+        client_state.save(masks, filename)
+        loaded = client_state.load(filename)
+        self.assertEqual(len(loaded), 2)
+        for mask, loaded_mask in zip(masks, loaded):
+            np.testing.assert_array_equal(mask, loaded_mask)
+            self.assertEqual(mask.dtype, loaded_mask.dtype)
+
+    def test_write_back(self):
+        """Testing that states are only written to files when they are evicted."""
+        store = client_state.ClientStateStore(self.path, capacity=100, write_back=True)
+        for client_id in range(1, 4):
+            store.put(client_id, "model", torch.full((10,), float(client_id)))
+
+        self.assertEqual(os.listdir(self.path), ["model_client1.safetensors"])
+        self.assertEqual(store.get(1, "model")[0].item(), 1.0)
+        self.assertEqual(store.get(3, "model")[0].item(), 3.0)
+        self.assertIsNone(store.get(4, "model"))
+
+        store.remove(name="model")
+        self.assertEqual(os.listdir(self.path), [])
+        self.assertIsNone(store.get(1, "model"))
+
+    def test_write_through(self):
+        """Testing that states written by another process are not served from
+        memory."""
+        store = client_state.ClientStateStore(self.path, capacity=1000)
+        other_store = client_state.ClientStateStore(self.path, capacity=1000)
+
+        store.put(1, "control_variate", {"weight": torch.ones(3)})
+        self.assertTrue(other_store.contains(1, "control_variate"))
+        other_store.put(1, "control_variate", {"weight": torch.zeros(3)})
+
+        self.assertEqual(store.get(1, "control_variate")["weight"].sum().item(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
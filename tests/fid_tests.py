@@ -0,0 +1,72 @@
+"""
+Testing the feature statistics used to compute the Frechet Inception Distance.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import scipy.linalg
+
+from plato.trainers import fid
+
+
+def scipy_fid(real_features, fake_features):
+    """The Frechet distance computed from all the features with scipy's sqrtm."""
+    mu1, sigma1 = real_features.mean(axis=0), np.cov(real_features, rowvar=False)
+    mu2, sigma2 = fake_features.mean(axis=0), np.cov(fake_features, rowvar=False)
+    covmean = scipy.linalg.sqrtm(sigma1.dot(sigma2)).real
+
+    return np.sum((mu1 - mu2) ** 2.0) + np.trace(sigma1 + sigma2 - 2.0 * covmean)
+
+
+class FeatureStatisticsTest(unittest.TestCase):
+    """Testing the streaming statistics and the Frechet distance between them."""
+
+    def setUp(self):
+        super().setUp()
+        generator = np.random.default_rng(1)
+        mixing = generator.normal(size=(64, 64))
+        self.real_features = generator.normal(size=(1000, 64)) @ mixing + 100
+        self.fake_features = generator.normal(size=(700, 64)) @ mixing * 1.5 + 101
+
+    def accumulate(self, features, batch_size):
+        """Accumulates the statistics of features in batches."""
+        statistics = fid.FeatureStatistics(features.shape[1])
+        for start in range(0, len(features), batch_size):
+            statistics.update(features[start : start + batch_size])
+        return statistics
+
+    def test_streaming_moments(self):
+        """Testing that the moments accumulated in batches match those of all the
+        features at once."""
+        statistics = self.accumulate(self.real_features, 33)
+
+        np.testing.assert_allclose(statistics.mean, self.real_features.mean(axis=0))
+        np.testing.assert_allclose(
+            statistics.covariance, np.cov(self.real_features, rowvar=False)
+        )
+
+    def test_frechet_distance(self):
+        """Testing that the eigen-based Frechet distance matches the one computed with
+        scipy's sqrtm, and that statistics are saved and loaded intact."""
+        real_statistics = self.accumulate(self.real_features, 128)
+        fake_statistics = self.accumulate(self.fake_features, 50)
+
+        expected = scipy_fid(self.real_features, self.fake_features)
+        self.assertAlmostEqual(
+            real_statistics.frechet_distance(fake_statistics), expected, delta=1e-6
+        )
+
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "statistics.npz")
+            real_statistics.save(filename)
+            loaded = fid.FeatureStatistics.load(filename)
+
+        self.assertAlmostEqual(
+            loaded.frechet_distance(fake_statistics), expected, delta=1e-6
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
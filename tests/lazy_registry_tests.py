@@ -0,0 +1,58 @@
+"""
+Testing the registries that import their components on first use.
+"""
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from plato.utils import lazy_registry
+
+
+class LazyRegistryTest(unittest.TestCase):
+    """Testing that components are imported on first use, and discovered as entry
+    points."""
+
+    def test_import_on_first_use(self):
+        """Testing that a component is only imported when it is first used."""
+        sys.modules.pop("colorsys", None)
+        registry = lazy_registry.LazyRegistry(
+            {"colorsys": "colorsys", "hls": "colorsys:rgb_to_hls"}
+        )
+
+        self.assertIn("hls", registry)
+        self.assertNotIn("colorsys", sys.modules)
+
+        rgb_to_hls = registry["hls"]
+        self.assertIs(rgb_to_hls, sys.modules["colorsys"].rgb_to_hls)
+        self.assertIs(registry["colorsys"], sys.modules["colorsys"])
+
+        registry["hls"] = len
+        self.assertIs(registry["hls"], len)
+        with self.assertRaises(KeyError):
+            registry["hsv"]
+
+    def test_entry_points(self):
+        """Testing that entry points are discovered only when a name is not registered,
+        and never replace registered components."""
+        installed = [
+            SimpleNamespace(name="hls", value="json"),
+            SimpleNamespace(name="dumps", value="json:dumps"),
+        ]
+        registry = lazy_registry.LazyRegistry(
+            {"hls": "colorsys:rgb_to_hls"}, group="plato.tests"
+        )
+
+        with mock.patch.object(
+            lazy_registry, "entry_points", return_value=installed
+        ) as entry_points:
+            self.assertIs(registry["hls"], sys.modules["colorsys"].rgb_to_hls)
+            entry_points.assert_not_called()
+
+            self.assertIs(registry["dumps"], sys.modules["json"].dumps)
+            self.assertEqual(sorted(registry), ["dumps", "hls"])
+            entry_points.assert_called_once_with("plato.tests")
+
+
+if __name__ == "__main__":
+    unittest.main()
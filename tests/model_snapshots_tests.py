@@ -0,0 +1,41 @@
+"""
+Testing the per-epoch snapshots of a client's model.
+"""
+import unittest
+
+import torch
+
+from plato.trainers import snapshots
+
+
+class ModelSnapshotsTest(unittest.TestCase):
+    """Testing taking snapshots and finding them by training time."""
+
+    def test_find(self):
+        """Testing that the earliest snapshot taken after a training time is found."""
+        model = torch.nn.Linear(2, 1)
+        model_snapshots = snapshots.ModelSnapshots()
+        model_snapshots.start(client_id=1)
+
+        for epoch in range(1, 4):
+            with torch.no_grad():
+                model.bias.fill_(epoch)
+            model_snapshots.add(epoch * 10.0, model.state_dict())
+
+        # The snapshots are copies of the weights
+        model.bias.data.zero_()
+
+        for training_time, epoch in [(0.0, 1), (10.0, 2), (15.0, 2), (29.9, 3)]:
+            found_epoch, found_time, weights = model_snapshots.find(training_time)
+            self.assertEqual(found_epoch, epoch)
+            self.assertEqual(found_time, epoch * 10.0)
+            self.assertEqual(weights["bias"].item(), epoch)
+
+        self.assertIsNone(model_snapshots.find(30.0))
+
+        model_snapshots.start(client_id=2)
+        self.assertEqual(len(model_snapshots), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
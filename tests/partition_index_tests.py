@@ -0,0 +1,67 @@
+"""
+Testing the partition index shared by the clients' samplers.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from plato.samplers import partition_index, sampler_utils
+
+
+class PartitionIndexTest(unittest.TestCase):
+    """Testing the partition index and the assignment of classes to clients."""
+
+    def test_partitions(self):
+        """Testing slicing an index and saving it to a file."""
+        partitions = [np.array([3, 1]), np.array([], dtype=np.int64), np.array([0, 2])]
+        index = partition_index.PartitionIndex.from_partitions(partitions)
+
+        self.assertEqual(len(index), 3)
+        for partition, indices in enumerate(partitions):
+            np.testing.assert_array_equal(index[partition], indices)
+        np.testing.assert_array_equal(index.sizes(), [2, 0, 2])
+
+        with self.assertRaises(KeyError):
+            index[3]  # pylint: disable=pointless-statement
+
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "index.npz")
+            index.save(filename, extra=np.arange(3))
+            loaded, arrays = partition_index.PartitionIndex.load(filename)
+
+        np.testing.assert_array_equal(loaded.indices, index.indices)
+        np.testing.assert_array_equal(loaded.offsets, index.offsets)
+        np.testing.assert_array_equal(arrays["extra"], np.arange(3))
+
+    def test_assign_sub_classes(self):
+        """Testing that the samples of each class are split evenly and exclusively
+        across the clients containing the class, in the order of the clients."""
+        np.random.seed(1)
+        labels = np.random.randint(0, 10, 1000)
+        num_clients = 30
+
+        np.random.seed(1)
+        index = sampler_utils.assign_sub_classes(labels, list(range(10)), num_clients, 3)
+
+        self.assertEqual(len(index), num_clients)
+        np.testing.assert_array_equal(np.sort(index.indices), np.arange(1000))
+
+        for class_id in range(10):
+            clients = [
+                client_id
+                for client_id in range(num_clients)
+                if np.any(labels[index[client_id]] == class_id)
+            ]
+            splits = np.array_split(np.where(labels == class_id)[0], len(clients))
+
+            for client_id, split in zip(clients, splits):
+                partition = index[client_id]
+                np.testing.assert_array_equal(
+                    partition[labels[partition] == class_id], split
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Unit tests for the codecs that encode payloads before they are transmitted between
+the clients and the server.
+"""
+import pickle
+import unittest
+from collections import OrderedDict
+
+import torch
+
+from plato.utils import payload_codec
+
+
+class PayloadCodecTest(unittest.TestCase):
+    """Tests for encoding and decoding payloads."""
+
+    def setUp(self):
+        super().setUp()
+        model = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 8, 3), torch.nn.BatchNorm2d(8), torch.nn.Linear(4, 2)
+        )
+        self.state_dict = model.state_dict()
+        self.state_dict["extra.half"] = torch.randn(3, 5).half()
+        self.state_dict["extra.mask"] = torch.rand(7) > 0.5
+        self.state_dict["extra.empty"] = torch.zeros(0, 4)
+        self.codec = payload_codec.TensorCodec()
+
+    def assert_state_dict_equal(self, expected, decoded):
+        self.assertEqual(list(expected.keys()), list(decoded.keys()))
+        for name, tensor in expected.items():
+            self.assertEqual(tensor.dtype, decoded[name].dtype)
+            self.assertEqual(tensor.shape, decoded[name].shape)
+            self.assertTrue(torch.equal(tensor, decoded[name]))
+
+    def test_round_trip(self):
+        """A state_dict decodes into identical tensors and keeps its metadata."""
+        buffer = self.codec.encode(self.state_dict)
+        self.assertTrue(payload_codec.is_tensor_payload(buffer))
+
+        decoded = payload_codec.decode(buffer)
+        self.assertIsInstance(decoded, OrderedDict)
+        self.assert_state_dict_equal(self.state_dict, decoded)
+        self.assertEqual(self.state_dict._metadata, decoded._metadata)
+
+        # A read-only copy of the buffer decodes to the same tensors
+        self.assert_state_dict_equal(self.state_dict, payload_codec.decode(bytes(buffer)))
+
+    def test_zero_copy(self):
+        """Decoded tensors share their memory with a writable buffer."""
+        buffer = self.codec.encode(self.state_dict)
+        decoded = payload_codec.decode(buffer)
+
+        decoded["0.weight"].fill_(0.0)
+        decoded_again = payload_codec.decode(buffer)
+        self.assertEqual(0, torch.count_nonzero(decoded_again["0.weight"]).item())
+        self.assertTrue(torch.equal(self.state_dict["0.bias"], decoded_again["0.bias"]))
+
+    def test_pickle_fallback(self):
+        """Payloads other than dictionaries of tensors are pickled."""
+        payload = [(torch.ones(2), 1), (torch.zeros(2), 0)]
+        buffer = self.codec.encode(payload)
+        self.assertFalse(payload_codec.is_tensor_payload(buffer))
+
+        decoded = payload_codec.decode(buffer)
+        self.assertEqual(len(payload), len(decoded))
+        self.assertTrue(torch.equal(payload[0][0], decoded[0][0]))
+
+        # Payloads pickled elsewhere are decoded as well
+        decoded = payload_codec.decode(pickle.dumps(self.state_dict))
+        self.assert_state_dict_equal(self.state_dict, decoded)
+
+    def test_sizeof(self):
+        """The size of a payload is the size of its tensors and buffers."""
+        expected = sum(
+            tensor.numel() * tensor.element_size() for tensor in self.state_dict.values()
+        )
+        self.assertEqual(expected, payload_codec.sizeof(self.state_dict))
+        self.assertEqual(
+            2 * expected + 3,
+            payload_codec.sizeof([self.state_dict, (self.state_dict, b"abc")]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Testing the sinks that buffer results and write them in batches.
+"""
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from plato.utils import csv_processor, results_sink
+
+
+class ResultsSinkTest(unittest.TestCase):
+    """Testing writing results as .csv and .npz files."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "results.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def read_csv(self):
+        """Reads the rows of the .csv file."""
+        with open(self.filename, "r", encoding="utf-8") as result_file:
+            return list(csv.reader(result_file))
+
+    def test_csv(self):
+        """Testing that rows are buffered until the sink is flushed, and that rows
+        written to its file with write_csv() are kept in order."""
+        sink = results_sink.open_sink(
+            self.filename, ["round", "accuracy"], flush_interval=3600
+        )
+        sink.write([1, 0.5])
+        csv_processor.write_csv(self.filename, [2, 0.75])
+        self.assertEqual(self.read_csv(), [["round", "accuracy"]])
+
+        results_sink.flush_all()
+        self.assertEqual(
+            self.read_csv(), [["round", "accuracy"], ["1", "0.5"], ["2", "0.75"]]
+        )
+
+        sink.write_rows([[3, 0.8], [4, 0.9]])
+        sink.close()
+        self.assertEqual(len(self.read_csv()), 5)
+
+    def test_npz(self):
+        """Testing that the results are written with an array for each column."""
+        sink = results_sink.open_sink(
+            self.filename, ["round", "accuracy"], "npz", flush_interval=0
+        )
+        sink.write_rows([round_number, round_number / 10] for round_number in range(5))
+        sink.write([5, 0.5])
+        sink.close()
+
+        self.assertFalse(os.path.exists(self.filename))
+        with np.load(sink.output_filename) as results:
+            np.testing.assert_array_equal(results["round"], np.arange(6))
+            np.testing.assert_allclose(results["accuracy"], np.arange(6) / 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
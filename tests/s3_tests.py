@@ -0,0 +1,72 @@
+"""
+Testing transferring payloads through an S3-compatible object storage service, against
+the stand-in for S3 provided by moto.
+"""
+import asyncio
+import os
+import unittest
+
+import torch
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+from plato.utils import s3
+
+os.environ["config_file"] = "tests/config.yml"
+
+
+@unittest.skipIf(mock_aws is None, "moto is not installed.")
+class S3Test(unittest.TestCase):
+    """Testing sending and receiving payloads, in one part or in many parts."""
+
+    def setUp(self):
+        super().setUp()
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+        self.mock = mock_aws()
+        self.mock.start()
+        self.s3_client = s3.S3(bucket="s3://plato-tests/payloads")
+
+    def tearDown(self):
+        self.mock.stop()
+        super().tearDown()
+
+    def test_small_payload(self):
+        """Testing that a payload is sent once for each key, and received intact."""
+        payload = {"round": 1, "clients": [1, 2, 3]}
+
+        self.assertGreater(self.s3_client.send_to_s3("small", payload), 0)
+        self.assertEqual(self.s3_client.send_to_s3("small", payload), 0)
+        self.assertEqual(self.s3_client.receive_from_s3("small"), payload)
+
+    def test_multipart_payload(self):
+        """Testing that a payload larger than a part is transferred in parts."""
+        # Parts are at least 5 MB in S3
+        self.s3_client.transfer_config.multipart_threshold = 5 * 1024**2
+        self.s3_client.transfer_config.multipart_chunksize = 5 * 1024**2
+        payload = {"weight": torch.randn(4 * 1024**2), "bias": torch.randn(10)}
+
+        async def transfer():
+            size = await self.s3_client.send("large", payload)
+            return size, await self.s3_client.receive("large")
+
+        size, received = asyncio.run(transfer())
+        self.assertGreater(size, 16 * 1024**2)
+
+        head = self.s3_client.s3_client.head_object(
+            Bucket="plato-tests", Key="/payloads/large"
+        )
+        self.assertIn("-", head["ETag"])
+
+        self.assertEqual(list(received.keys()), list(payload.keys()))
+        for name, tensor in payload.items():
+            self.assertTrue(torch.equal(received[name], tensor))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Testing the federated averaging server aggregating client payloads as they arrive.
+
+How to run the tests:
+
+ 1 Run the following command in the root directory.
+    python tests/streaming_aggregation_tests.py
+
+"""
+import asyncio
+import copy
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import torch
+
+CONFIG = """
+clients:
+    type: simple
+    total_clients: 4
+    per_round: 4
+
+server:
+    address: 127.0.0.1
+    port: 8000
+    do_test: false
+
+data:
+    datasource: MNIST
+    partition_size: 100
+    sampler: iid
+
+trainer:
+    type: basic
+    rounds: 1
+    epochs: 1
+    batch_size: 32
+    optimizer: SGD
+    model_name: lenet5
+
+algorithm:
+    type: fedavg
+
+parameters:
+    optimizer:
+        lr: 0.01
+
+general:
+    base_path: {base_path}
+"""
+
+base_path = tempfile.mkdtemp()
+os.environ["config_file"] = os.path.join(base_path, "config.yml")
+with open(os.environ["config_file"], "w", encoding="utf-8") as config_file:
+    config_file.write(CONFIG.format(base_path=base_path))
+
+# pylint: disable=wrong-import-position
+from plato.processors import registry as processor_registry
+from plato.servers import fedavg
+from plato.trainers import basic
+
+
+class ControlVariateServer(fedavg.Server):
+    """A server keeping an extra item of each payload, as SCAFFOLD does."""
+
+    def __init__(self, model=None, trainer=None):
+        super().__init__(model=model, trainer=trainer)
+        self.control_variates_received = None
+
+    def weights_received(self, weights_received):
+        self.control_variates_received = [weight[1] for weight in weights_received]
+        return [weight[0] for weight in weights_received]
+
+
+class StreamingAggregationTest(unittest.TestCase):
+    """Testing that aggregating the payloads as they arrive gives the same result as
+    aggregating them all at the end of the round."""
+
+    def setUp(self):
+        super().setUp()
+        torch.manual_seed(1)
+        self.model = torch.nn.Sequential(
+            torch.nn.Linear(4, 3), torch.nn.BatchNorm1d(3), torch.nn.Linear(3, 2)
+        )
+
+        self.payloads = []
+        for __ in range(4):
+            weights = OrderedDict()
+            for name, tensor in self.model.state_dict().items():
+                if tensor.is_floating_point():
+                    weights[name] = tensor + torch.randn_like(tensor)
+                else:
+                    weights[name] = tensor + 1
+            self.payloads.append(weights)
+        self.num_samples = [10, 40, 20, 30]
+
+    async def run_round(self, server_class, streaming, payloads):
+        """Passes the payloads to a server one at a time as they arrive, aggregates
+        them, and returns the server."""
+        server = server_class(
+            model=lambda: copy.deepcopy(self.model), trainer=basic.Trainer
+        )
+        server.init_trainer()
+        __, server.inbound_processor = processor_registry.get(
+            "Server", server_id=os.getpid(), trainer=server.trainer
+        )
+        server.streaming_aggregation = streaming
+
+        # The round is not processed before all the payloads have been passed
+        server.clients_per_round = len(payloads) + 1
+
+        for client_id, (payload, num_samples) in enumerate(
+            zip(payloads, self.num_samples), start=1
+        ):
+            sid = f"sid{client_id}"
+            server.client_payload[sid] = payload
+            server.reports[sid] = SimpleNamespace(
+                num_samples=num_samples,
+                accuracy=0.5,
+                training_time=0,
+                comm_time=0,
+                update_response=False,
+            )
+            server.training_clients[client_id] = {
+                "id": client_id,
+                "starting_round": 0,
+                "start_time": 0,
+                "update_requested": False,
+            }
+            await server.process_client_info(client_id, sid)
+
+        await server._process_reports()
+        return server
+
+    def aggregate(self, server_class, streaming, payloads):
+        """Runs a round on a server, and returns the server."""
+        return asyncio.run(self.run_round(server_class, streaming, payloads))
+
+    def assert_same_weights(self, expected, weights):
+        """Asserts that two state_dicts are the same, up to rounding errors."""
+        self.assertEqual(list(expected.keys()), list(weights.keys()))
+        for name, tensor in weights.items():
+            self.assertEqual(expected[name].dtype, tensor.dtype)
+            self.assertTrue(torch.allclose(expected[name], tensor, atol=1e-6))
+
+    def test_streaming_aggregation(self):
+        """Testing that the payloads are dropped and the weights are the same."""
+        expected = self.aggregate(fedavg.Server, False, self.payloads)
+        streamed = self.aggregate(fedavg.Server, True, self.payloads)
+
+        self.assertIsNone(expected.accumulator)
+        self.assertTrue(all(update.payload is None for update in streamed.updates))
+        self.assert_same_weights(
+            expected.algorithm.extract_weights(), streamed.algorithm.extract_weights()
+        )
+
+    def test_weights_received_customized(self):
+        """Testing that servers customizing weights_received() see all the payloads
+        at the end of the round."""
+        payloads = [
+            [weights, {"control_variate": torch.full((2,), float(index))}]
+            for index, weights in enumerate(self.payloads)
+        ]
+        expected = self.aggregate(fedavg.Server, False, self.payloads)
+        streamed = self.aggregate(ControlVariateServer, True, payloads)
+
+        received = streamed.control_variates_received
+        self.assertEqual(
+            [variate["control_variate"][0].item() for variate in received],
+            [0.0, 1.0, 2.0, 3.0],
+        )
+        self.assert_same_weights(
+            expected.algorithm.extract_weights(), streamed.algorithm.extract_weights()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()